@@ -0,0 +1,257 @@
+"""
+Barcode Verification Module
+Decodes Code128 symbols from rendered barcode rasters and compares them
+with the intended values, so unreadable labels are caught before spooling.
+A single pixel row is scanned per barcode; thresholding and run-length
+extraction run on whole rows at once (bytes.translate + regex), which keeps
+verification cheap enough to run on every label of a batch.
+"""
+
+import re
+import random
+from code128 import PATTERN_WIDTHS, STOP_WIDTHS, START, STOP, SHIFT, CODE_A, CODE_B, CODE_C
+
+
+# Grey level -> 1 (dark) / 0 (light), applied to a whole row with translate()
+_THRESHOLD = bytes(1 if level < 128 else 0 for level in range(256))
+
+# Runs of identical pixels in a thresholded row
+_RUN_RE = re.compile(rb'\x01+|\x00+')
+
+# Normalized widths -> symbol value
+_PATTERN_LOOKUP = {widths: value for value, widths in enumerate(PATTERN_WIDTHS)}
+_START_SETS = {value: code_set for code_set, value in START.items()}
+
+
+class VerificationResult:
+    """Outcome of verifying one barcode"""
+
+    def __init__(self, expected, decoded=None, error=None, record=None, field=None):
+        """
+        Args:
+            expected (str): Value the barcode should encode
+            decoded (str): Value read back from the raster (None if unreadable)
+            error (str): Reason the barcode could not be decoded
+            record (int): Index of the record in its batch
+            field (str): Label field name (e.g. "SAP-Nr")
+        """
+        self.expected = expected
+        self.decoded = decoded
+        self.error = error
+        self.record = record
+        self.field = field
+
+    @property
+    def ok(self):
+        return self.error is None and self.decoded == self.expected
+
+    def __repr__(self):
+        status = "OK" if self.ok else f"FAILED ({self.error or f'decoded {self.decoded!r}'})"
+        return (f"VerificationResult(record={self.record}, field={self.field}, "
+                f"expected={self.expected!r}, {status})")
+
+
+def scan_runs(img, y=None, x_start=0, x_end=None):
+    """
+    Extract bar/space run widths from one pixel row of an image.
+
+    Leading and trailing quiet zones are removed, so the result starts and
+    ends with a bar.
+
+    Args:
+        img (PIL.Image): Rendered barcode or label image
+        y (int): Row to scan (default: middle of the image)
+        x_start (int): First column to scan
+        x_end (int): Column after the last one to scan (default: image width)
+
+    Returns:
+        list: Run widths in pixels, alternating bar/space
+    """
+    if y is None:
+        y = img.height // 2
+    if x_end is None:
+        x_end = img.width
+
+    row = img.crop((x_start, y, x_end, y + 1))
+    if row.mode != 'L':
+        row = row.convert('L')
+    bits = row.tobytes().translate(_THRESHOLD)
+
+    start = bits.find(b'\x01')
+    if start < 0:
+        return []
+    end = bits.rfind(b'\x01') + 1
+    return [m.end() - m.start() for m in _RUN_RE.finditer(bits, start, end)]
+
+
+def _normalize(runs, modules):
+    total = sum(runs)
+    return tuple(max(1, round(width * modules / total)) for width in runs)
+
+
+def decode_runs(runs):
+    """
+    Decode Code128 run widths into text.
+
+    Each symbol is normalized against its own 11-module width, so uniform
+    stretching and small edge shifts from resampling are tolerated.
+
+    Args:
+        runs (list): Run widths from scan_runs()
+
+    Returns:
+        str: Decoded text
+
+    Raises:
+        ValueError: If the runs do not form a valid Code128 symbol
+    """
+    if len(runs) < 25 or (len(runs) - 7) % 6:
+        raise ValueError(f"unexpected number of bars/spaces ({len(runs)})")
+
+    symbols = []
+    for offset in range(0, len(runs) - 7, 6):
+        widths = _normalize(runs[offset:offset + 6], 11)
+        value = _PATTERN_LOOKUP.get(widths)
+        if value is None:
+            raise ValueError(f"unreadable symbol at position {offset // 6}")
+        symbols.append(value)
+
+    if _normalize(runs[-7:], 13) != STOP_WIDTHS:
+        raise ValueError("missing stop pattern")
+
+    return decode_symbols(symbols + [STOP])
+
+
+def decode_symbols(symbols):
+    """
+    Decode Code128 symbol values (start ... checksum, stop) into text.
+
+    Args:
+        symbols (list): Symbol values
+
+    Returns:
+        str: Decoded text
+
+    Raises:
+        ValueError: On bad start symbol, checksum mismatch or unsupported codes
+    """
+    if symbols[0] not in _START_SETS:
+        raise ValueError("missing start symbol")
+
+    checksum = symbols[0]
+    for weight, symbol in enumerate(symbols[1:-2], 1):
+        checksum += weight * symbol
+    if checksum % 103 != symbols[-2]:
+        raise ValueError("checksum mismatch")
+
+    code_set = _START_SETS[symbols[0]]
+    shifted = False
+    chars = []
+    for symbol in symbols[1:-2]:
+        current = (CODE_B if code_set == CODE_A else CODE_A) if shifted else code_set
+        shifted = False
+
+        if current == CODE_C:
+            if symbol < 100:
+                chars.append(f"{symbol:02d}")
+            elif symbol == 100:
+                code_set = CODE_B
+            elif symbol == 101:
+                code_set = CODE_A
+            else:
+                raise ValueError(f"unsupported symbol {symbol} in code set C")
+            continue
+
+        if symbol < 96:
+            if current == CODE_A and symbol >= 64:
+                chars.append(chr(symbol - 64))
+            else:
+                chars.append(chr(symbol + 32))
+        elif symbol == SHIFT:
+            shifted = True
+        elif symbol == 99:
+            code_set = CODE_C
+        elif symbol == 100 and current == CODE_A:
+            code_set = CODE_B
+        elif symbol == 101 and current == CODE_B:
+            code_set = CODE_A
+        else:
+            raise ValueError(f"unsupported function code {symbol}")
+
+    return ''.join(chars)
+
+
+def verify_image(img, expected, y=None, x_start=0, x_end=None):
+    """
+    Verify that a barcode raster encodes the expected value.
+
+    Args:
+        img (PIL.Image): Barcode or label image
+        expected (str): Value the barcode should encode
+        y (int): Row to scan (default: middle of the image)
+        x_start (int): First column of the barcode area
+        x_end (int): Column after the barcode area
+
+    Returns:
+        VerificationResult: Verification outcome
+    """
+    try:
+        decoded = decode_runs(scan_runs(img, y, x_start, x_end))
+        return VerificationResult(expected, decoded=decoded)
+    except ValueError as e:
+        return VerificationResult(expected, error=str(e))
+
+
+def verify_label_records(records, generator=None, sample_rate=1.0, seed=None):
+    """
+    Verify the barcodes of a batch of label records before spooling.
+
+    Each distinct value is decoded once per call, so batches with repeated
+    SAP/lot values cost little more than their unique values. The image
+    decoded is the generator's cached 1-bit barcode, i.e. the stream the
+    PDF embeds, not a separate rendering.
+    Under load, sample_rate < 1.0 verifies only a random fraction of records.
+
+    Args:
+        records (iterable): (sap_nr, cantitate, lot_number) tuples
+        generator (PDFLabelGenerator): Generator whose rasters are checked
+        sample_rate (float): Fraction of records to verify (0.0 - 1.0)
+        seed (int): Seed for reproducible sampling
+
+    Returns:
+        list: VerificationResult for every failed barcode (empty if all OK)
+    """
+    if generator is None:
+        from print_label_pdf import PDFLabelGenerator
+        generator = PDFLabelGenerator()
+
+    rng = random.Random(seed)
+    field_names = ("SAP-Nr", "Cantitate", "Lot Nr")
+    checked = {}
+    failures = []
+
+    for index, record in enumerate(records):
+        if sample_rate < 1.0 and rng.random() >= sample_rate:
+            continue
+
+        for field, value in zip(field_names, record):
+            if not value or not value.strip():
+                continue
+            expected = value.strip()[:25]
+
+            result = checked.get(expected)
+            if result is None:
+                barcode = generator.get_barcode(expected)
+                if barcode is None:
+                    result = VerificationResult(expected, error="barcode could not be generated")
+                else:
+                    img = barcode.to_image()
+                    result = verify_image(img, expected)
+                    img.close()
+                checked[expected] = result
+
+            if not result.ok:
+                failures.append(VerificationResult(expected, result.decoded, result.error,
+                                                   record=index, field=field))
+
+    return failures
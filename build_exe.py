@@ -42,7 +42,6 @@ args = [
     '--hidden-import=kivy.clock',
     '--hidden-import=kivy.graphics',
     '--hidden-import=PIL',
-    '--hidden-import=barcode',
     '--hidden-import=reportlab',
     '--hidden-import=print_label',
     '--hidden-import=print_label_pdf',
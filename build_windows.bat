@@ -39,8 +39,8 @@ echo.
 
 REM Install dependencies
 echo [3/5] Installing dependencies...
-echo Installing: python-barcode, pillow, reportlab, kivy, pyinstaller...
-pip install python-barcode pillow reportlab kivy==2.2.1 pyinstaller==6.1.0
+echo Installing: pillow, reportlab, kivy, pyinstaller...
+pip install pillow reportlab kivy==2.2.1 pyinstaller==6.1.0
 if errorlevel 1 (
     echo ERROR: Failed to install dependencies
     pause
@@ -68,7 +68,6 @@ pyinstaller label_printer_gui.py ^
     --workpath=./build ^
     --hidden-import=kivy ^
     --hidden-import=PIL ^
-    --hidden-import=barcode ^
     --hidden-import=reportlab ^
     --hidden-import=print_label ^
     --hidden-import=print_label_pdf ^
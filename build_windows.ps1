@@ -38,8 +38,8 @@ if ($LASTEXITCODE -ne 0) {
 Write-Host ""
 
 Write-Host "[3/5] Installing dependencies..." -ForegroundColor Cyan
-Write-Host "Installing: python-barcode, pillow, reportlab, kivy, pyinstaller..."
-pip install python-barcode pillow reportlab kivy==2.2.1 pyinstaller==6.1.0
+Write-Host "Installing: pillow, reportlab, kivy, pyinstaller..."
+pip install pillow reportlab kivy==2.2.1 pyinstaller==6.1.0
 if ($LASTEXITCODE -ne 0) {
     Write-Host "ERROR: Failed to install dependencies" -ForegroundColor Red
     Read-Host "Press Enter to exit"
@@ -66,7 +66,6 @@ $pyinstallerArgs = @(
     "--workpath=./build",
     "--hidden-import=kivy",
     "--hidden-import=PIL",
-    "--hidden-import=barcode",
     "--hidden-import=reportlab",
     "--hidden-import=print_label",
     "--hidden-import=print_label_pdf",
@@ -0,0 +1,230 @@
+"""
+Code128 Barcode Encoder
+Built-in encoder with precomputed symbol pattern tables.
+Chooses code sets A, B and C optimally (dynamic programming over the input)
+so long digit runs are packed two per symbol, and returns the symbol as a
+compact array of module widths that renderers consume directly.
+"""
+
+from array import array
+from PIL import Image
+
+
+# Bar/space widths (in modules) for symbol values 0-105, bar first.
+# Every pattern is 3 bars + 3 spaces = 11 modules.
+PATTERNS = (
+    '212222', '222122', '222221', '121223', '121322', '131222', '122213', '122312',
+    '132212', '221213', '221312', '231212', '112232', '122132', '122231', '113222',
+    '123122', '123221', '223211', '221132', '221231', '213212', '223112', '312131',
+    '311222', '321122', '321221', '312212', '322112', '322211', '212123', '212321',
+    '232121', '111323', '131123', '131321', '112313', '132113', '132311', '211313',
+    '231113', '231311', '112133', '112331', '132131', '113123', '113321', '133121',
+    '313121', '211331', '231131', '213113', '213311', '213131', '311123', '311321',
+    '331121', '312113', '312311', '332111', '314111', '221411', '431111', '111224',
+    '111422', '121124', '121421', '141122', '141221', '112214', '112412', '122114',
+    '122411', '142112', '142211', '241211', '221114', '413111', '241112', '134111',
+    '111242', '121142', '121241', '114212', '124112', '124211', '411212', '421112',
+    '421211', '212141', '214121', '412121', '111143', '111341', '131141', '114113',
+    '114311', '411113', '411311', '113141', '114131', '311141', '411131', '211412',
+    '211214', '211232',
+)
+
+# Stop pattern including the final termination bar (13 modules)
+STOP_PATTERN = '2331112'
+
+# Pattern widths as tuples of ints, precomputed once
+PATTERN_WIDTHS = tuple(tuple(int(w) for w in p) for p in PATTERNS)
+STOP_WIDTHS = tuple(int(w) for w in STOP_PATTERN)
+
+# Code sets
+CODE_A = 0
+CODE_B = 1
+CODE_C = 2
+
+# Special symbol values
+SHIFT = 98
+START = {CODE_A: 103, CODE_B: 104, CODE_C: 105}
+STOP = 106
+
+# Symbol that switches from the current set to another: SWITCH[current][target]
+SWITCH = {
+    CODE_A: {CODE_B: 100, CODE_C: 99},
+    CODE_B: {CODE_A: 101, CODE_C: 99},
+    CODE_C: {CODE_A: 101, CODE_B: 100},
+}
+
+# Symbol value of each ASCII character in sets A and B (None = not encodable)
+VALUE_A = tuple(c + 64 if c < 32 else (c - 32 if c < 96 else None) for c in range(128))
+VALUE_B = tuple(c - 32 if 32 <= c < 128 else None for c in range(128))
+
+_INFINITY = float('inf')
+
+
+def _char_value(code_set, code):
+    """Symbol value of a character code in set A or B, or None."""
+    if code >= 128:
+        return None
+    return VALUE_A[code] if code_set == CODE_A else VALUE_B[code]
+
+
+def encode_symbols(value):
+    """
+    Encode text into Code128 symbol values using the shortest encoding.
+
+    The returned list starts with the start symbol and ends with the
+    checksum and stop symbol.
+
+    Args:
+        value (str): Text to encode (ASCII 0-127)
+
+    Returns:
+        list: Symbol values
+
+    Raises:
+        ValueError: If the value is empty or has characters Code128 cannot encode
+    """
+    if not value:
+        raise ValueError("Cannot encode an empty value")
+
+    codes = [ord(ch) for ch in value]
+    for position, code in enumerate(codes):
+        if code >= 128:
+            raise ValueError(f"Character {value[position]!r} at position {position} "
+                             f"is not encodable in Code128")
+
+    n = len(codes)
+    is_digit = [48 <= code <= 57 for code in codes]
+
+    # cost[i][s]: fewest symbols to encode codes[i:] when currently in set s
+    # step[i][s]: decision taken at that point
+    cost = [[0, 0, 0] for _ in range(n + 1)]
+    step = [[None, None, None] for _ in range(n + 1)]
+
+    for i in range(n - 1, -1, -1):
+        code = codes[i]
+        direct = [_INFINITY, _INFINITY, _INFINITY]
+        choice = [None, None, None]
+
+        for code_set in (CODE_A, CODE_B):
+            if _char_value(code_set, code) is not None:
+                direct[code_set] = 1 + cost[i + 1][code_set]
+                choice[code_set] = ('char', code_set)
+            other = CODE_B if code_set == CODE_A else CODE_A
+            if _char_value(other, code) is not None:
+                shifted = 2 + cost[i + 1][code_set]
+                if shifted < direct[code_set]:
+                    direct[code_set] = shifted
+                    choice[code_set] = ('shift', other)
+
+        if i + 1 < n and is_digit[i] and is_digit[i + 1]:
+            direct[CODE_C] = 1 + cost[i + 2][CODE_C]
+            choice[CODE_C] = ('pair', CODE_C)
+
+        # Switching once is always enough; staying wins ties
+        for code_set in (CODE_A, CODE_B, CODE_C):
+            best, best_choice = direct[code_set], choice[code_set]
+            for target in (CODE_B, CODE_C, CODE_A):
+                if target != code_set and 1 + direct[target] < best:
+                    best, best_choice = 1 + direct[target], ('switch', target)
+            cost[i][code_set] = best
+            step[i][code_set] = best_choice
+
+    # Start set: the start symbol itself costs the same for all sets
+    start_set = min((CODE_B, CODE_C, CODE_A), key=lambda s: cost[0][s])
+    symbols = [START[start_set]]
+
+    code_set = start_set
+    i = 0
+    while i < n:
+        action, target = step[i][code_set]
+        if action == 'switch':
+            symbols.append(SWITCH[code_set][target])
+            code_set = target
+            action, target = step[i][code_set]
+        if action == 'pair':
+            symbols.append((codes[i] - 48) * 10 + codes[i + 1] - 48)
+            i += 2
+        elif action == 'shift':
+            symbols.append(SHIFT)
+            symbols.append(_char_value(target, codes[i]))
+            i += 1
+        else:
+            symbols.append(_char_value(code_set, codes[i]))
+            i += 1
+
+    checksum = symbols[0]
+    for weight, symbol in enumerate(symbols[1:], 1):
+        checksum += weight * symbol
+    symbols.append(checksum % 103)
+    symbols.append(STOP)
+    return symbols
+
+
+def symbols_to_widths(symbols):
+    """
+    Convert symbol values to module widths.
+
+    Args:
+        symbols (list): Symbol values including start, checksum and stop
+
+    Returns:
+        array: Alternating bar/space widths in modules ('B' typecode), bar first
+    """
+    widths = array('B')
+    for symbol in symbols[:-1]:
+        widths.extend(PATTERN_WIDTHS[symbol])
+    widths.extend(STOP_WIDTHS)
+    return widths
+
+
+def encode_widths(value):
+    """
+    Encode text straight to module widths.
+
+    Args:
+        value (str): Text to encode
+
+    Returns:
+        array: Alternating bar/space widths in modules, bar first
+    """
+    return symbols_to_widths(encode_symbols(value))
+
+
+def total_modules(widths):
+    """Number of modules in a symbol (without quiet zones)."""
+    return sum(widths)
+
+
+def widths_to_image(widths, module_px, height_px, quiet_zone_modules=10, mode='L'):
+    """
+    Rasterize module widths into a barcode image.
+
+    Every module is exactly module_px pixels wide, so bar edges always fall
+    on pixel boundaries.
+
+    Args:
+        widths (array): Module widths from encode_widths()
+        module_px (int): Pixels per module
+        height_px (int): Bar height in pixels
+        quiet_zone_modules (int): Blank modules on each side
+        mode (str): PIL image mode of the result ('L', '1' or 'RGB')
+
+    Returns:
+        PIL.Image: Barcode image
+    """
+    quiet = b'\xff' * (quiet_zone_modules * module_px)
+    parts = [quiet]
+    bar = True
+    for width in widths:
+        parts.append((b'\x00' if bar else b'\xff') * (width * module_px))
+        bar = not bar
+    parts.append(quiet)
+    row = b''.join(parts)
+    width = len(row)
+
+    if mode != 'L':
+        # Every row is identical: convert one row and repeat its bytes
+        with Image.frombytes('L', (width, 1), row) as row_img:
+            with row_img.convert(mode) as converted:
+                row = converted.tobytes()
+    return Image.frombytes(mode, (width, height_px), row * height_px)
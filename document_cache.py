@@ -0,0 +1,225 @@
+"""
+Document Cache
+Content-addressed cache of finished label documents.
+
+A document is keyed by a hash of the template (layout settings) and the
+record, so a repeated label or a reprint is served from the cache instead
+of being rendered again. Label output is deterministic, which makes a
+cached document byte-identical to a fresh render.
+
+Entries live in memory (LRU, bounded by count and bytes) with an optional
+disk tier (LRU by file access time, bounded by bytes) that survives
+restarts.
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def document_key(*parts):
+    """
+    Content address for a document.
+
+    Args:
+        *parts: Template fingerprint and record fields (converted to str)
+
+    Returns:
+        str: Hex key
+    """
+    data = '\x1f'.join(str(part) for part in parts).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+class DocumentCache:
+    """Two-tier LRU cache of rendered documents"""
+
+    def __init__(self, max_entries=512, max_bytes=16 * 1024 * 1024,
+                 disk_dir=None, disk_max_bytes=256 * 1024 * 1024, suffix='.pdf'):
+        """
+        Initialize document cache.
+
+        Args:
+            max_entries (int): Documents kept in memory
+            max_bytes (int): Memory budget in bytes
+            disk_dir (str): Folder for the disk tier (None = memory only)
+            disk_max_bytes (int): Disk budget in bytes
+            suffix (str): File extension of cached documents on disk
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.suffix = suffix
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()    # key -> bytes
+        self._memory_bytes = 0
+        self._disk = OrderedDict()      # key -> size, least recently used first
+        self._disk_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._load_disk_index()
+
+    def _load_disk_index(self):
+        entries = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.is_file() and entry.name.endswith(self.suffix):
+                stat = entry.stat()
+                entries.append((stat.st_atime, entry.name[:-len(self.suffix)], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def path(self, key):
+        """File path of a key in the disk tier."""
+        return os.path.join(self.disk_dir, key + self.suffix)
+
+    def get(self, key):
+        """
+        Look up a document.
+
+        Args:
+            key (str): Key from document_key()
+
+        Returns:
+            bytes or None: Document, or None if not cached
+        """
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return data
+            on_disk = key in self._disk
+
+        if on_disk:
+            try:
+                with open(self.path(key), 'rb') as f:
+                    data = f.read()
+                os.utime(self.path(key))
+            except OSError:
+                data = None
+            with self._lock:
+                if data is None:
+                    self._forget_disk(key)
+                else:
+                    self._disk.move_to_end(key)
+                    self.disk_hits += 1
+                    self._remember(key, data)
+                    return data
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, data):
+        """
+        Store a document in memory and, if enabled, on disk.
+
+        Args:
+            key (str): Key from document_key()
+            data (bytes): Document content
+        """
+        with self._lock:
+            self._remember(key, data)
+            write_disk = self.disk_dir and key not in self._disk
+        if write_disk:
+            self._write_disk(key, data)
+
+    def discard(self, key):
+        """Remove a document from both tiers (e.g. after it failed verification)."""
+        with self._lock:
+            data = self._memory.pop(key, None)
+            if data is not None:
+                self._memory_bytes -= len(data)
+            on_disk = key in self._disk
+            self._forget_disk(key)
+        if on_disk:
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+
+    def _remember(self, key, data):
+        """Insert into the memory tier (caller holds the lock)."""
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        if len(data) > self.max_bytes:
+            return
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _forget_disk(self, key):
+        size = self._disk.pop(key, None)
+        if size is not None:
+            self._disk_bytes -= size
+
+    def _write_disk(self, key, data):
+        path = self.path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Document cache write error: {e}")
+            return
+
+        evict = []
+        with self._lock:
+            self._forget_disk(key)
+            self._disk[key] = len(data)
+            self._disk_bytes += len(data)
+            while self._disk_bytes > self.disk_max_bytes and len(self._disk) > 1:
+                old_key, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                evict.append(old_key)
+        for old_key in evict:
+            try:
+                os.remove(self.path(old_key))
+            except OSError:
+                pass
+
+    def clear(self):
+        """Drop all cached documents (memory and disk)."""
+        with self._lock:
+            keys = list(self._disk)
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._disk.clear()
+            self._disk_bytes = 0
+        for key in keys:
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        """
+        Cache counters.
+
+        Returns:
+            dict: entries, bytes and hit/miss counts per tier
+        """
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'disk_entries': len(self._disk),
+                'disk_bytes': self._disk_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            }
@@ -44,7 +44,6 @@ def install_dependencies():
     """Install required Python packages"""
     packages = [
         'kivy',
-        'python-barcode',
         'pillow',
         'pycups'
     ]
@@ -40,7 +40,7 @@ if [ -f "requirements_gui.txt" ]; then
 else
     echo "⚠ requirements_gui.txt not found"
     echo "  Installing Kivy and related packages manually..."
-    pip install kivy python-barcode pillow pycups
+    pip install kivy pillow pycups
 fi
 echo ""
 
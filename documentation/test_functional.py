@@ -15,7 +15,6 @@ def test_module_imports():
     
     modules = {
         'PIL': 'Image processing',
-        'barcode': 'Barcode generation',
         'cups': 'Printer interface',
         'print_label': 'Label printing module'
     }
@@ -109,7 +109,6 @@ def main():
     modules = [
         ('kivy', 'Kivy GUI Framework'),
         ('PIL', 'Pillow (Image Processing)'),
-        ('barcode', 'Barcode Generation'),
         ('cups', 'CUPS Interface'),
     ]
     
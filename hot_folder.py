@@ -0,0 +1,588 @@
+"""
+Hot Folder Watcher
+Prints job files dropped into watched folders, for systems (ERP/MES) that
+can write files but cannot call Python.
+
+A job file holds label records in any format the print queue imports
+(.csv, .jsonl, or one "SAP|CANTITATE|LOT" per line in .txt). Each watched
+folder gets three subfolders:
+
+    processing/   files claimed by a watcher (atomic rename)
+    done/         files whose labels all printed
+    error/        files with failed labels, plus a .error.txt report
+
+A file with values the barcodes cannot encode is rejected by the preflight
+check (label_preflight.py) before any of its labels print.
+
+Labels are printed through the print journal (print_journal.print_batch),
+one batch per file. A file recovered after a crash resumes at its first
+unconfirmed label instead of printing the whole file again; without a
+--journal the watcher keeps one in the watched folder (.hot_folder_journal.log).
+
+Writers should create the file under a temporary name (".tmp", ".part" or
+a leading dot) and rename it when complete; files written in place are
+picked up once they stop changing.
+
+New files are found with inotify on Linux (no polling). Elsewhere, or when
+inotify is unavailable, the folder is listed only when its mtime changes,
+so an idle folder costs one stat() per poll no matter how many files it
+holds.
+"""
+
+import os
+import time
+import errno
+import select
+import struct
+import threading
+from collections import deque
+
+from print_queue import read_import_batch
+from print_journal import PrintJournal, print_batch
+from label_preflight import preflight_batch
+
+
+JOB_SUFFIXES = ('.csv', '.jsonl', '.json', '.txt')
+IGNORED_SUFFIXES = ('.tmp', '.part')
+
+PROCESSING_DIR = 'processing'
+DONE_DIR = 'done'
+ERROR_DIR = 'error'
+
+# Journal kept in the (first) watched folder when none is given
+JOURNAL_NAME = '.hot_folder_journal.log'
+
+# inotify event bits (linux/inotify.h)
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_Q_OVERFLOW = 0x00004000
+_IN_NONBLOCK = 0o4000
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class _Inotify:
+    """Minimal inotify binding through ctypes (Linux only)"""
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._libc = libc
+        self.fd = libc.inotify_init1(_IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._folders = {}     # watch descriptor -> folder
+
+    def add_watch(self, folder):
+        import ctypes
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(folder),
+                                          _IN_CLOSE_WRITE | _IN_MOVED_TO)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {folder}')
+        self._folders[wd] = folder
+
+    def read(self, timeout):
+        """
+        Wait for events.
+
+        Returns:
+            list: (folder, name) pairs; (None, None) means events were lost
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                events.append((None, None))
+            elif wd in self._folders and name:
+                events.append((self._folders[wd], os.fsdecode(name)))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+def is_job_file(name):
+    """
+    Check whether a file name is a complete job file.
+
+    Args:
+        name (str): File name (no directory)
+
+    Returns:
+        bool: True for job suffixes, False for hidden or temporary files
+    """
+    lower = name.lower()
+    return (not name.startswith('.') and lower.endswith(JOB_SUFFIXES)
+            and not lower.endswith(IGNORED_SUFFIXES))
+
+
+class HotFolderWatcher:
+    """Watches folders for job files and prints their labels"""
+
+    def __init__(self, folders, printer=None, use_pdf=True, verify=True, journal=None,
+                 print_func=None, poll_interval=1.0, settle_time=1.0, use_inotify=True):
+        """
+        Initialize watcher.
+
+        Args:
+            folders (list): Folders to watch (created if missing)
+            printer (str): Target printer (None = render only)
+            use_pdf (bool): True for PDF labels, False for PNG
+            verify (bool): Decode the rendered barcodes before spooling
+            journal (PrintJournal): Job journal (default: JOURNAL_NAME in the
+                                    first folder, opened when printing to a printer)
+            print_func (callable): Replaces print_label_standalone(text, printer, batch_id=...)
+            poll_interval (float): Seconds between scans when inotify is not used
+            settle_time (float): Seconds a scanned file must be unchanged before it is claimed
+            use_inotify (bool): Use inotify where available
+        """
+        if isinstance(folders, str):
+            folders = [folders]
+        self.folders = [os.path.abspath(folder) for folder in folders]
+        self.printer = printer
+        self.use_pdf = use_pdf
+        self.verify = verify
+        self.journal = journal
+        self._own_journal = False
+        self._print_func = print_func
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self.use_inotify = use_inotify
+
+        self._pending = deque()        # (folder, name) ready to claim
+        self._queued = set()
+        self._unsettled = {}           # (folder, name) -> (size, mtime_ns) at last scan
+        self._folder_mtimes = {}
+        self._inotify = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.files_done = 0
+        self.files_failed = 0
+        self.labels_printed = 0
+        self.labels_failed = 0
+
+        for folder in self.folders:
+            for sub in (PROCESSING_DIR, DONE_DIR, ERROR_DIR):
+                os.makedirs(os.path.join(folder, sub), exist_ok=True)
+
+        if journal is None and printer and print_func is None:
+            self.journal = PrintJournal(os.path.join(self.folders[0], JOURNAL_NAME))
+            self._own_journal = True
+
+    # -- discovery ------------------------------------------------------------
+
+    def _start_inotify(self):
+        if not self.use_inotify:
+            return None
+        try:
+            inotify = _Inotify()
+            for folder in self.folders:
+                inotify.add_watch(folder)
+        except (OSError, AttributeError) as e:
+            print(f"inotify not available ({e}); scanning folders instead")
+            return None
+        return inotify
+
+    def _enqueue(self, folder, name):
+        key = (folder, name)
+        if key not in self._queued:
+            self._queued.add(key)
+            self._pending.append(key)
+
+    def scan(self, force=False):
+        """
+        Find job files in the watched folders.
+
+        A folder is listed only if its mtime changed since the last scan
+        (or force is set). Files still being written are held back until
+        they stop changing for settle_time seconds.
+
+        Args:
+            force (bool): List every folder even if unchanged
+        """
+        for folder in self.folders:
+            try:
+                mtime = os.stat(folder).st_mtime_ns
+            except OSError as e:
+                print(f"Hot folder unavailable: {folder} ({e})")
+                continue
+            if not force and self._folder_mtimes.get(folder) == mtime:
+                continue
+            self._folder_mtimes[folder] = mtime
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    key = (folder, entry.name)
+                    if (key not in self._queued and key not in self._unsettled
+                            and is_job_file(entry.name) and entry.is_file()):
+                        self._unsettled[key] = None
+        self._check_unsettled()
+
+    def _check_unsettled(self):
+        """Queue scanned files that have not changed for settle_time."""
+        if not self._unsettled:
+            return
+        now = time.time_ns()
+        settle_ns = int(self.settle_time * 1e9)
+        for key, previous in list(self._unsettled.items()):
+            try:
+                stat = os.stat(os.path.join(*key))
+            except OSError:
+                del self._unsettled[key]
+                continue
+            current = (stat.st_size, stat.st_mtime_ns)
+            # A file already older than settle_time when first seen is complete
+            if (previous is None or current == previous) and now - stat.st_mtime_ns >= settle_ns:
+                del self._unsettled[key]
+                self._enqueue(*key)
+            else:
+                self._unsettled[key] = current
+
+    def _wait_for_files(self):
+        """Block until files are pending, the poll interval passes or stop() is called."""
+        if self._inotify is None:
+            self._stop.wait(self.poll_interval)
+            self.scan()
+            return
+        for folder, name in self._inotify.read(self.poll_interval):
+            if folder is None:
+                # Event queue overflowed: fall back to one full listing
+                self.scan(force=True)
+            elif is_job_file(name):
+                self._enqueue(folder, name)
+        self._check_unsettled()
+
+    # -- processing -----------------------------------------------------------
+
+    def claim(self, folder, name):
+        """
+        Move a job file into processing/ so no other watcher takes it.
+
+        Returns:
+            str or None: Claimed path, or None if another process got it first
+        """
+        # The "pid.start-" prefix marks the owner (the start time tells a
+        # reused pid apart); the suffix still selects the parser
+        owner = f"{os.getpid()}.{_process_start(os.getpid())}".rstrip('.')
+        claimed = os.path.join(folder, PROCESSING_DIR, f"{owner}-{name}")
+        try:
+            os.rename(os.path.join(folder, name), claimed)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                print(f"Cannot claim {name}: {e}")
+            return None
+        return claimed
+
+    def _print(self, text, batch_id):
+        if self._print_func is not None:
+            return self._print_func(text, self.printer, batch_id=batch_id)
+        if not self.printer:
+            from print_label import create_label_pdf
+            create_label_pdf(text)
+            return True
+        from print_label import print_label_standalone
+        return print_label_standalone(text, self.printer, preview=0, use_pdf=self.use_pdf,
+                                      verify=self.verify, journal=self.journal,
+                                      batch_id=batch_id)
+
+    @property
+    def _resumable(self):
+        """True if labels go through the journal (print_batch) and can resume."""
+        return self._print_func is None and bool(self.printer) and self.journal is not None
+
+    @staticmethod
+    def batch_id(path, name):
+        """
+        Journal batch id of a job file.
+
+        The file name identifies the batch; its modification time (kept by
+        the claim and recover renames) tells apart a new file dropped later
+        under the same name.
+
+        Args:
+            path (str): Current path of the file
+            name (str): Job file name as dropped
+
+        Returns:
+            str: Batch id
+        """
+        return f"{name}@{os.stat(path).st_mtime_ns}"
+
+    def _print_each(self, texts, name, errors):
+        """Print labels one by one (render only or custom print_func); returns labels printed."""
+        printed = 0
+        for line, text in enumerate(texts, 1):
+            try:
+                ok = self._print(text, name)
+            except Exception as e:
+                ok = False
+                errors.append(f"record {line} ({text}): {e}")
+            else:
+                if not ok:
+                    errors.append(f"record {line} ({text}): print failed")
+            if ok:
+                printed += 1
+        return printed
+
+    def _print_batch(self, texts, batch_id, errors):
+        """
+        Print labels as a journaled batch, skipping labels confirmed by an earlier run.
+
+        Returns:
+            int: Labels printed or confirmed earlier
+        """
+        try:
+            summary = print_batch(texts, self.printer, self.journal, batch_id,
+                                  use_pdf=self.use_pdf, verify=self.verify)
+        except Exception as e:
+            errors.append(f"batch failed: {e}")
+            return 0
+        if summary['skipped']:
+            print(f"Hot folder: {summary['skipped']} label(s) of {batch_id} already printed, skipped")
+        unconfirmed = set(summary['unconfirmed'])
+        for job in self.journal.unconfirmed(batch_id):
+            line = int(job.job_id.rpartition(':')[2]) + 1
+            if job.job_id in unconfirmed:
+                errors.append(f"record {line} ({job.text}): may have printed before a crash, "
+                              f"not printed again")
+            else:
+                errors.append(f"record {line} ({job.text}): {job.error or 'print failed'}")
+        return summary['printed'] + summary['skipped']
+
+    def process_file(self, folder, name):
+        """
+        Claim a job file, print its labels and file it under done/ or error/.
+
+        Args:
+            folder (str): Watched folder
+            name (str): Job file name
+
+        Returns:
+            bool or None: True if every label printed, False on any failure,
+                          None if the file was claimed by someone else
+        """
+        claimed = self.claim(folder, name)
+        if claimed is None:
+            return None
+
+        errors = []
+        try:
+            batch = read_import_batch(claimed)
+        except (OSError, ValueError) as e:
+            batch = None
+            errors.append(f"cannot read file: {e}")
+        else:
+            # A file with unprintable values is rejected before any label prints
+            errors.extend(str(issue) for issue in preflight_batch(batch))
+        texts = [] if errors else list(batch.texts())
+
+        if texts and self._resumable:
+            printed = self._print_batch(texts, self.batch_id(claimed, name), errors)
+        else:
+            printed = self._print_each(texts, name, errors)
+
+        self.labels_printed += printed
+        self.labels_failed += len(texts) - printed
+        target = os.path.join(folder, ERROR_DIR if errors else DONE_DIR, name)
+        if os.path.exists(target):
+            stem, suffix = os.path.splitext(name)
+            target = os.path.join(os.path.dirname(target),
+                                  f"{stem}_{time.strftime('%Y%m%d_%H%M%S')}{suffix}")
+        os.replace(claimed, target)
+
+        if errors:
+            self.files_failed += 1
+            with open(target + '.error.txt', 'w', encoding='utf-8') as f:
+                f.write('\n'.join(errors) + '\n')
+            print(f"Hot folder: {name} - {printed}/{len(texts)} labels printed, "
+                  f"{len(errors)} error(s)")
+            return False
+        self.files_done += 1
+        print(f"Hot folder: {name} - {printed} labels printed")
+        return True
+
+    def recover(self):
+        """
+        Return files claimed by watchers that are no longer running.
+
+        Claimed files carry the owner's pid and process start time; after a
+        crash (owner gone, or its pid now used by another process) they are
+        moved back to the watched folder. With a journal, only their labels
+        that were not confirmed print again.
+
+        Returns:
+            int: Number of files returned
+        """
+        recovered = 0
+        for folder in self.folders:
+            processing = os.path.join(folder, PROCESSING_DIR)
+            for claimed in os.listdir(processing):
+                owner, _, name = claimed.partition('-')
+                pid, _, started = owner.partition('.')
+                if not pid.isdigit() or not name or _owner_alive(int(pid), started):
+                    continue
+                try:
+                    os.rename(os.path.join(processing, claimed), os.path.join(folder, name))
+                except OSError as e:
+                    print(f"Cannot recover {claimed}: {e}")
+                    continue
+                print(f"Hot folder: recovered {name} from an interrupted run")
+                recovered += 1
+        return recovered
+
+    # -- service --------------------------------------------------------------
+
+    def run(self):
+        """Process job files until stop() is called (blocking)."""
+        if self._own_journal:
+            # Keeps only the ids of printed labels from earlier runs
+            self.journal.compact()
+        self.recover()
+        self._inotify = self._start_inotify()
+        try:
+            # Files dropped before the watcher started
+            self.scan(force=True)
+            while not self._stop.is_set():
+                while self._pending and not self._stop.is_set():
+                    key = self._pending.popleft()
+                    self._queued.discard(key)
+                    try:
+                        self.process_file(*key)
+                    except OSError as e:
+                        print(f"Hot folder error ({key[1]}): {e}")
+                if not self._stop.is_set():
+                    self._wait_for_files()
+        finally:
+            if self._inotify is not None:
+                self._inotify.close()
+                self._inotify = None
+            if self._own_journal:
+                self.journal.sync()
+
+    def start(self):
+        """Run the watcher on a background thread (no-op if already running)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name='hot-folder', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Stop after the current file."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self):
+        """
+        Watcher counters.
+
+        Returns:
+            dict: Files done/failed, labels printed/failed and files waiting
+        """
+        return {
+            'files_done': self.files_done,
+            'files_failed': self.files_failed,
+            'labels_printed': self.labels_printed,
+            'labels_failed': self.labels_failed,
+            'files_pending': len(self._pending) + len(self._unsettled),
+            'inotify': self._inotify is not None,
+        }
+
+
+# Windows process access right and GetExitCodeProcess() value of a running process
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+_STILL_ACTIVE = 259
+_ERROR_ACCESS_DENIED = 5
+
+
+def _kernel32():
+    import ctypes
+    return ctypes.WinDLL('kernel32', use_last_error=True)
+
+
+def _pid_alive(pid):
+    """True if a process with this pid exists."""
+    if pid == os.getpid():
+        return True
+    if os.name == 'nt':
+        # os.kill(pid, 0) would send CTRL_C_EVENT on Windows
+        import ctypes
+        kernel32 = _kernel32()
+        handle = kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            # Exists but belongs to another user, or no such process
+            return ctypes.get_last_error() == _ERROR_ACCESS_DENIED
+        try:
+            exit_code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+                return True
+            return exit_code.value == _STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists but belongs to another user (or the check is unsupported)
+        return True
+    return True
+
+
+def _process_start(pid):
+    """
+    Start time of a process, as an opaque integer string.
+
+    Returns:
+        str: Start time ('' if it cannot be read on this platform)
+    """
+    if os.name == 'nt':
+        import ctypes
+        kernel32 = _kernel32()
+        handle = kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return ''
+        try:
+            times = [ctypes.c_ulonglong() for _ in range(4)]
+            if not kernel32.GetProcessTimes(handle, *(ctypes.byref(t) for t in times)):
+                return ''
+            return str(times[0].value)
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as f:
+            stat = f.read()
+    except OSError:
+        return ''
+    # Field 22 (starttime, clock ticks after boot); the command name may contain spaces
+    return stat.rpartition(b')')[2].split()[19].decode('ascii')
+
+
+def _owner_alive(pid, started):
+    """
+    True if the watcher that claimed a file is still running.
+
+    Args:
+        pid (int): Pid from the claimed file name
+        started (str): Process start time from the name ('' for old names)
+    """
+    if not _pid_alive(pid):
+        return False
+    if started:
+        current = _process_start(pid)
+        # The pid was reused by a process started later
+        if current and current != started:
+            return False
+    return True
+
@@ -0,0 +1,606 @@
+#!/usr/bin/env python3
+"""
+Label Printer - Command Line Interface
+Headless entry point for rendering and printing labels without Kivy.
+
+Single labels:
+    python label_cli.py render "SAP123|100|REEL001" -o label.pdf
+    python label_cli.py print --sap SAP123 --qty 100 --lot REEL001 --printer Zebra
+    python label_cli.py printers
+
+Print history (labels printed with --history are recorded):
+    python label_cli.py print "SAP123|100|REEL001" --printer Zebra --history print_history.db
+    python label_cli.py history REEL0
+    python label_cli.py reprint 1234 --printer Zebra2
+
+SAP catalog for autocomplete (see sap_autocomplete.py):
+    python label_cli.py catalog sap_catalog.csv
+    python label_cli.py suggest 1234
+
+Profiling (writes .pstats and flame-graph .collapsed files to profiles/):
+    python label_cli.py --profile cprofile:100 pipe --printer Zebra < records.jsonl
+    LABEL_PROFILE=sample:60 python label_cli.py watch /srv/labels/in --printer Zebra
+
+Batch preflight (lists rows the barcodes cannot encode, exit code 1 if any):
+    python label_cli.py preflight labels.csv
+
+Batch files as multi-page print jobs (preflighted, resumable with --journal):
+    python label_cli.py batch labels.csv --printer Zebra --journal print_journal.log
+    python label_cli.py batch labels.csv -o labels.pdf
+
+Serial numbers and quantity splits (see label_sequence.py):
+    python label_cli.py sequence --sap SAP123 --qty 100 --lot L123- --start 1 --stop 2000 --width 4 --printer Zebra
+    python label_cli.py sequence --sap SAP123 --qty 100 --lot L123- --counter L123 --count 50 --printer Zebra
+    python label_cli.py sequence --sap SAP123 --lot REEL001 --total 1000 --per-label 300 -o split.pdf
+
+    A range is printed (or written) as multi-page PDFs of
+    --pages-per-document labels, one print job each (split.pdf,
+    split_0002.pdf, ... when rendering).
+
+Hot folder (prints job files dropped by other systems, see hot_folder.py):
+    python label_cli.py watch /srv/labels/in --printer Zebra
+
+Render daemon for thin-client GUIs (see label_daemon.py):
+    python label_cli.py serve                      # this machine only (127.0.0.1:8731)
+    LABEL_DAEMON_TOKEN=secret python label_cli.py serve --listen 0.0.0.0:8731
+
+Pipe mode (long-running, one JSON record per line on stdin):
+    mes_export | python label_cli.py pipe --printer Zebra
+
+    Input:  {"id": "42", "sap": "SAP123", "qty": "100", "lot": "REEL001"}
+            {"id": "43", "text": "SAP123|100|REEL002", "printer": "Zebra2"}
+    Output: {"id": "42", "ok": true, "file": "pdf_backup/final_label_....pdf", "ms": 7.1}
+
+    A record may carry an idempotency "key"; a repeated key within the
+    duplicate window is not printed again and is answered with
+    {"id": ..., "ok": true, "duplicate": true}.
+
+The process keeps the PDF generator (barcode cache), one continuous PDF label
+session and the CUPS connection open between records; every record goes
+through the same preflight, verification, journal and history steps as a
+GUI print. Diagnostic messages go to stderr so stdout carries only result
+lines.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+
+from print_label import (
+    create_label_pdf,
+    create_label_image,
+    verify_label_image,
+    get_pdf_generator,
+    get_available_printers,
+    print_label_standalone,
+    print_label_batch,
+    print_label_job,
+    reprint_label,
+    set_print_history,
+    get_print_history,
+    start_warm_up,
+    set_document_cache,
+    verify_pdf_record,
+)
+import label_profiler
+from label_record import LabelRecord, build_label_text, record_text
+from print_label_pdf import PAGES_PER_DOCUMENT
+from print_journal import PrintJournal
+from printer_pool import load_printer_pools
+from document_cache import DocumentCache
+from print_history import PrintHistory, HISTORY_FILE, SEARCH_FIELDS
+from hot_folder import HotFolderWatcher
+from print_queue import read_import_batch
+from label_preflight import preflight_batch
+from label_daemon import LabelDaemon, DEFAULT_ADDRESS, TOKEN_ENV
+from sap_autocomplete import (
+    SapAutocomplete, CatalogIndex, read_catalog, build_index, INDEX_FILE,
+)
+from label_sequence import (
+    SEQUENCE_FIELDS, COUNTER_FILE, CounterStore, counter_values, split_quantity,
+    reserve_counter_values, create_sequence_pdf, print_sequence,
+)
+
+
+def render_label(text, use_pdf=True, output=None, verify=True):
+    """
+    Render one label to a file.
+
+    Args:
+        text (str): Combined label text
+        use_pdf (bool): True for PDF, False for PNG
+        output (str): Output path (PDFs default to pdf_backup, PNGs to final_label.png)
+        verify (bool): Decode the rendered barcodes before returning
+
+    Returns:
+        tuple: (file path, list of verification failures)
+    """
+    failures = []
+    record = LabelRecord.parse(text)
+    if use_pdf:
+        if output:
+            file_path = get_pdf_generator().create_label_pdf(record, filename=output)
+        else:
+            file_path = create_label_pdf(record)
+        if verify:
+            failures = verify_pdf_record(record)
+    else:
+        file_path = output or 'final_label.png'
+        with create_label_image(record) as label_img:
+            label_img.save(file_path)
+            if verify:
+                failures = verify_label_image(label_img, record)
+    return file_path, failures
+
+
+def process_record(record, printer=None, use_pdf=True, verify=True, journal=None,
+                   session=None):
+    """
+    Render (and optionally print) one pipe-mode record.
+
+    Args:
+        record (dict): Decoded JSON record
+        printer (str): Default printer (None = render only); a record's
+                       "printer" key overrides it
+        use_pdf (bool): True for PDF, False for PNG
+        verify (bool): Decode the rendered barcodes before spooling
+        journal (PrintJournal): Optional job journal
+        session (PDFLabelSession): Session PDF labels are drawn with
+
+    Returns:
+        dict: Result line for stdout
+    """
+    started = time.perf_counter()
+    result = {'id': record.get('id')}
+    printer = record.get('printer', printer)
+    key = record.get('key')
+    job_id = str(record['id']) if printer and record.get('id') is not None else None
+    try:
+        outcome = print_label_job(record_text(record), printer, use_pdf=use_pdf,
+                                  verify=verify, journal=journal, job_id=job_id,
+                                  idempotency_key=None if key is None else str(key),
+                                  session=session)
+    except Exception as e:
+        outcome = {'ok': False, 'error': str(e)}
+    result.update(outcome)
+    if printer and 'file' in outcome:
+        result['printer'] = printer
+    result['ms'] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+def run_pipe(input_stream, output_stream, printer=None, use_pdf=True, verify=True, journal=None,
+             session=None):
+    """
+    Process JSON-lines records until end of input.
+
+    Blank lines are skipped; malformed lines produce an error result line
+    instead of stopping the process.
+
+    Args:
+        input_stream: Text stream with one JSON object per line
+        output_stream: Text stream for result lines
+        printer (str): Default printer (None = render only)
+        use_pdf (bool): True for PDF, False for PNG
+        verify (bool): Decode the rendered barcodes before spooling
+        journal (PrintJournal): Optional job journal
+        session (PDFLabelSession): Session PDF labels are drawn with
+
+    Returns:
+        int: Number of failed records
+    """
+    failed = 0
+    for line in input_stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("record must be a JSON object")
+        except ValueError as e:
+            result = {'id': None, 'ok': False, 'error': f"invalid record: {e}"}
+        else:
+            result = process_record(record, printer, use_pdf, verify, journal, session)
+
+        if not result['ok']:
+            failed += 1
+        output_stream.write(json.dumps(result) + '\n')
+        output_stream.flush()
+    return failed
+
+
+def sequence_job(args):
+    """
+    Expand the sequence subcommand options into a sequence job.
+
+    The varying field's value from --sap/--qty/--lot is used as the
+    prefix of the counter.
+
+    Args:
+        args (argparse.Namespace): Parsed sequence options
+
+    Returns:
+        tuple: (sap_nr, cantitate, lot_number, field, values)
+
+    Raises:
+        ValueError: If the options do not describe one sequence
+    """
+    fields = {'sap_nr': args.sap, 'cantitate': args.qty, 'lot_number': args.lot}
+    if args.total is not None:
+        if args.per_label is None:
+            raise ValueError("--total needs --per-label")
+        field = 'cantitate'
+        values = list(split_quantity(args.total, args.per_label))
+    else:
+        field = args.field
+        prefix = fields[field]
+        if args.counter:
+            if args.count is None:
+                raise ValueError("--counter needs --count")
+            values = list(reserve_counter_values(
+                CounterStore(args.counters), args.counter, args.count, width=args.width,
+                prefix=prefix, suffix=args.suffix, start=args.start, step=args.step))
+        else:
+            if (args.stop is None) == (args.count is None):
+                raise ValueError("give either --stop or --count (or --counter/--total)")
+            stop = args.stop if args.stop is not None else args.start + (args.count - 1) * args.step
+            values = list(counter_values(args.start, stop, args.step, args.width,
+                                         prefix, args.suffix))
+    if not values:
+        raise ValueError("the sequence has no labels")
+    return fields['sap_nr'], fields['cantitate'], fields['lot_number'], field, values
+
+
+def build_parser():
+    """Create the argument parser."""
+    parser = argparse.ArgumentParser(
+        prog='label_cli.py',
+        description='Render and print SAP/quantity/lot barcode labels without the GUI.'
+    )
+    parser.add_argument('--profile', metavar='MODE',
+                        help='Profile the print pipeline: cprofile[:JOBS] or sample[:SECONDS] '
+                             '(results in profiles/)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_label_args(sub):
+        sub.add_argument('text', nargs='?', help='Combined label text "SAP|CANTITATE|LOT"')
+        sub.add_argument('--sap', default='', help='SAP article number')
+        sub.add_argument('--qty', default='', help='Quantity')
+        sub.add_argument('--lot', default='', help='Lot / cable reel ID')
+        sub.add_argument('--png', action='store_true', help='Use PNG instead of PDF')
+        sub.add_argument('--no-verify', action='store_true', help='Skip barcode verification')
+        sub.add_argument('--cache-dir', help='Keep rendered PDFs in this folder for reprints')
+
+    render = subparsers.add_parser('render', help='Render a label to a file')
+    add_label_args(render)
+    render.add_argument('-o', '--output', help='Output file (default: pdf_backup/...)')
+
+    print_cmd = subparsers.add_parser('print', help='Render and print a label')
+    add_label_args(print_cmd)
+    print_cmd.add_argument('--printer', default='PDF', help='Printer name (default: PDF)')
+    print_cmd.add_argument('--preview', type=int, default=0, help='Preview countdown (0 = none)')
+    print_cmd.add_argument('--journal', help='Record the job in this journal file')
+    print_cmd.add_argument('--history', help='Record the label in this print history database')
+
+    subparsers.add_parser('printers', help='List available printers')
+
+    history = subparsers.add_parser('history', help='Search printed labels')
+    history.add_argument('prefix', nargs='?', default='', help='SAP or lot/cable ID prefix')
+    history.add_argument('--field', choices=SEARCH_FIELDS, help='Search only this field')
+    history.add_argument('--limit', type=int, default=50, help='Maximum results')
+    history.add_argument('--db', default=HISTORY_FILE, help='Print history database')
+
+    reprint = subparsers.add_parser('reprint', help='Print a label from the history again')
+    reprint.add_argument('entry_id', type=int, help='History entry id (see history)')
+    reprint.add_argument('--printer', help='Printer (default: the original printer)')
+    reprint.add_argument('--db', default=HISTORY_FILE, help='Print history database')
+
+    pipe = subparsers.add_parser('pipe', help='Process JSON-lines records from stdin')
+    pipe.add_argument('--printer', help='Default printer (omit to only render)')
+    pipe.add_argument('--png', action='store_true', help='Use PNG instead of PDF')
+    pipe.add_argument('--no-verify', action='store_true', help='Skip barcode verification')
+    pipe.add_argument('--journal', help='Record print jobs in this journal file')
+    pipe.add_argument('--history', help='Record printed labels in this print history database')
+    pipe.add_argument('--cache-dir', help='Keep rendered PDFs in this folder for reprints')
+
+    catalog = subparsers.add_parser('catalog', help='Build the SAP autocomplete index')
+    catalog.add_argument('file', help='Catalog file (.csv: SAP number, description)')
+    catalog.add_argument('--index', default=INDEX_FILE, help='Index file to write')
+
+    suggest = subparsers.add_parser('suggest', help='Show SAP autocomplete suggestions')
+    suggest.add_argument('prefix', help='Typed SAP prefix')
+    suggest.add_argument('--index', default=INDEX_FILE, help='Catalog index file')
+    suggest.add_argument('--db', default=HISTORY_FILE,
+                         help='Print history used to rank recent and frequent numbers')
+    suggest.add_argument('--limit', type=int, default=8, help='Maximum suggestions')
+
+    preflight = subparsers.add_parser('preflight', help='Check a batch file before printing')
+    preflight.add_argument('file', help='Batch file (.csv, .jsonl or .txt)')
+    preflight.add_argument('--limit', type=int, default=None, help='Report at most this many rows')
+
+    batch = subparsers.add_parser('batch', help='Print or render every label of a batch file')
+    batch.add_argument('file', help='Batch file (.csv, .jsonl or .txt)')
+    batch.add_argument('--printer', help='Printer (omit to render PDFs)')
+    batch.add_argument('-o', '--output', help='Output PDF when rendering (default: pdf_backup/...)')
+    batch.add_argument('--pages-per-document', type=int, default=PAGES_PER_DOCUMENT,
+                       help=f'Labels per PDF document and print job (default: {PAGES_PER_DOCUMENT})')
+    batch.add_argument('--no-verify', action='store_true', help='Skip barcode verification')
+    batch.add_argument('--journal', help='Record the job in this journal file (resumable)')
+    batch.add_argument('--batch-id', help='Journal batch id (default: file name and mtime)')
+    batch.add_argument('--history', help='Record printed labels in this print history database')
+    batch.add_argument('--cache-dir', help='Keep rendered PDFs in this folder for reprints')
+
+    sequence = subparsers.add_parser('sequence', help='Print or render a serial-number range')
+    sequence.add_argument('--sap', default='', help='SAP article number')
+    sequence.add_argument('--qty', default='', help='Quantity')
+    sequence.add_argument('--lot', default='', help='Lot / cable reel ID')
+    sequence.add_argument('--field', choices=SEQUENCE_FIELDS, default='lot_number',
+                          help='Field that counts; its value above is the prefix '
+                               '(default: lot_number)')
+    sequence.add_argument('--start', type=int, default=1, help='First number (default: 1)')
+    sequence.add_argument('--stop', type=int, help='Last number (inclusive)')
+    sequence.add_argument('--count', type=int, help='Number of labels (instead of --stop)')
+    sequence.add_argument('--step', type=int, default=1, help='Increment (default: 1)')
+    sequence.add_argument('--width', type=int, default=0, help='Zero-pad numbers to this width')
+    sequence.add_argument('--suffix', default='', help='Text after the number')
+    sequence.add_argument('--counter', help='Take --count numbers from this persistent counter')
+    sequence.add_argument('--counters', default=COUNTER_FILE, help='Counter file')
+    sequence.add_argument('--total', type=int, help='Split this quantity over several labels')
+    sequence.add_argument('--per-label', type=int, help='Maximum quantity per label (--total)')
+    sequence.add_argument('--printer', help='Printer (omit to render one PDF)')
+    sequence.add_argument('-o', '--output', help='Output PDF when rendering (default: pdf_backup/...)')
+    sequence.add_argument('--pages-per-document', type=int, default=PAGES_PER_DOCUMENT,
+                          help=f'Labels per PDF document and print job (default: {PAGES_PER_DOCUMENT})')
+    sequence.add_argument('--png', action='store_true', help='Print PNG instead of PDF labels')
+    sequence.add_argument('--no-verify', action='store_true', help='Skip barcode verification')
+    sequence.add_argument('--journal', help='Record the job in this journal file (resumable)')
+    sequence.add_argument('--batch-id', help='Journal batch id (default: derived from the job)')
+    sequence.add_argument('--history', help='Record printed labels in this print history database')
+    sequence.add_argument('--cache-dir', help='Keep rendered PDFs in this folder for reprints')
+
+    watch = subparsers.add_parser('watch', help='Print job files dropped into folders')
+    watch.add_argument('folders', nargs='+', help='Folders to watch')
+    watch.add_argument('--printer', help='Printer (omit to only render)')
+    watch.add_argument('--png', action='store_true', help='Use PNG instead of PDF')
+    watch.add_argument('--no-verify', action='store_true', help='Skip barcode verification')
+    watch.add_argument('--journal', help='Record print jobs in this journal file')
+    watch.add_argument('--history', help='Record printed labels in this print history database')
+    watch.add_argument('--cache-dir', help='Keep rendered PDFs in this folder for reprints')
+    watch.add_argument('--poll', type=float, default=1.0,
+                       help='Seconds between folder scans without inotify')
+
+    serve = subparsers.add_parser('serve', help='Render and print for thin-client GUIs')
+    serve.add_argument('--listen', default=DEFAULT_ADDRESS,
+                       help=f'host:port or unix:/path (default: {DEFAULT_ADDRESS})')
+    serve.add_argument('--journal', help='Record print jobs in this journal file')
+    serve.add_argument('--history', default=HISTORY_FILE,
+                       help='Print history database searched by the clients')
+    serve.add_argument('--cache-dir', help='Keep rendered PDFs in this folder for reprints')
+    serve.add_argument('--token', default=os.environ.get(TOKEN_ENV),
+                       help=f'Shared token clients must send (default: ${TOKEN_ENV}); '
+                            f'required for non-loopback addresses')
+    serve.add_argument('--insecure', action='store_true',
+                       help='Allow a non-loopback address without a token')
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list): Arguments (default: sys.argv[1:])
+
+    Returns:
+        int: Process exit code
+    """
+    args = build_parser().parse_args(argv)
+    stdout = sys.stdout
+    load_printer_pools()
+    if getattr(args, 'cache_dir', None):
+        set_document_cache(DocumentCache(disk_dir=args.cache_dir))
+    history_path = getattr(args, 'db', None) or getattr(args, 'history', None)
+    history = PrintHistory(history_path) if history_path else None
+    set_print_history(history)
+    if args.profile:
+        try:
+            label_profiler.enable(args.profile)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+    else:
+        # LABEL_PROFILE=cprofile:N or sample:SECONDS
+        label_profiler.enable_from_environment()
+    try:
+        return run_command(args, stdout)
+    finally:
+        label_profiler.stop()
+        set_print_history(None)
+        if history is not None:
+            history.close()
+
+
+def run_command(args, stdout):
+    """Run a parsed subcommand (see main)."""
+
+    # Library code reports progress with print(); keep stdout for results
+    with contextlib.redirect_stdout(sys.stderr):
+        # Long-running modes warm up while waiting for their first record
+        if args.command in ('pipe', 'watch'):
+            start_warm_up(use_pdf=not args.png, use_png=args.png, verify=not args.no_verify)
+        elif args.command == 'serve':
+            start_warm_up()
+
+        if args.command == 'printers':
+            for name in get_available_printers():
+                stdout.write(name + '\n')
+            return 0
+
+        if args.command == 'history':
+            for entry in get_print_history().search(args.prefix, args.field, args.limit):
+                stdout.write(f"{entry.entry_id}\t{entry.summary()}\n")
+            return 0
+
+        if args.command == 'reprint':
+            return 0 if reprint_label(args.entry_id, args.printer) else 1
+
+        if args.command == 'catalog':
+            count = build_index(read_catalog(args.file), args.index)
+            print(f"{count} articles written to {args.index}")
+            return 0
+
+        if args.command == 'suggest':
+            index = CatalogIndex(args.index) if os.path.exists(args.index) else None
+            autocomplete = SapAutocomplete(index)
+            autocomplete.load_usage(get_print_history().value_usage())
+            for value, description in autocomplete.suggest(args.prefix, args.limit):
+                stdout.write(f"{value}\t{description}\n")
+            autocomplete.close()
+            return 0
+
+        if args.command == 'preflight':
+            batch = read_import_batch(args.file)
+            issues = preflight_batch(batch, max_issues=args.limit)
+            for issue in issues:
+                stdout.write(f"{issue}\n")
+            print(f"{len(batch)} records, {len(issues)} invalid value(s)")
+            return 1 if issues else 0
+
+        if args.command == 'batch':
+            records = read_import_batch(args.file)
+            if not args.printer:
+                issues = preflight_batch(records)
+                if issues:
+                    for issue in issues:
+                        print(f"Label rejected: {issue}")
+                    return 1
+                filename = args.output or os.path.join(
+                    'pdf_backup', f"batch_{time.strftime('%Y%m%d_%H%M%S')}.pdf")
+                os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+                for path in get_pdf_generator().write_batch_pdfs(records, filename,
+                                                                 args.pages_per_document):
+                    stdout.write(os.path.abspath(path) + '\n')
+                return 0
+            journal = PrintJournal(args.journal) if args.journal else None
+            batch_id = args.batch_id or HotFolderWatcher.batch_id(
+                args.file, os.path.basename(args.file))
+            try:
+                summary = print_label_batch(records, args.printer, journal, batch_id,
+                                            verify=not args.no_verify,
+                                            pages_per_document=args.pages_per_document)
+            except ValueError as e:
+                print(f"Error: {e}")
+                return 2
+            finally:
+                if journal is not None:
+                    journal.close()
+            stdout.write(json.dumps(summary) + '\n')
+            return 1 if summary['failed'] or summary['unconfirmed'] else 0
+
+        if args.command == 'sequence':
+            try:
+                job = sequence_job(args)
+            except ValueError as e:
+                print(f"Error: {e}")
+                return 2
+            if not args.printer:
+                for path in create_sequence_pdf(*job, filename=args.output,
+                                                generator=get_pdf_generator(),
+                                                pages_per_document=args.pages_per_document):
+                    stdout.write(os.path.abspath(path) + '\n')
+                return 0
+            journal = PrintJournal(args.journal) if args.journal else None
+            try:
+                summary = print_sequence(args.printer, *job, journal=journal,
+                                         batch_id=args.batch_id, use_pdf=not args.png,
+                                         verify=not args.no_verify,
+                                         pages_per_document=args.pages_per_document)
+            except ValueError as e:
+                print(f"Error: {e}")
+                return 2
+            finally:
+                if journal is not None:
+                    journal.close()
+            stdout.write(json.dumps(summary) + '\n')
+            return 1 if summary['failed'] or summary['unconfirmed'] else 0
+
+        if args.command == 'watch':
+            journal = PrintJournal(args.journal) if args.journal else None
+            watcher = HotFolderWatcher(args.folders, args.printer, use_pdf=not args.png,
+                                       verify=not args.no_verify, journal=journal,
+                                       poll_interval=args.poll)
+            try:
+                watcher.run()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                if journal is not None:
+                    journal.close()
+            return 0
+
+        if args.command == 'serve':
+            journal = PrintJournal(args.journal) if args.journal else None
+            try:
+                daemon = LabelDaemon(args.listen, journal=journal, token=args.token,
+                                     insecure=args.insecure)
+            except ValueError as e:
+                print(f"Error: {e}")
+                if journal is not None:
+                    journal.close()
+                return 2
+            try:
+                daemon.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                if journal is not None:
+                    journal.close()
+            return 0
+
+        if args.command == 'pipe':
+            journal = PrintJournal(args.journal) if args.journal else None
+            # One continuous session for the whole stream of records
+            session = None if args.png else get_pdf_generator().open_session(args.printer)
+            try:
+                failed = run_pipe(sys.stdin, stdout, args.printer, not args.png,
+                                  not args.no_verify, journal, session)
+            except KeyboardInterrupt:
+                failed = 0
+            finally:
+                if session is not None:
+                    session.close()
+                if journal is not None:
+                    journal.close()
+            return 1 if failed else 0
+
+        text = build_label_text(args.sap, args.qty, args.lot, args.text)
+        if text.replace('|', '').strip() == '':
+            print("Error: enter label text or at least one of --sap, --qty, --lot")
+            return 2
+
+        if args.command == 'render':
+            file_path, failures = render_label(text, not args.png, args.output,
+                                               not args.no_verify)
+            for failure in failures:
+                print(f"Barcode verification failed: {failure}")
+            stdout.write(os.path.abspath(file_path) + '\n')
+            return 1 if failures else 0
+
+        journal = PrintJournal(args.journal) if args.journal else None
+        try:
+            success = print_label_standalone(text, args.printer, preview=args.preview,
+                                             use_pdf=not args.png,
+                                             verify=not args.no_verify, journal=journal)
+        finally:
+            if journal is not None:
+                journal.close()
+        return 0 if success else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,536 @@
+"""
+Label Render Daemon
+Long-lived render and print service for thin-client GUIs.
+
+One strong machine on the line runs the daemon (label_cli.py serve). It
+keeps the PDF generator, document cache, CUPS connection and printer
+status warm and serves any number of GUI instances at once. A GUI started
+with LABEL_DAEMON=<address> renders nothing itself: it does not import
+PIL or reportlab and sends records here instead.
+
+Addresses are "host:port" for TCP or "unix:/path/to/socket". The daemon
+listens on 127.0.0.1 by default. Any other TCP address needs a shared
+token (--token or LABEL_DAEMON_TOKEN, sent by clients in every request) or
+an explicit --insecure, since a client can print on every printer.
+
+Protocol: one JSON object per line in each direction.
+    {"op": "print", "text": "SAP|QTY|LOT", "printer": "Zebra", "wait": true,
+     "key": "<idempotency key>"}          -> {"ok": true}
+    {"op": "printers"}                    -> {"ok": true, "printers": [...]}
+    {"op": "status"}                      -> {"ok": true, "printers": {name: state}}
+    {"op": "history", "prefix": "SAP1"}   -> {"ok": true, "entries": [...]}
+    {"op": "reprint", "entry_id": 12, "key": "..."} -> {"ok": true}
+    {"op": "usage", "field": "sap_nr"}    -> {"ok": true, "usage": [[value, count, time]]}
+    {"op": "ping"}                        -> {"ok": true}
+With a token, every request carries "token": "<shared token>". A print or
+reprint repeated with the same key within the duplicate window is answered
+{"ok": true} without printing again (DaemonClient always sends a key).
+Failures are answered with {"ok": false, "error": "..."}.
+"""
+
+import os
+import hmac
+import json
+import time
+import uuid
+import socket
+import ipaddress
+import threading
+import socketserver
+
+from print_dedup import DuplicateFilter
+from print_history import HistoryEntry
+from printer_status import PrinterState
+
+
+DEFAULT_ADDRESS = '127.0.0.1:8731'
+
+# Shared secret of daemon and clients (default for --token and DaemonClient)
+TOKEN_ENV = 'LABEL_DAEMON_TOKEN'
+
+
+def parse_address(address):
+    """
+    Split a daemon address.
+
+    Args:
+        address (str): "host:port" or "unix:/path"
+
+    Returns:
+        tuple: (socket family, address for bind/connect)
+    """
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[len('unix:'):]
+    host, _, port = address.rpartition(':')
+    if not host or not port.isdigit():
+        raise ValueError(f"Invalid daemon address {address!r} (use host:port or unix:/path)")
+    return socket.AF_INET, (host, int(port))
+
+
+def is_loopback(address):
+    """
+    Check whether a daemon address only accepts clients on this machine.
+
+    Args:
+        address (str): "host:port" or "unix:/path"
+
+    Returns:
+        bool: True for Unix sockets and loopback hosts
+    """
+    family, bind_address = parse_address(address)
+    if family == socket.AF_UNIX:
+        return True
+    host = bind_address[0].strip('[]')
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        # A host name may resolve to any interface
+        return False
+
+
+def _state_dict(state):
+    return {'state': state.state, 'reasons': list(state.reasons), 'message': state.message}
+
+
+def _entry_dict(entry):
+    return {name: getattr(entry, name) for name in HistoryEntry.__slots__}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Answers the JSON-lines requests of one client connection"""
+
+    def handle(self):
+        for line in self.rfile:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("request must be a JSON object")
+                response = self.server.daemon.handle(request)
+            except Exception as e:
+                response = {'ok': False, 'error': str(e)}
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+else:
+    _UnixServer = None
+
+
+class LabelDaemon:
+    """Render and print server shared by thin-client GUIs"""
+
+    def __init__(self, address=DEFAULT_ADDRESS, journal=None, token=None, insecure=False):
+        """
+        Initialize daemon (call serve_forever() or start() to accept clients).
+
+        Args:
+            address (str): Listen address ("host:port" or "unix:/path")
+            journal (PrintJournal): Optional journal for every printed label
+            token (str): Shared token clients must send (None = no check)
+            insecure (bool): Allow a non-loopback address without a token
+
+        Raises:
+            ValueError: If a non-loopback address has neither a token nor insecure
+        """
+        if not token and not insecure and not is_loopback(address):
+            raise ValueError(f"Listening on {address} lets any host print: set a token "
+                             f"(--token or {TOKEN_ENV}) or pass --insecure")
+        self.address = address
+        self.journal = journal
+        self.token = token
+        self._server = None
+        self._thread = None
+
+    def handle(self, request):
+        """
+        Execute one request.
+
+        Args:
+            request (dict): Decoded request (see module docstring)
+
+        Returns:
+            dict: Response
+        """
+        import print_label
+
+        if self.token and not hmac.compare_digest(str(request.get('token', '')), self.token):
+            raise PermissionError("invalid or missing token")
+        op = request.get('op')
+        if op == 'ping':
+            return {'ok': True}
+        if op == 'printers':
+            return {'ok': True, 'printers': print_label.get_available_printers()}
+        if op == 'status':
+            states = print_label.get_status_monitor().snapshot()
+            return {'ok': True,
+                    'printers': {name: _state_dict(state) for name, state in states.items()}}
+        if op == 'print':
+            ok = print_label.print_label_standalone(
+                request.get('text', ''), request['printer'], preview=0,
+                use_pdf=request.get('use_pdf', True), verify=request.get('verify', True),
+                journal=self.journal, batch_id=request.get('batch_id', ''),
+                idempotency_key=request.get('key'), wait=request.get('wait', False))
+            return {'ok': ok} if ok else {'ok': False, 'error': 'print failed'}
+        if op == 'history':
+            history = print_label.get_print_history()
+            if history is None:
+                return {'ok': True, 'entries': []}
+            entries = history.search(request.get('prefix', ''), request.get('field'),
+                                     request.get('limit', 50))
+            return {'ok': True, 'entries': [_entry_dict(entry) for entry in entries]}
+        if op == 'usage':
+            history = print_label.get_print_history()
+            if history is None:
+                return {'ok': True, 'usage': []}
+            return {'ok': True, 'usage': history.value_usage(request.get('field', 'sap_nr'))}
+        if op == 'reprint':
+            key = request.get('key')
+            if key is not None and not print_label.claim_print_key(key):
+                return {'ok': True}
+            ok = print_label.reprint_label(request['entry_id'], request.get('printer'),
+                                           journal=self.journal, wait=request.get('wait', False))
+            if not ok and key is not None:
+                print_label.release_print_key(key)
+            return {'ok': ok} if ok else {'ok': False, 'error': 'reprint failed'}
+        raise ValueError(f"unknown op {op!r}")
+
+    def _create_server(self):
+        family, address = parse_address(self.address)
+        if family == socket.AF_UNIX:
+            if _UnixServer is None:
+                raise OSError("Unix sockets are not supported on this platform")
+            if os.path.exists(address):
+                # Left over from a previous run
+                os.remove(address)
+            server = _UnixServer(address, _RequestHandler)
+        else:
+            server = _TCPServer(address, _RequestHandler)
+        server.daemon = self
+        return server
+
+    def serve_forever(self):
+        """Accept clients until stop() is called (blocking)."""
+        self._server = self._create_server()
+        print(f"Label daemon listening on {self.address}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def start(self):
+        """Serve on a background thread."""
+        self._server = self._create_server()
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='label-daemon', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop accepting clients."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+class DaemonClient:
+    """
+    Connection to a LabelDaemon.
+
+    Offers the parts of the print_label API the GUI uses, plus the status
+    monitor (get_status, add_listener) and print history (search) calls,
+    so a GUI can swap it in for the local modules.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, timeout=120.0, status_interval=2.0,
+                 token=None):
+        """
+        Args:
+            address (str): Daemon address ("host:port" or "unix:/path")
+            timeout (float): Seconds to wait for a response
+            status_interval (float): Seconds between printer status polls
+                                     while listeners are registered
+            token (str): Shared daemon token (default: LABEL_DAEMON_TOKEN)
+        """
+        self.address = address
+        self.timeout = timeout
+        self.status_interval = status_interval
+        self.token = token if token is not None else os.environ.get(TOKEN_ENV)
+        self._family, self._address = parse_address(address)
+        self._lock = threading.Lock()
+        self._idle = []                 # idle sockets
+        self._duplicate_filter = DuplicateFilter(window=10.0)
+        self._states = {}               # name -> PrinterState (last poll)
+        self._refreshed_at = None       # monotonic time of the last poll
+        self._refreshing = False
+        self._listeners = []
+        self._poller = None
+        self._stop = threading.Event()
+
+    # -- transport ------------------------------------------------------------
+
+    def _connect(self):
+        sock = socket.socket(self._family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self._address)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    @staticmethod
+    def _receive_line(sock, received):
+        """Read one response line into received (bytearray) and return it."""
+        while not received.endswith(b'\n'):
+            chunk = sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("daemon closed the connection")
+            received += chunk
+        return bytes(received)
+
+    def call(self, op, **params):
+        """
+        Send one request and wait for its response.
+
+        Calls from several threads use separate connections, so a slow
+        print does not hold up status polls. A pooled connection the daemon
+        closed while it was idle is replaced once, but only if the request
+        failed before any of the response arrived and did not time out:
+        otherwise the daemon may already have acted on it (printed).
+
+        Args:
+            op (str): Operation name
+            **params: Request fields
+
+        Returns:
+            dict: Response
+
+        Raises:
+            OSError: If the daemon cannot be reached or the response was cut off
+        """
+        with self._lock:
+            connection = self._idle.pop() if self._idle else None
+        if self.token:
+            params['token'] = self.token
+        request = json.dumps(dict(params, op=op)).encode('utf-8') + b'\n'
+
+        retry = connection is not None
+        while True:
+            if connection is None:
+                connection = self._connect()
+            received = bytearray()
+            try:
+                connection.sendall(request)
+                line = self._receive_line(connection, received)
+                break
+            except OSError as e:
+                connection.close()
+                connection = None
+                if not retry or received or isinstance(e, socket.timeout):
+                    raise
+                retry = False
+
+        with self._lock:
+            self._idle.append(connection)
+        return json.loads(line)
+
+    def close(self):
+        """Close all connections and stop status polling."""
+        self._stop.set()
+        with self._lock:
+            connections, self._idle = self._idle, []
+        for sock in connections:
+            sock.close()
+
+    # -- print_label API ------------------------------------------------------
+
+    def print_label_standalone(self, value, printer, preview=0, use_pdf=True, verify=True,
+                               journal=None, job_id=None, batch_id='', idempotency_key=None,
+                               wait=False):
+        """
+        Print a label on the daemon (see print_label.print_label_standalone).
+
+        preview, journal and job_id are ignored: the daemon prints without
+        a countdown and records the job in its own journal. Without an
+        idempotency_key a new one is sent, so the daemon prints a request
+        that reaches it twice only once.
+
+        Returns:
+            bool: True if the label printed
+        """
+        text = value if isinstance(value, str) else value.text
+        try:
+            response = self.call('print', text=text, printer=printer, use_pdf=use_pdf,
+                                 verify=verify, batch_id=batch_id,
+                                 key=idempotency_key or uuid.uuid4().hex, wait=wait)
+        except (OSError, ValueError) as e:
+            print(f"Label daemon unavailable: {e}")
+            return False
+        if not response.get('ok'):
+            print(f"Label daemon: {response.get('error', 'print failed')}")
+        return bool(response.get('ok'))
+
+    def get_available_printers(self):
+        """Printers known to the daemon (["PDF"] if it cannot be reached)."""
+        try:
+            return self.call('printers').get('printers') or ["PDF"]
+        except (OSError, ValueError) as e:
+            print(f"Label daemon unavailable: {e}")
+            return ["PDF"]
+
+    def start_warm_up(self, **kwargs):
+        """
+        Connect in the background so the first print does not wait for it.
+
+        The daemon keeps itself warm; the keyword arguments of
+        print_label.start_warm_up are accepted and ignored.
+        """
+        def ping():
+            try:
+                self.call('ping')
+            except (OSError, ValueError) as e:
+                print(f"Label daemon unavailable: {e}")
+
+        thread = threading.Thread(target=ping, name='daemon-connect', daemon=True)
+        thread.start()
+        return thread
+
+    def claim_print_key(self, key):
+        """Local double-submit guard (see print_label.claim_print_key)."""
+        return self._duplicate_filter.check(key)
+
+    def release_print_key(self, key):
+        """Forget a claimed key after a failed print."""
+        self._duplicate_filter.release(key)
+
+    def reprint_label(self, entry, printer=None, journal=None, wait=False):
+        """
+        Reprint a history entry on the daemon.
+
+        Returns:
+            bool: True if the label printed
+        """
+        entry_id = getattr(entry, 'entry_id', entry)
+        try:
+            return bool(self.call('reprint', entry_id=entry_id, printer=printer,
+                                  key=uuid.uuid4().hex, wait=wait).get('ok'))
+        except (OSError, ValueError) as e:
+            print(f"Label daemon unavailable: {e}")
+            return False
+
+    # -- print history --------------------------------------------------------
+
+    def search(self, prefix, field=None, limit=50):
+        """
+        Search the daemon's print history (see PrintHistory.search).
+
+        Returns:
+            list: HistoryEntry objects
+        """
+        try:
+            response = self.call('history', prefix=prefix, field=field, limit=limit)
+        except (OSError, ValueError) as e:
+            print(f"Label daemon unavailable: {e}")
+            return []
+        return [HistoryEntry(**entry) for entry in response.get('entries', [])]
+
+    def value_usage(self, field='sap_nr'):
+        """
+        Print counts from the daemon's history (see PrintHistory.value_usage).
+
+        Returns:
+            list: (value, count, last printed) tuples
+        """
+        try:
+            response = self.call('usage', field=field)
+        except (OSError, ValueError) as e:
+            print(f"Label daemon unavailable: {e}")
+            return []
+        return [tuple(usage) for usage in response.get('usage', [])]
+
+    # -- status monitor -------------------------------------------------------
+
+    def refresh_status(self):
+        """Fetch the daemon's printer states and notify listeners of changes."""
+        try:
+            printers = self.call('status').get('printers', {})
+        except (OSError, ValueError):
+            return
+        self._refreshed_at = time.monotonic()
+        for name, attributes in printers.items():
+            new_state = PrinterState(name, attributes['state'], attributes['reasons'],
+                                     attributes['message'])
+            old_state = self._states.get(name)
+            self._states[name] = new_state
+            if old_state != new_state:
+                for callback in list(self._listeners):
+                    try:
+                        callback(name, old_state, new_state)
+                    except Exception as e:
+                        print(f"Printer status listener error: {e}")
+
+    def _refresh_in_background(self):
+        """Start one refresh_status() on a worker thread (no-op while one runs)."""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh():
+            try:
+                self.refresh_status()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=refresh, name='daemon-status-refresh', daemon=True).start()
+
+    def get_status(self, printer):
+        """
+        Last known state of a printer on the daemon (never waits for the daemon).
+
+        A state older than status_interval is refreshed in the background,
+        so a later call sees the update.
+
+        Returns:
+            PrinterState or None: None if the daemon has not reported it yet
+        """
+        if (self._refreshed_at is None
+                or time.monotonic() - self._refreshed_at >= self.status_interval):
+            self._refresh_in_background()
+        return self._states.get(printer)
+
+    def add_listener(self, callback):
+        """Register callback(name, old, new) for printer state changes (polled)."""
+        self._listeners.append(callback)
+        if self._poller is None:
+            self._poller = threading.Thread(target=self._poll_status,
+                                            name='daemon-status', daemon=True)
+            self._poller.start()
+
+    def remove_listener(self, callback):
+        """Unregister a printer state callback."""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _poll_status(self):
+        while not self._stop.wait(self.status_interval):
+            if self._listeners:
+                self.refresh_status()
+
+    def stop(self):
+        """Stop status polling (status monitor API)."""
+        self.close()
@@ -0,0 +1,177 @@
+"""
+Label Preflight
+Checks whole batches of label records against what the barcodes can
+encode before anything is rendered or spooled.
+
+Without a preflight a bad value only shows up inside barcode generation:
+characters outside Code128 (anything above ASCII 127) make the barcode
+fall back to text, and values over 25 characters are silently cut.
+preflight_batch() finds these rows up front, with the row number, field
+and reason, so a bad batch fails in milliseconds instead of after some
+labels have printed.
+
+Values are checked once per distinct value (RecordBatch stores each value
+once), so a million-row batch costs about as much as its distinct SAP and
+lot values.
+"""
+
+from array import array
+from itertools import islice
+
+from label_record import LabelRecord, RecordBatch, FIELDS
+
+
+# Characters encoded per barcode on the label
+MAX_BARCODE_CHARS = 25
+
+FIELD_NAMES = {'sap_nr': 'SAP-Nr', 'cantitate': 'Cantitate', 'lot_number': 'Lot Nr'}
+
+# Up to this many distinct bad values, rows are located by a byte search
+_INDEX_SCAN_CODES = 16
+
+
+class PreflightIssue:
+    """One value that cannot be printed as intended"""
+
+    __slots__ = ('row', 'field', 'value', 'reason')
+
+    def __init__(self, row, field, value, reason):
+        self.row = row          # 1-based row in the batch
+        self.field = field      # 'sap_nr', 'cantitate' or 'lot_number'
+        self.value = value
+        self.reason = reason
+
+    def __str__(self):
+        return f"row {self.row}: {FIELD_NAMES[self.field]} {self.value!r} - {self.reason}"
+
+    def __repr__(self):
+        return f"PreflightIssue({self.row}, {self.field!r}, {self.value!r}, {self.reason!r})"
+
+
+class PreflightError(ValueError):
+    """A batch failed preflight; .issues lists the offending rows"""
+
+    def __init__(self, issues):
+        self.issues = issues
+        count = len(issues)
+        shown = '; '.join(str(issue) for issue in issues[:5])
+        more = f" (+{count - 5} more)" if count > 5 else ''
+        super().__init__(f"{count} invalid label value(s): {shown}{more}")
+
+
+def check_value(value, max_chars=MAX_BARCODE_CHARS):
+    """
+    Check one barcode value.
+
+    Args:
+        value (str): Field value (stripped)
+        max_chars (int): Longest value that is encoded without truncation
+
+    Returns:
+        str or None: Reason the value cannot be printed, or None if it is fine
+    """
+    # Code128 encodes all of ASCII (control characters through code set A,
+    # see code128.encode_symbols); only characters above 127 are rejected
+    if not value.isascii():
+        for position, char in enumerate(value, 1):
+            if ord(char) >= 128:
+                return f"character {char!r} at position {position} is not in Code128"
+    if len(value) > max_chars:
+        return f"{len(value)} characters (max {max_chars})"
+    return None
+
+
+def preflight_batch(records, max_chars=MAX_BARCODE_CHARS, max_issues=None):
+    """
+    Check every record of a batch in one pass.
+
+    Args:
+        records (RecordBatch or iterable): Batch, or LabelRecords / texts / tuples
+        max_chars (int): Longest value encoded without truncation
+        max_issues (int): Stop after this many issues (None = report all)
+
+    Returns:
+        list: PreflightIssue for every bad value, in row order (empty if OK)
+    """
+    if not isinstance(records, RecordBatch):
+        records = RecordBatch.from_records(records)
+
+    # Each distinct value is checked once
+    bad = {}
+    for code, value in enumerate(records.values):
+        if value:
+            reason = check_value(value, max_chars)
+            if reason is not None:
+                bad[code] = reason
+    if not bad:
+        return []
+
+    values = records.values
+    columns = (records.sap_codes, records.qty_codes, records.lot_codes)
+    issues = []
+    for field, codes in zip(FIELDS, columns):
+        # The first max_issues rows of each column contain the first max_issues overall
+        issues.extend(islice(_find_rows(codes, bad, field, values), max_issues))
+    # Stable sort: fields stay in SAP, quantity, lot order within a row
+    issues.sort(key=lambda issue: issue.row)
+    return issues[:max_issues]
+
+
+def _find_rows(codes, bad, field, values):
+    """Yield an issue for every row of one column whose code is in bad."""
+    if len(bad) > _INDEX_SCAN_CODES:
+        for row, code in enumerate(codes, 1):
+            if code in bad:
+                yield PreflightIssue(row, field, values[code], bad[code])
+        return
+
+    # Few bad values (the usual case): search the raw column bytes at memchr speed
+    data = codes.tobytes()
+    rows = []
+    for code in bad:
+        needle = array(codes.typecode, [code]).tobytes()
+        offset = data.find(needle)
+        while offset >= 0:
+            if offset % codes.itemsize == 0:
+                rows.append((offset // codes.itemsize, code))
+                offset = data.find(needle, offset + codes.itemsize)
+            else:
+                offset = data.find(needle, offset + 1)
+    for index, code in sorted(rows):
+        yield PreflightIssue(index + 1, field, values[code], bad[code])
+
+
+def check_batch(records, max_chars=MAX_BARCODE_CHARS):
+    """
+    Raise if any record of a batch fails preflight.
+
+    Args:
+        records (RecordBatch or iterable): Batch to check
+        max_chars (int): Longest value encoded without truncation
+
+    Raises:
+        PreflightError: With the issues found
+    """
+    issues = preflight_batch(records, max_chars)
+    if issues:
+        raise PreflightError(issues)
+
+
+def preflight_record(record, max_chars=MAX_BARCODE_CHARS):
+    """
+    Check a single label.
+
+    Args:
+        record (LabelRecord, str or sequence): Label to check
+        max_chars (int): Longest value encoded without truncation
+
+    Returns:
+        list: PreflightIssue for every bad field (row 1)
+    """
+    issues = []
+    for field, value in zip(FIELDS, LabelRecord.parse(record)):
+        if value:
+            reason = check_value(value, max_chars)
+            if reason is not None:
+                issues.append(PreflightIssue(1, field, value, reason))
+    return issues
@@ -25,7 +25,6 @@ a = Analysis(
         'kivy.clock',
         'kivy.graphics',
         'PIL',
-        'barcode',
         'reportlab',
     ],
     hookspath=[],
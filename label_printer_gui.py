@@ -1,6 +1,16 @@
 """
 Label Printer GUI Application using Kivy
 Simplified mobile-friendly interface for printing labels.
+
+SCANNER mode takes labels from a keyboard-wedge barcode scanner: each scan
+fills the next empty field (or all fields for a "SAP|CANTITATE|LOT" code)
+and a complete label is queued for printing without touching the screen.
+
+Set LABEL_DAEMON=<host:port or unix:/path> to run as a thin client of a
+render daemon (label_cli.py serve): labels are rendered, printed, journaled
+and recorded in the history by the daemon, and the GUI starts without
+loading the PDF/image libraries. LABEL_DAEMON_TOKEN holds the daemon's
+shared token.
 """
 
 from kivy.app import App
@@ -12,14 +22,25 @@ from kivy.uix.button import Button
 from kivy.uix.spinner import Spinner
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.popup import Popup
+from kivy.uix.progressbar import ProgressBar
+from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.core.window import Window
 from kivy.uix.image import Image as KivyImage
 from kivy.graphics import Color, Rectangle
 
 import os
+import uuid
 import threading
 import platform
-from print_label import print_label_standalone, get_available_printers
+from print_dedup import derive_key
+from print_journal import PrintJournal
+from print_queue import PrintQueue
+from print_history import PrintHistory
+from label_daemon import DaemonClient
+from sap_autocomplete import SapAutocomplete, load_catalog_index
+from scanner_input import ScanDetector, ScanRecordBuilder
+from label_preflight import preflight_record, FIELD_NAMES
+import label_profiler
 from kivy.clock import Clock
 
 # Set window size - portrait/phone dimensions (375x667 like iPhone)
@@ -35,15 +56,56 @@ class LabelPrinterApp(App):
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        # Labels (derive_key) whose PRINT LABEL popup is still open
+        self._printing_keys = set()
+        daemon_address = os.environ.get('LABEL_DAEMON')
+        if daemon_address:
+            # Thin client: the daemon renders, prints, journals and records history
+            self.backend = DaemonClient(daemon_address)
+            self.status_monitor = self.backend
+            self.printer_pools = []
+            self.available_printers = self.get_available_printers()
+            self.journal = None
+            self.print_queue = PrintQueue(print_func=self.backend.print_label_standalone)
+            self.print_history = self.backend
+            return
+        
+        import print_label
+        from printer_pool import load_printer_pools
+        from printer_status import get_status_monitor
+        self.backend = print_label
+        self.status_monitor = get_status_monitor()
+        # Printer pools (printer_pools.json) appear as extra printers
+        self.printer_pools = load_printer_pools()
         self.available_printers = self.get_available_printers()
+        # Write-ahead journal: shows which labels reached the printer after a crash
+        self.journal = PrintJournal()
+        unconfirmed = self.journal.unconfirmed()
+        if unconfirmed:
+            print(f"{len(unconfirmed)} label(s) from a previous session were not confirmed:")
+            for job in unconfirmed:
+                print(f"  {job.job_id}: {job.text} ({job.state})")
+        # Batch printing queue (shown on the queue screen)
+        self.print_queue = PrintQueue(journal=self.journal)
+        # Index of printed labels (search and reprint screen)
+        self.print_history = PrintHistory()
+        print_label.set_print_history(self.print_history)
+    
+    @property
+    def thin_client(self):
+        """True when labels are rendered by a render daemon (LABEL_DAEMON)"""
+        return isinstance(self.backend, DaemonClient)
     
     def get_available_printers(self):
         """Get list of available printers (cross-platform)"""
-        return get_available_printers()
+        return self.backend.get_available_printers()
     
     def build(self):
-        """Build the simplified single-column UI"""
+        """Build the label form and the print queue screen"""
         self.title = "Label Printing"
+        if not self.thin_client:
+            # LABEL_PROFILE=cprofile:N or sample:SECONDS
+            label_profiler.enable_from_environment()
         
         # Main container - single column layout
         main_layout = BoxLayout(orientation='vertical', spacing=8, padding=12)
@@ -59,7 +121,7 @@ class LabelPrinterApp(App):
         main_layout.add_widget(title)
         
         # Scroll view for form fields
-        scroll = ScrollView(size_hint_y=0.75)
+        scroll = ScrollView(size_hint_y=0.67)
         form_layout = GridLayout(cols=1, spacing=8, size_hint_y=None, padding=8)
         form_layout.bind(minimum_height=form_layout.setter('height'))
         
@@ -83,6 +145,13 @@ class LabelPrinterApp(App):
         self.sap_input.bind(text=self.on_sap_text_change)
         form_layout.add_widget(self.sap_input)
         
+        # SAP suggestions (catalog and recently printed numbers)
+        self.autocomplete = self.create_autocomplete()
+        self.sap_suggestions = GridLayout(cols=1, spacing=2, size_hint_y=None, height=0)
+        self.sap_suggestions.bind(minimum_height=self.sap_suggestions.setter('height'))
+        self.shown_suggestions = []
+        form_layout.add_widget(self.sap_suggestions)
+        
         # Cantitate
         qty_label = Label(
             text='Cantitate:',
@@ -141,8 +210,35 @@ class LabelPrinterApp(App):
             font_size='12sp'
         )
         self.printer_spinner = printer_spinner
+        printer_spinner.bind(text=lambda instance, value: self.update_printer_status())
         form_layout.add_widget(printer_spinner)
         
+        # Live printer state (from the shared status monitor)
+        self.printer_status_label = Label(
+            text='',
+            size_hint_y=None,
+            height=25,
+            font_size='11sp',
+            color=(0.8, 0.8, 0.8, 1)
+        )
+        form_layout.add_widget(self.printer_status_label)
+        self.status_monitor.add_listener(self.on_printer_state_change)
+        self.update_printer_status()
+        
+        # Scanner mode feedback (last scan, next field)
+        self.scan_status_label = Label(
+            text='',
+            size_hint_y=None,
+            height=25,
+            font_size='11sp',
+            color=(0.6, 0.8, 1, 1)
+        )
+        form_layout.add_widget(self.scan_status_label)
+        self.scan_detector = ScanDetector()
+        self.scan_builder = ScanRecordBuilder()
+        self.scan_flush_event = None
+        self.scanner_mode = False
+        
         scroll.add_widget(form_layout)
         main_layout.add_widget(scroll)
         
@@ -158,12 +254,382 @@ class LabelPrinterApp(App):
         print_button.bind(on_press=self.print_label)
         main_layout.add_widget(print_button)
         
-        return main_layout
+        # Queue buttons
+        queue_row = BoxLayout(orientation='horizontal', spacing=8, size_hint_y=0.08)
+        add_button = Button(text='ADD TO QUEUE', font_size='12sp')
+        add_button.bind(on_press=self.add_to_queue)
+        queue_row.add_widget(add_button)
+        queue_button = Button(text='QUEUE', font_size='12sp')
+        queue_button.bind(on_press=lambda instance: self.show_screen('queue'))
+        queue_row.add_widget(queue_button)
+        history_button = Button(text='HISTORY', font_size='12sp')
+        history_button.bind(on_press=lambda instance: self.show_screen('history'))
+        queue_row.add_widget(history_button)
+        self.scanner_button = Button(text='SCANNER', font_size='12sp')
+        self.scanner_button.bind(on_press=lambda instance: self.toggle_scanner_mode())
+        queue_row.add_widget(self.scanner_button)
+        main_layout.add_widget(queue_row)
+        
+        self.screen_manager = ScreenManager()
+        label_screen = Screen(name='label')
+        label_screen.add_widget(main_layout)
+        self.screen_manager.add_widget(label_screen)
+        
+        queue_screen = Screen(name='queue')
+        queue_screen.add_widget(self.build_queue_screen())
+        queue_screen.bind(on_enter=self.start_queue_updates, on_leave=self.stop_queue_updates)
+        self.screen_manager.add_widget(queue_screen)
+        
+        history_screen = Screen(name='history')
+        history_screen.add_widget(self.build_history_screen())
+        history_screen.bind(on_enter=lambda *args: self.refresh_history_view())
+        self.screen_manager.add_widget(history_screen)
+        
+        # Prime fonts, the PDF writer and the printer connection while the
+        # operator fills in the first label
+        self.backend.start_warm_up()
+        
+        return self.screen_manager
+    
+    def build_queue_screen(self):
+        """Build the print queue dashboard"""
+        layout = BoxLayout(orientation='vertical', spacing=6, padding=12)
+        
+        layout.add_widget(Label(
+            text='[b]Print Queue[/b]',
+            markup=True,
+            size_hint_y=0.07,
+            font_size='18sp'
+        ))
+        
+        # Job counts and throughput
+        self.queue_summary_label = Label(size_hint_y=0.1, font_size='12sp', halign='center')
+        layout.add_widget(self.queue_summary_label)
+        
+        self.queue_progress = ProgressBar(max=1, value=0, size_hint_y=0.04)
+        layout.add_widget(self.queue_progress)
+        
+        # Per-printer status
+        self.queue_printers_label = Label(
+            size_hint_y=0.15,
+            font_size='11sp',
+            color=(0.8, 0.8, 0.8, 1),
+            halign='left',
+            valign='top'
+        )
+        self.queue_printers_label.bind(size=self.queue_printers_label.setter('text_size'))
+        layout.add_widget(self.queue_printers_label)
+        
+        # Active, next pending and recently finished jobs
+        jobs_scroll = ScrollView(size_hint_y=0.38)
+        self.queue_jobs_label = Label(
+            size_hint_y=None,
+            font_size='11sp',
+            halign='left',
+            valign='top'
+        )
+        self.queue_jobs_label.bind(
+            width=lambda instance, width: setattr(instance, 'text_size', (width, None)),
+            texture_size=lambda instance, size: setattr(instance, 'height', size[1])
+        )
+        jobs_scroll.add_widget(self.queue_jobs_label)
+        layout.add_widget(jobs_scroll)
+        
+        # Bulk import (.csv, .jsonl or one SAP|CANTITATE|LOT per line)
+        import_row = BoxLayout(orientation='horizontal', spacing=8, size_hint_y=0.08)
+        self.import_path_input = TextInput(
+            hint_text='File to import (.csv / .jsonl / .txt)',
+            multiline=False,
+            font_size='12sp',
+            background_color=(0.95, 0.95, 0.95, 1)
+        )
+        import_row.add_widget(self.import_path_input)
+        import_button = Button(text='IMPORT', size_hint_x=0.3, font_size='12sp')
+        import_button.bind(on_press=self.import_labels)
+        import_row.add_widget(import_button)
+        layout.add_widget(import_row)
+        
+        # Queue controls
+        control_row = BoxLayout(orientation='horizontal', spacing=8, size_hint_y=0.1)
+        self.pause_button = Button(text='PAUSE', font_size='12sp')
+        self.pause_button.bind(on_press=self.toggle_queue_pause)
+        control_row.add_widget(self.pause_button)
+        cancel_button = Button(
+            text='CANCEL ALL',
+            font_size='12sp',
+            background_color=(0.7, 0.2, 0.2, 1),
+            background_normal=''
+        )
+        cancel_button.bind(on_press=lambda instance: self.print_queue.cancel())
+        control_row.add_widget(cancel_button)
+        back_button = Button(text='BACK', font_size='12sp')
+        back_button.bind(on_press=lambda instance: self.show_screen('label'))
+        control_row.add_widget(back_button)
+        if not self.thin_client:
+            # Debug: sample the print pipeline until pressed again (thin
+            # clients render on the daemon; profile it with --profile)
+            self.profile_button = Button(
+                text='STOP PROFILE' if label_profiler.active is not None else 'PROFILE',
+                font_size='12sp')
+            self.profile_button.bind(on_press=lambda instance: self.toggle_profiling())
+            control_row.add_widget(self.profile_button)
+        layout.add_widget(control_row)
+        
+        return layout
+    
+    def build_history_screen(self):
+        """Build the print history search and reprint screen"""
+        layout = BoxLayout(orientation='vertical', spacing=6, padding=12)
+        
+        layout.add_widget(Label(
+            text='[b]Print History[/b]',
+            markup=True,
+            size_hint_y=0.07,
+            font_size='18sp'
+        ))
+        
+        # Prefix search over SAP-Nr and Cable ID
+        self.history_search_input = TextInput(
+            hint_text='SAP-Nr or Cable ID (start of value)',
+            multiline=False,
+            font_size='14sp',
+            size_hint_y=0.08,
+            background_color=(0.95, 0.95, 0.95, 1)
+        )
+        self.history_search_input.bind(text=self.on_history_search_change)
+        layout.add_widget(self.history_search_input)
+        
+        layout.add_widget(Label(
+            text='Tap a label to reprint it on the selected printer',
+            size_hint_y=0.05,
+            font_size='11sp',
+            color=(0.8, 0.8, 0.8, 1)
+        ))
+        
+        # One button per matching label
+        results_scroll = ScrollView(size_hint_y=0.7)
+        self.history_results = GridLayout(cols=1, spacing=4, size_hint_y=None)
+        self.history_results.bind(minimum_height=self.history_results.setter('height'))
+        results_scroll.add_widget(self.history_results)
+        layout.add_widget(results_scroll)
+        
+        back_button = Button(text='BACK', font_size='12sp', size_hint_y=0.1)
+        back_button.bind(on_press=lambda instance: self.show_screen('label'))
+        layout.add_widget(back_button)
+        
+        return layout
+    
+    def on_history_search_change(self, instance, value):
+        """Search again shortly after the operator stops typing"""
+        event = getattr(self, 'history_search_event', None)
+        if event is not None:
+            event.cancel()
+        self.history_search_event = Clock.schedule_once(
+            lambda dt: self.refresh_history_view(), 0.15)
+    
+    def refresh_history_view(self):
+        """List the history entries matching the search text"""
+        entries = self.print_history.search(self.history_search_input.text, limit=30)
+        self.history_results.clear_widgets()
+        for entry in entries:
+            button = Button(
+                text=entry.summary(),
+                size_hint_y=None,
+                height=40,
+                font_size='11sp'
+            )
+            button.bind(on_press=lambda instance, entry=entry: self.reprint_entry(entry))
+            self.history_results.add_widget(button)
+        if not entries:
+            self.history_results.add_widget(Label(
+                text='No printed labels found',
+                size_hint_y=None,
+                height=40,
+                font_size='12sp'
+            ))
+    
+    def reprint_entry(self, entry):
+        """Reprint a history entry on the selected printer (stored document, no re-render)"""
+        printer = self.printer_spinner.text
+        
+        def reprint_thread():
+            success = self.backend.reprint_label(entry, printer, journal=self.journal, wait=True)
+            if success:
+                Clock.schedule_once(lambda dt: self.show_popup(
+                    "Success", f"Reprinted {entry.record.text}"), 0)
+            else:
+                Clock.schedule_once(lambda dt: self.show_popup("Error", "Failed to reprint label"), 0)
+        
+        thread = threading.Thread(target=reprint_thread)
+        thread.daemon = True
+        thread.start()
+    
+    def show_screen(self, name):
+        """Switch between the label form, queue and history screens"""
+        self.screen_manager.current = name
+    
+    def start_queue_updates(self, *args):
+        """Refresh the dashboard periodically while the queue screen is shown"""
+        self.refresh_queue_view(0)
+        self.queue_update_event = Clock.schedule_interval(self.refresh_queue_view, 0.5)
+    
+    def stop_queue_updates(self, *args):
+        """Stop dashboard updates when leaving the queue screen"""
+        event = getattr(self, 'queue_update_event', None)
+        if event is not None:
+            event.cancel()
+            self.queue_update_event = None
+    
+    def refresh_queue_view(self, dt):
+        """Redraw the dashboard from a queue snapshot"""
+        snapshot = self.print_queue.snapshot(pending_limit=10, finished_limit=15)
+        counts = snapshot['counts']
+        finished = counts['done'] + counts['failed'] + counts['canceled']
+        total = finished + counts['pending'] + counts['active']
+        
+        paused = '  (PAUSED)' if snapshot['paused'] else ''
+        self.queue_summary_label.text = (
+            f"Pending {counts['pending']}   Active {counts['active']}   "
+            f"Done {counts['done']}   Failed {counts['failed']}\n"
+            f"{snapshot['labels_per_minute']} labels/min{paused}"
+        )
+        self.queue_progress.max = max(total, 1)
+        self.queue_progress.value = finished
+        self.pause_button.text = 'RESUME' if snapshot['paused'] else 'PAUSE'
+        
+        printer_lines = []
+        for name, printer_counts in sorted(snapshot['printers'].items()):
+            state = self.status_monitor.get_status(name)
+            status = state.summary() if state else 'unknown'
+            printer_lines.append(
+                f"{name}: {status} - {printer_counts['pending']} pending, "
+                f"{printer_counts['active']} active, {printer_counts['done']} done, "
+                f"{printer_counts['failed']} failed"
+            )
+        self.queue_printers_label.text = '\n'.join(printer_lines) or 'No jobs queued'
+        
+        job_lines = [f"> {job['job_id']}  {job['text']}  ({job['printer']})"
+                     for job in snapshot['active']]
+        job_lines += [f"  {job['job_id']}  {job['text']}  (pending)"
+                      for job in snapshot['pending']]
+        job_lines += [f"  {job['job_id']}  {job['text']}  ({job['state']}"
+                      f"{': ' + job['error'] if job['error'] else ''})"
+                      for job in snapshot['finished']]
+        self.queue_jobs_label.text = '\n'.join(job_lines)
+    
+    def toggle_queue_pause(self, instance):
+        """Pause or resume the print queue"""
+        if self.print_queue.paused:
+            self.print_queue.resume()
+        else:
+            self.print_queue.pause()
+        self.refresh_queue_view(0)
+    
+    def import_labels(self, instance):
+        """Queue every label of the import file for the selected printer"""
+        path = self.import_path_input.text.strip()
+        if not path or not os.path.exists(path):
+            self.show_popup("Error", "Import file not found")
+            return
+        printer = self.printer_spinner.text
+        # Reading and preflighting a large file must not freeze the UI
+        instance.disabled = True
+        
+        def finished(job_ids, error):
+            instance.disabled = False
+            if error is not None:
+                self.show_popup("Error", f"Import failed: {error}")
+                return
+            self.import_path_input.text = ''
+            print(f"Queued {len(job_ids)} label(s) from {path}")
+            self.refresh_queue_view(0)
+        
+        def import_thread():
+            try:
+                job_ids = self.print_queue.import_file(path, printer)
+            except (OSError, ValueError) as e:
+                # PreflightError is a ValueError listing the invalid rows
+                error = str(e)
+                Clock.schedule_once(lambda dt: finished(None, error), 0)
+            else:
+                Clock.schedule_once(lambda dt: finished(job_ids, None), 0)
+        
+        thread = threading.Thread(target=import_thread)
+        thread.daemon = True
+        thread.start()
+    
+    def add_to_queue(self, instance):
+        """Queue the label in the form without waiting for it to print"""
+        sap_nr = self.sap_input.text.strip()
+        quantity = self.qty_input.text.strip()
+        cable_id = self.cable_id_input.text.strip()
+        
+        if not sap_nr and not quantity and not cable_id:
+            self.show_popup("Error", "Please enter at least one field")
+            return
+        
+        self.print_queue.submit(f"{sap_nr}|{quantity}|{cable_id}", self.printer_spinner.text)
+        self.clear_inputs()
+    
+    def on_printer_state_change(self, name, old_state, new_state):
+        """Printer state changed (called on the status monitor thread)"""
+        Clock.schedule_once(lambda dt: self.update_printer_status(), 0)
+    
+    def update_printer_status(self):
+        """Show the cached state of the selected printer"""
+        state = self.status_monitor.get_status(self.printer_spinner.text)
+        if state is None:
+            self.printer_status_label.text = ''
+            return
+        self.printer_status_label.text = f'Status: {state.summary()}'
+        if state.ready:
+            self.printer_status_label.color = (0.6, 0.9, 0.6, 1)
+        else:
+            self.printer_status_label.color = (1, 0.5, 0.5, 1)
+    
+    def create_autocomplete(self):
+        """SAP autocomplete over sap_catalog.csv, ranked by the print history"""
+        autocomplete = SapAutocomplete(load_catalog_index())
+        try:
+            autocomplete.load_usage(self.print_history.value_usage())
+        except Exception as e:
+            print(f"Could not load SAP usage from the print history: {e}")
+        return autocomplete
     
     def on_sap_text_change(self, instance, value):
-        """Limit SAP input to 25 characters"""
+        """Limit SAP input to 25 characters and update the suggestions"""
         if len(value) > 25:
             self.sap_input.text = value[:25]
+            return
+        self.update_sap_suggestions(value)
+    
+    def update_sap_suggestions(self, text):
+        """Show up to 5 SAP numbers starting with the typed text"""
+        suggestions = self.autocomplete.suggest(text, limit=5) if text.strip() else []
+        if len(suggestions) == 1 and suggestions[0][0].upper() == text.strip().upper():
+            # The operator typed or picked a complete number
+            suggestions = []
+        if suggestions == self.shown_suggestions:
+            return
+        self.shown_suggestions = suggestions
+        self.sap_suggestions.clear_widgets()
+        for value, description in suggestions:
+            button = Button(
+                text=f"{value}  {description}" if description else value,
+                size_hint_y=None,
+                height=36,
+                font_size='12sp',
+                shorten=True,
+                background_color=(0.3, 0.3, 0.4, 1)
+            )
+            button.bind(on_press=lambda instance, value=value: self.select_sap_suggestion(value))
+            self.sap_suggestions.add_widget(button)
+    
+    def select_sap_suggestion(self, value):
+        """Fill in a suggested SAP number and continue with the quantity"""
+        self.sap_input.text = value
+        self.update_sap_suggestions('')
+        self.qty_input.focus = True
     
     def on_qty_text_change(self, instance, value):
         """Limit Quantity input to 25 characters"""
@@ -175,6 +641,101 @@ class LabelPrinterApp(App):
         if len(value) > 25:
             self.cable_id_input.text = value[:25]
     
+    def toggle_profiling(self):
+        """Start sampling the print pipeline, or stop and write the profile"""
+        if label_profiler.active is None:
+            label_profiler.enable(label_profiler.SamplingProfiler(duration=None))
+            self.profile_button.text = 'STOP PROFILE'
+            return
+        
+        self.profile_button.text = 'PROFILE'
+        
+        def write_thread():
+            paths = label_profiler.stop()
+            message = (f"Profile written:\n{paths[0]}\n{paths[1]}" if paths
+                       else "No labels were printed while profiling")
+            Clock.schedule_once(lambda dt: self.show_popup("Profile", message), 0)
+        
+        threading.Thread(target=write_thread, daemon=True).start()
+    
+    def toggle_scanner_mode(self):
+        """Switch between tapping fields and taking labels from a barcode scanner"""
+        self.scanner_mode = not self.scanner_mode
+        self.scan_detector.reset()
+        if self.scanner_mode:
+            Window.bind(on_key_down=self.on_scanner_key)
+            # Unfocused fields let the scanner keys reach the window handler
+            for text_input in (self.sap_input, self.qty_input, self.cable_id_input):
+                text_input.focus = False
+            self.scanner_button.background_color = (0.2, 0.5, 0.8, 1)
+            self.update_scan_status()
+        else:
+            Window.unbind(on_key_down=self.on_scanner_key)
+            self.scanner_button.background_color = (1, 1, 1, 1)
+            self.scan_status_label.text = ''
+    
+    def on_scanner_key(self, window, key, scancode, codepoint, modifiers):
+        """Collect scanner key bursts (typing into a focused field is left alone)"""
+        if self.screen_manager.current != 'label' or 'ctrl' in modifiers:
+            return False
+        if any(text_input.focus for text_input in
+               (self.sap_input, self.qty_input, self.cable_id_input)):
+            return False
+        if key in (13, 271):        # Enter, keypad Enter
+            char = '\r'
+        elif key == 9:              # Tab
+            char = '\t'
+        elif codepoint:
+            char = codepoint
+        else:
+            return False
+        
+        scan = self.scan_detector.feed(char)
+        if self.scan_flush_event is not None:
+            self.scan_flush_event.cancel()
+        if scan is not None:
+            self.handle_scan(scan)
+        if self.scan_detector.pending:
+            # Scanners without a terminator: the burst ends when the keys stop
+            self.scan_flush_event = Clock.schedule_once(
+                self.flush_scan, self.scan_detector.max_gap * 2)
+        return True
+    
+    def flush_scan(self, dt):
+        """Finish a scan that ended without a terminator"""
+        self.scan_flush_event = None
+        scan = self.scan_detector.flush()
+        if scan is not None:
+            self.handle_scan(scan)
+    
+    def handle_scan(self, scan):
+        """Put a scan into the next empty field and queue the label once complete"""
+        inputs = (self.sap_input, self.qty_input, self.cable_id_input)
+        # Fields edited by hand count as filled
+        for field, text_input in zip(self.scan_builder.values, inputs):
+            self.scan_builder.set(field, text_input.text)
+        
+        record = self.scan_builder.add(scan)
+        for field, text_input in zip(self.scan_builder.values, inputs):
+            text_input.text = self.scan_builder.values[field]
+        if record is None:
+            self.update_scan_status(f"Scanned {scan}")
+            return
+        
+        issues = preflight_record(record)
+        if issues:
+            self.update_scan_status(f"Rejected {record.text}: {issues[0].reason}")
+            return
+        self.print_queue.submit(record.text, self.printer_spinner.text)
+        self.autocomplete.record_use(record.sap_nr)
+        self.update_scan_status(f"Queued {record.text}")
+    
+    def update_scan_status(self, message=''):
+        """Show the last scan result and the field the next scan fills"""
+        next_field = self.scan_builder.next_field or 'sap_nr'
+        prefix = f"{message} - " if message else ''
+        self.scan_status_label.text = f"{prefix}scan {FIELD_NAMES[next_field]}"
+    
     def print_label(self, instance):
         """Handle print button press"""
         sap_nr = self.sap_input.text.strip()
@@ -190,6 +751,18 @@ class LabelPrinterApp(App):
         # Create combined label text
         label_text = f"{sap_nr}|{quantity}|{cable_id}"
         
+        # A second press for the same label and printer while the first one's
+        # popup is open (double-tap) is ignored, and the operator is told so
+        label_key = derive_key(label_text, printer)
+        if label_key in self._printing_keys:
+            self.show_popup("Duplicate ignored",
+                            "This label is already being printed.\nThe second press was ignored.")
+            return
+        self._printing_keys.add(label_key)
+        # Idempotency key of this press only: a resent request (daemon
+        # reconnect) is not printed twice, a later press prints again
+        print_token = uuid.uuid4().hex
+        
         # Show loading popup
         popup = Popup(
             title='Printing',
@@ -198,17 +771,26 @@ class LabelPrinterApp(App):
                 padding=10,
                 spacing=10
             ),
-            size_hint=(0.8, 0.3)
+            size_hint=(0.8, 0.3),
+            auto_dismiss=False
         )
         
+        def release_press(*args):
+            self._printing_keys.discard(label_key)
+            self.backend.release_print_key(print_token)
+        
+        popup.bind(on_dismiss=release_press)
         popup.content.add_widget(Label(text='Processing label...\nPlease wait'))
         popup.open()
         
         # Print in background thread (using PDF by default)
         def print_thread():
             try:
-                success = print_label_standalone(label_text, printer, preview=0, use_pdf=True)
+                success = self.backend.print_label_standalone(
+                    label_text, printer, preview=0, use_pdf=True,
+                    journal=self.journal, idempotency_key=print_token, wait=True)
                 if success:
+                    self.autocomplete.record_use(sap_nr)
                     # Use Clock.schedule_once to update UI from main thread
                     Clock.schedule_once(lambda dt: popup.dismiss(), 0)
                     Clock.schedule_once(lambda dt: self.show_popup("Success", "Label printed successfully!"), 0.1)
@@ -225,6 +807,18 @@ class LabelPrinterApp(App):
         thread.daemon = True
         thread.start()
     
+    def on_stop(self):
+        """Flush the print journal and history and stop status tracking when the app closes"""
+        self.print_queue.stop(timeout=2.0)
+        self.autocomplete.close()
+        if self.thin_client:
+            self.backend.close()
+            return
+        self.journal.close()
+        self.backend.set_print_history(None)
+        self.print_history.close()
+        self.status_monitor.stop()
+    
     def clear_inputs(self):
         """Clear all input fields"""
         self.sap_input.text = ''
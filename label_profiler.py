@@ -0,0 +1,370 @@
+"""
+Label Profiler
+On-demand profiling of the render and print pipeline on a live station.
+
+Two modes:
+    cprofile:N   cProfile for the next N labels (deterministic, every call)
+    sample:S     stack samples of threads printing labels, every 5 ms for
+                 S seconds (low overhead, safe on a busy line)
+
+Enable with the LABEL_PROFILE environment variable (e.g.
+LABEL_PROFILE=cprofile:100), `label_cli.py --profile sample:60 ...` or the
+PROFILE button of the GUI queue screen. Results are written to profiles/
+(LABEL_PROFILE_DIR) in two formats:
+    .pstats     python -m pstats / snakeviz
+    .collapsed  flamegraph.pl / speedscope ("a;b;c <weight>" per line)
+
+When profiling is off, the pipeline only checks `label_profiler.active`
+(None) once per label. Messages go to stderr, so the JSON output of
+`label_cli.py pipe` stays clean.
+"""
+
+import os
+import sys
+import time
+import atexit
+import pstats
+import cProfile
+import threading
+from collections import Counter
+
+
+PROFILE_ENV = 'LABEL_PROFILE'
+PROFILE_DIR_ENV = 'LABEL_PROFILE_DIR'
+PROFILE_DIR = 'profiles'
+
+DEFAULT_JOBS = 50
+DEFAULT_SECONDS = 30.0
+SAMPLE_INTERVAL = 0.005
+
+# Deepest call path written to collapsed stacks
+MAX_STACK_DEPTH = 128
+
+# The running profiler (None = profiling off)
+active = None
+_active_lock = threading.Lock()
+
+
+def _label(func):
+    """Collapsed-stack frame name for a pstats function key."""
+    filename, lineno, name = func
+    if filename == '~':
+        return name     # built-in function
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def _code_key(code):
+    return (code.co_filename, code.co_firstlineno, code.co_name)
+
+
+def write_collapsed(path, stacks):
+    """
+    Write collapsed stacks (one "frame;frame;frame weight" line per stack).
+
+    Args:
+        path (str): Output file
+        stacks (dict): Tuple of pstats function keys (root first) -> weight
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, weight in sorted(stacks.items()):
+            if weight > 0:
+                f.write(f"{';'.join(_label(func) for func in stack)} {int(weight)}\n")
+
+
+def stats_to_stacks(stats):
+    """
+    Approximate call stacks from cProfile statistics.
+
+    cProfile records caller/callee pairs, not whole stacks. Time is split
+    along each call path in proportion to the pair timings, which is what
+    flame graph tools built on cProfile show.
+
+    Args:
+        stats (dict): pstats.Stats.stats
+
+    Returns:
+        dict: Stack tuple (root first) -> self time in microseconds
+    """
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, (_, _, _, cumulative) in callers.items():
+            callees.setdefault(caller, []).append((func, cumulative))
+
+    stacks = Counter()
+
+    def expand(func, path, cumulative):
+        _, _, own_total, func_total, _ = stats[func]
+        if func_total <= 0:
+            return
+        share = min(1.0, cumulative / func_total)
+        stacks[path] += own_total * share * 1e6
+        if len(path) >= MAX_STACK_DEPTH:
+            return
+        for callee, edge_total in callees.get(func, ()):
+            # Recursion is folded into the outermost call
+            if callee not in path and edge_total * share >= 1e-6:
+                expand(callee, path + (callee,), edge_total * share)
+
+    for func, (_, _, _, total, callers) in stats.items():
+        if not callers:
+            expand(func, (func,), total)
+    return stacks
+
+
+class _SampleStats:
+    """pstats-compatible statistics built from stack samples (call counts are sample counts)"""
+
+    def __init__(self, samples, interval):
+        self.samples = samples
+        self.interval = interval
+        self.stats = {}
+
+    def create_stats(self):
+        stats = {}
+        for stack, count in self.samples.items():
+            seconds = count * self.interval
+            for func in set(stack):
+                cc, nc, tt, ct, callers = stats.get(func, (0, 0, 0.0, 0.0, {}))
+                stats[func] = (cc + count, nc + count, tt, ct + seconds, callers)
+            leaf = stack[-1]
+            cc, nc, tt, ct, callers = stats[leaf]
+            stats[leaf] = (cc, nc, tt + seconds, ct, callers)
+            for caller, callee in set(zip(stack, stack[1:])):
+                callers = stats[callee][4]
+                e_nc, e_cc, e_tt, e_ct = callers.get(caller, (0, 0, 0.0, 0.0))
+                callers[caller] = (e_nc + count, e_cc + count,
+                                   e_tt + (seconds if callee == leaf else 0.0), e_ct + seconds)
+        self.stats = stats
+
+
+class _Profiler:
+    """Shared output handling"""
+
+    mode = ''
+
+    def __init__(self, output_dir=None):
+        self.output_dir = output_dir or os.environ.get(PROFILE_DIR_ENV) or PROFILE_DIR
+        self.stopped = threading.Event()     # no more recording
+        self.finished = threading.Event()    # results written
+        self.paths = None
+
+    def _output_paths(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime('%Y%m%d_%H%M%S')
+        base = os.path.join(self.output_dir, f"label_profile_{self.mode}_{stamp}_{os.getpid()}")
+        return base + '.pstats', base + '.collapsed'
+
+    def finish(self):
+        """
+        Stop profiling and write the results (only the first call writes).
+
+        Returns:
+            tuple: (pstats path, collapsed path), or None if nothing was recorded
+        """
+        global active
+        with _active_lock:
+            if active is self:
+                active = None
+            first = not self.stopped.is_set()
+            self.stopped.set()
+        if not first:
+            self.finished.wait()
+            return self.paths
+        try:
+            self.paths = self._write()
+        finally:
+            self.finished.set()
+        if self.paths:
+            print(f"Profile written: {self.paths[0]}, {self.paths[1]}", file=sys.stderr)
+        return self.paths
+
+    def start(self):
+        pass
+
+
+class JobProfiler(_Profiler):
+    """cProfile over a fixed number of print jobs"""
+
+    mode = 'cprofile'
+
+    def __init__(self, max_jobs=DEFAULT_JOBS, output_dir=None):
+        """
+        Args:
+            max_jobs (int): Labels to profile before writing the results
+            output_dir (str): Folder for the result files
+        """
+        super().__init__(output_dir)
+        self.max_jobs = max_jobs
+        self.jobs = 0
+        self._profile = cProfile.Profile()
+        self._lock = threading.Lock()
+
+    def call(self, func, *args, **kwargs):
+        """
+        Run one pipeline job, profiled unless another thread's job is.
+
+        cProfile follows a single thread, so concurrent jobs (queue
+        workers) run unprofiled while one is being recorded.
+        """
+        if self.stopped.is_set() or not self._lock.acquire(blocking=False):
+            return func(*args, **kwargs)
+        try:
+            self._profile.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._profile.disable()
+                self.jobs += 1
+        finally:
+            self._lock.release()
+            if self.jobs >= self.max_jobs:
+                self.finish()
+
+    def _write(self):
+        with self._lock:
+            if not self.jobs:
+                return None
+            stats = pstats.Stats(self._profile)
+        pstats_path, collapsed_path = self._output_paths()
+        stats.dump_stats(pstats_path)
+        write_collapsed(collapsed_path, stats_to_stacks(stats.stats))
+        return pstats_path, collapsed_path
+
+
+class SamplingProfiler(_Profiler):
+    """Periodic stack samples of threads running print jobs"""
+
+    mode = 'sample'
+
+    def __init__(self, duration=DEFAULT_SECONDS, interval=SAMPLE_INTERVAL, output_dir=None):
+        """
+        Args:
+            duration (float): Seconds to sample before writing the results
+                              (None = until finish() is called)
+            interval (float): Seconds between samples
+            output_dir (str): Folder for the result files
+        """
+        super().__init__(output_dir)
+        self.duration = duration
+        self.interval = interval
+        self.samples = Counter()
+        self._jobs = {}             # thread id -> running pipeline jobs
+        self._thread = None
+
+    def call(self, func, *args, **kwargs):
+        """Run one pipeline job with its thread marked for sampling."""
+        ident = threading.get_ident()
+        self._jobs[ident] = self._jobs.get(ident, 0) + 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            remaining = self._jobs[ident] - 1
+            if remaining:
+                self._jobs[ident] = remaining
+            else:
+                del self._jobs[ident]
+
+    def start(self):
+        """Start the sampling thread."""
+        self._thread = threading.Thread(target=self._run, name='label-profiler', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        deadline = None if self.duration is None else time.monotonic() + self.duration
+        while not self.stopped.wait(self.interval):
+            if deadline is not None and time.monotonic() >= deadline:
+                self.finish()
+                return
+            if not self._jobs:
+                continue
+            frames = sys._current_frames()
+            for ident in list(self._jobs):
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    stack.append(_code_key(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    self.samples[tuple(reversed(stack[:MAX_STACK_DEPTH]))] += 1
+            del frames
+
+    def _write(self):
+        samples = dict(self.samples)
+        if not samples:
+            return None
+        pstats_path, collapsed_path = self._output_paths()
+        pstats.Stats(_SampleStats(samples, self.interval)).dump_stats(pstats_path)
+        write_collapsed(collapsed_path, samples)
+        return pstats_path, collapsed_path
+
+
+def parse_spec(spec, output_dir=None):
+    """
+    Create a profiler from a mode string.
+
+    Args:
+        spec (str): 'cprofile[:JOBS]' or 'sample[:SECONDS]'
+        output_dir (str): Folder for the result files
+
+    Returns:
+        JobProfiler or SamplingProfiler
+    """
+    mode, _, amount = spec.strip().partition(':')
+    try:
+        if mode == 'cprofile':
+            return JobProfiler(int(amount) if amount else DEFAULT_JOBS, output_dir)
+        if mode == 'sample':
+            return SamplingProfiler(float(amount) if amount else DEFAULT_SECONDS,
+                                    output_dir=output_dir)
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid profile mode {spec!r} (use cprofile[:JOBS] or sample[:SECONDS])")
+
+
+def enable(profiler):
+    """
+    Start profiling the pipeline (replaces a running profiler, writing its results).
+
+    Args:
+        profiler (str, JobProfiler or SamplingProfiler): Profiler or mode string
+
+    Returns:
+        The started profiler
+    """
+    global active
+    if isinstance(profiler, str):
+        profiler = parse_spec(profiler)
+    stop()
+    with _active_lock:
+        active = profiler
+    profiler.start()
+    # Results of a process that exits early are still written
+    atexit.register(profiler.finish)
+    print(f"Profiling label pipeline ({profiler.mode}), results in {profiler.output_dir}/",
+          file=sys.stderr)
+    return profiler
+
+
+def stop():
+    """
+    Stop profiling and write the results.
+
+    Returns:
+        tuple: (pstats path, collapsed path), or None
+    """
+    profiler = active
+    return profiler.finish() if profiler is not None else None
+
+
+def enable_from_environment():
+    """
+    Start profiling if LABEL_PROFILE is set (e.g. LABEL_PROFILE=sample:60).
+
+    Called by the entry points (label_cli.py main, GUI build), not on import.
+    """
+    spec = os.environ.get(PROFILE_ENV)
+    if spec and active is None:
+        try:
+            enable(spec)
+        except ValueError as e:
+            print(f"{PROFILE_ENV} ignored: {e}", file=sys.stderr)
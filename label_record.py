@@ -0,0 +1,331 @@
+"""
+Label Records
+The one place label input is parsed.
+
+LabelRecord is a single label (SAP-Nr, Cantitate, Lot Nr) parsed from the
+"SAP|CANTITATE|LOT" text format. RecordBatch holds many records in
+columnar form: each field is an array of 4-byte codes into a table of
+distinct values. Batch input repeats the same SAP and lot values on
+thousands of rows, so a million records take about 12 MB plus the
+distinct strings. parse_batch() fills the columns with a handful of
+C-level passes per block (split, dict build, map) instead of a Python
+loop per row.
+"""
+
+import csv
+import io
+from array import array
+
+
+FIELDS = ('sap_nr', 'cantitate', 'lot_number')
+
+# CSV header names recognised in the first column
+_CSV_HEADERS = ('sap', 'sap_nr', 'sap-nr')
+
+
+class LabelRecord:
+    """One label: SAP article number, quantity and lot/cable ID"""
+
+    __slots__ = FIELDS
+
+    def __init__(self, sap_nr='', cantitate='', lot_number=''):
+        self.sap_nr = sap_nr
+        self.cantitate = cantitate
+        self.lot_number = lot_number
+
+    @classmethod
+    def from_text(cls, text, delimiter='|'):
+        """
+        Parse combined label text.
+
+        Fields are stripped; a text without the delimiter is a single SAP
+        value, missing fields are empty and extra fields are ignored.
+
+        Args:
+            text (str): "SAP|CANTITATE|LOT" or a single value
+            delimiter (str): Field separator
+
+        Returns:
+            LabelRecord: Parsed record
+        """
+        if delimiter not in text:
+            return cls(text.strip())
+        parts = text.split(delimiter, 3)
+        return cls(*(part.strip() for part in parts[:3]))
+
+    @classmethod
+    def parse(cls, value):
+        """
+        Coerce any accepted label input to a LabelRecord.
+
+        Args:
+            value: LabelRecord, combined text or a (sap, qty, lot) sequence
+
+        Returns:
+            LabelRecord: Parsed record (value itself if already a record)
+        """
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, str):
+            return cls.from_text(value)
+        return cls(*(str(field or '').strip() for field in tuple(value)[:3]))
+
+    @property
+    def text(self):
+        """Combined "SAP|CANTITATE|LOT" text."""
+        return f"{self.sap_nr}|{self.cantitate}|{self.lot_number}"
+
+    def __iter__(self):
+        # Unpacks like the (sap_nr, cantitate, lot_number) tuples used by batches
+        yield self.sap_nr
+        yield self.cantitate
+        yield self.lot_number
+
+    def __eq__(self, other):
+        if isinstance(other, LabelRecord):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return f"LabelRecord({self.sap_nr!r}, {self.cantitate!r}, {self.lot_number!r})"
+
+
+def build_label_text(sap='', qty='', lot='', text=None):
+    """
+    Build the combined "SAP|CANTITATE|LOT" label text.
+
+    Args:
+        sap (str): SAP article number
+        qty (str): Quantity
+        lot (str): Lot/Cable ID
+        text (str): Already combined text (takes precedence)
+
+    Returns:
+        str: Combined label text
+    """
+    if text:
+        return text
+    return f"{sap or ''}|{qty or ''}|{lot or ''}"
+
+
+def record_text(record):
+    """
+    Get the label text of a JSON record (label_cli.py pipe, .jsonl imports).
+
+    Accepts either "text" or the separate fields "sap"/"sap_nr",
+    "qty"/"cantitate" and "lot"/"lot_number".
+
+    Args:
+        record (dict): Decoded JSON record
+
+    Returns:
+        str: Combined label text
+    """
+    return build_label_text(
+        record.get('sap', record.get('sap_nr', '')),
+        record.get('qty', record.get('cantitate', '')),
+        record.get('lot', record.get('lot_number', '')),
+        record.get('text'),
+    )
+
+
+class RecordBatch:
+    """Columnar, dictionary-encoded batch of label records"""
+
+    __slots__ = ('values', 'sap_codes', 'qty_codes', 'lot_codes')
+
+    def __init__(self, values=None, sap_codes=None, qty_codes=None, lot_codes=None):
+        """
+        Args:
+            values (list): Distinct field values (code -> string)
+            sap_codes, qty_codes, lot_codes (array): Per-record codes into values
+        """
+        self.values = values if values is not None else []
+        self.sap_codes = sap_codes if sap_codes is not None else array('I')
+        self.qty_codes = qty_codes if qty_codes is not None else array('I')
+        self.lot_codes = lot_codes if lot_codes is not None else array('I')
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build a batch from records.
+
+        Args:
+            records (iterable): LabelRecords, texts or (sap, qty, lot) sequences
+
+        Returns:
+            RecordBatch: Batch in input order
+        """
+        batch = cls()
+        encoder = _ColumnEncoder(batch)
+        for record in records:
+            encoder.add_record(LabelRecord.parse(record))
+        return batch
+
+    def __len__(self):
+        return len(self.sap_codes)
+
+    def __getitem__(self, i):
+        values = self.values
+        return LabelRecord(values[self.sap_codes[i]], values[self.qty_codes[i]],
+                           values[self.lot_codes[i]])
+
+    def __iter__(self):
+        values = self.values
+        for sap, qty, lot in zip(self.sap_codes, self.qty_codes, self.lot_codes):
+            yield LabelRecord(values[sap], values[qty], values[lot])
+
+    def column(self, field):
+        """
+        Values of one field for every record.
+
+        Args:
+            field (str): 'sap_nr', 'cantitate' or 'lot_number'
+
+        Returns:
+            list: Field values in record order
+        """
+        codes = (self.sap_codes, self.qty_codes, self.lot_codes)[FIELDS.index(field)]
+        return list(map(self.values.__getitem__, codes))
+
+    def texts(self):
+        """Combined "SAP|CANTITATE|LOT" text of every record (generator)."""
+        for record in self:
+            yield record.text
+
+    def nbytes(self):
+        """Approximate memory of the columns and distinct values in bytes."""
+        columns = sum(len(c) * c.itemsize for c in (self.sap_codes, self.qty_codes,
+                                                     self.lot_codes))
+        return columns + sum(len(value) + 49 for value in self.values)
+
+
+# Characters parsed per step: bounds the temporary field lists
+_CHUNK_CHARS = 1 << 20
+
+
+class _ColumnEncoder:
+    """Appends records to a RecordBatch, assigning one code per distinct value"""
+
+    def __init__(self, batch):
+        self.batch = batch
+        self.columns = (batch.sap_codes, batch.qty_codes, batch.lot_codes)
+        self.value_codes = {}   # stripped value -> code
+        self.raw_codes = {}     # unstripped input field -> code
+
+    def _value_code(self, value):
+        code = self.value_codes.get(value)
+        if code is None:
+            code = self.value_codes[value] = len(self.batch.values)
+            self.batch.values.append(value)
+        return code
+
+    def add_record(self, record):
+        for column, value in zip(self.columns, record):
+            column.append(self._value_code(value))
+
+    def add_lines(self, chunk, delimiter):
+        """Encode a block of lines (no trailing newline)."""
+        lines = chunk.count('\n') + 1
+        # Each line end becomes a field of its own: with exactly three fields
+        # per line, every fourth field is that marker
+        fields = chunk.replace('\n', f'{delimiter}\n{delimiter}').split(delimiter)
+        if len(fields) != 4 * lines - 1 or fields[3::4].count('\n') != lines - 1:
+            for line in chunk.split('\n'):
+                if line.strip():
+                    self.add_record(LabelRecord.from_text(line, delimiter))
+            return
+
+        # Strip and look up only the distinct fields of the chunk
+        raw_codes = self.raw_codes
+        for raw in dict.fromkeys(fields):
+            if raw not in raw_codes:
+                raw_codes[raw] = self._value_code(raw.strip())
+        for i, column in enumerate(self.columns):
+            column.extend(map(raw_codes.__getitem__, fields[i::4]))
+
+
+def _split_lines(data):
+    if '\r' in data:
+        data = data.replace('\r\n', '\n').replace('\r', '\n')
+    return data.strip('\n')
+
+
+def parse_batch(data, delimiter='|'):
+    """
+    Parse many "SAP|CANTITATE|LOT" lines into a RecordBatch.
+
+    Input is processed in blocks of about a million characters. A block in
+    which every line has exactly three fields (the normal case for exports)
+    is split and encoded with C-level operations; other blocks (blank lines,
+    single values, extra fields) take a per-line path with the same rules
+    as LabelRecord.from_text.
+
+    Args:
+        data (str or bytes): Input text, one record per line
+        delimiter (str): Field separator
+
+    Returns:
+        RecordBatch: Parsed records
+    """
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    data = _split_lines(data)
+
+    batch = RecordBatch()
+    encoder = _ColumnEncoder(batch)
+    start = 0
+    while start < len(data):
+        end = data.find('\n', start + _CHUNK_CHARS)
+        if end < 0:
+            end = len(data)
+        encoder.add_lines(data[start:end], delimiter)
+        start = end + 1
+    return batch
+
+
+def parse_csv(data):
+    """
+    Parse CSV input (sap, qty, lot columns; header row optional).
+
+    Unquoted CSV goes through the parse_batch fast path; quoted fields are
+    read with the csv module.
+
+    Args:
+        data (str or bytes): CSV text
+
+    Returns:
+        RecordBatch: Parsed records
+    """
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    data = _split_lines(data)
+    first_line, _, rest = data.partition('\n')
+    if first_line.split(',', 1)[0].strip().strip('"').lower() in _CSV_HEADERS:
+        data = rest
+
+    if '"' not in data:
+        return parse_batch(data, delimiter=',')
+
+    rows = csv.reader(io.StringIO(data))
+    return RecordBatch.from_records(row[:3] for row in rows if any(f.strip() for f in row))
+
+
+def read_batch_file(path):
+    """
+    Read a record file: .csv through parse_csv, anything else through parse_batch.
+
+    Args:
+        path (str): Input file
+
+    Returns:
+        RecordBatch: Parsed records
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        data = f.read()
+    if path.lower().endswith('.csv'):
+        return parse_csv(data)
+    return parse_batch(data)
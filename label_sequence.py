@@ -0,0 +1,324 @@
+"""
+Serial Number and Range Label Generation
+Expands range jobs ("lot L123, reels 0001-2000") and quantity splits into
+label records. A sequence is printed as one streamed batch through the
+print pipeline (preflight, verification, journal, history): multi-page
+documents of a bounded number of labels, each one print job with a
+deterministic job id. Rendering without a printer writes the same
+bounded documents to files.
+Named counters are persisted to disk so numbering survives restarts.
+"""
+
+import os
+import json
+import hashlib
+import datetime
+import threading
+from print_label_pdf import PDFLabelGenerator, PAGES_PER_DOCUMENT
+from label_record import LabelRecord
+
+
+# Label fields that can carry the incrementing value
+SEQUENCE_FIELDS = ('sap_nr', 'cantitate', 'lot_number')
+
+# Default location of the persistent counter file
+COUNTER_FILE = 'label_counters.json'
+
+
+def counter_values(start, stop, step=1, width=0, prefix='', suffix=''):
+    """
+    Generate formatted counter values for a range (inclusive).
+
+    Args:
+        start (int): First counter value
+        stop (int): Last counter value (inclusive)
+        step (int): Increment between labels (may be negative)
+        width (int): Zero-pad counters to this many digits (0 = no padding)
+        prefix (str): Text placed before the counter (e.g. "L123-")
+        suffix (str): Text placed after the counter
+
+    Yields:
+        str: Formatted value, e.g. "L123-0001"
+    """
+    if step == 0:
+        raise ValueError("step must not be 0")
+
+    end = stop + 1 if step > 0 else stop - 1
+    for number in range(start, end, step):
+        yield f"{prefix}{number:0{width}d}{suffix}"
+
+
+def split_quantity(total, per_label):
+    """
+    Split a total quantity into per-label quantities.
+
+    Example: total=1000, per_label=300 gives 300, 300, 300, 100.
+
+    Args:
+        total (int): Total quantity
+        per_label (int): Maximum quantity per label
+
+    Yields:
+        str: Quantity for each label
+    """
+    if per_label <= 0:
+        raise ValueError("per_label must be greater than 0")
+
+    remaining = total
+    while remaining > 0:
+        quantity = min(per_label, remaining)
+        yield str(quantity)
+        remaining -= quantity
+
+
+def sequence_records(sap_nr, cantitate, lot_number, field, values):
+    """
+    Build label records where one field takes each value of a sequence.
+
+    Args:
+        sap_nr (str): SAP article number (fixed unless field == 'sap_nr')
+        cantitate (str): Quantity (fixed unless field == 'cantitate')
+        lot_number (str): Lot/Cable ID (fixed unless field == 'lot_number')
+        field (str): Field that receives the sequence values
+        values (iterable): Values for the incrementing field
+
+    Yields:
+        tuple: (sap_nr, cantitate, lot_number) per label
+    """
+    if field not in SEQUENCE_FIELDS:
+        raise ValueError(f"Unknown sequence field: {field}")
+
+    record = [sap_nr, cantitate, lot_number]
+    index = SEQUENCE_FIELDS.index(field)
+    for value in values:
+        record[index] = value
+        yield tuple(record)
+
+
+class CounterStore:
+    """Named counters persisted to a JSON file"""
+
+    def __init__(self, path=COUNTER_FILE):
+        """
+        Initialize counter store.
+
+        Args:
+            path (str): Path of the JSON counter file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save(self, counters):
+        # Write to a temporary file first so a crash never leaves a
+        # truncated counter file behind
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(counters, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def peek(self, name, start=1):
+        """
+        Get the next value of a counter without reserving it.
+
+        Args:
+            name (str): Counter name (e.g. "L123")
+            start (int): Value used if the counter does not exist yet
+
+        Returns:
+            int: Next counter value
+        """
+        with self._lock:
+            return self._load().get(name, start)
+
+    def reserve(self, name, count, start=1, step=1):
+        """
+        Reserve a block of counter values.
+
+        The counter is advanced and saved before any label is rendered, so
+        a crash never hands out the same number twice.
+
+        Args:
+            name (str): Counter name (e.g. "L123")
+            count (int): Number of labels to reserve
+            start (int): Value used if the counter does not exist yet
+            step (int): Increment between labels
+
+        Returns:
+            tuple: (first, last) reserved values (inclusive)
+        """
+        if count <= 0:
+            raise ValueError("count must be greater than 0")
+
+        with self._lock:
+            counters = self._load()
+            first = counters.get(name, start)
+            last = first + (count - 1) * step
+            counters[name] = last + step
+            self._save(counters)
+        return first, last
+
+    def reset(self, name, value=1):
+        """
+        Set a counter to a specific next value.
+
+        Args:
+            name (str): Counter name
+            value (int): Next value to hand out
+        """
+        with self._lock:
+            counters = self._load()
+            counters[name] = value
+            self._save(counters)
+
+
+def reserve_counter_values(store, name, count, width=0, prefix='', suffix='', start=1, step=1):
+    """
+    Reserve a block from a persistent counter and format its values.
+
+    Args:
+        store (CounterStore): Counter store
+        name (str): Counter name
+        count (int): Number of labels
+        width (int): Zero-pad counters to this many digits
+        prefix (str): Text placed before the counter
+        suffix (str): Text placed after the counter
+        start (int): Value used if the counter does not exist yet
+        step (int): Increment between labels
+
+    Returns:
+        generator: Formatted counter values
+    """
+    first, last = store.reserve(name, count, start=start, step=step)
+    return counter_values(first, last, step=step, width=width, prefix=prefix, suffix=suffix)
+
+
+def create_sequence_pdf(sap_nr, cantitate, lot_number, field, values, filename=None, generator=None,
+                        pages_per_document=PAGES_PER_DOCUMENT):
+    """
+    Render a whole sequence job as multi-page PDFs (one page per label).
+
+    Only the incrementing field is encoded per label; barcodes of the fixed
+    fields are rendered once and reused for every page. Long sequences are
+    streamed into documents of at most pages_per_document labels
+    (PDFLabelGenerator.write_batch_pdfs), so memory does not grow with the
+    length of the range.
+
+    Args:
+        sap_nr (str): SAP article number
+        cantitate (str): Quantity value
+        lot_number (str): Lot/Cable ID
+        field (str): Field that receives the sequence values
+        values (iterable): Values for the incrementing field
+        filename (str): First output file (auto-generated in pdf_backup if None);
+                        further documents get a counter (name_0002.pdf, ...)
+        generator (PDFLabelGenerator): Generator to reuse (created if None)
+        pages_per_document (int): Maximum labels per document
+
+    Returns:
+        list: Paths of the generated PDF files
+    """
+    if generator is None:
+        generator = PDFLabelGenerator()
+
+    if not filename:
+        pdf_backup_dir = 'pdf_backup'
+        os.makedirs(pdf_backup_dir, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = os.path.join(pdf_backup_dir, f"sequence_{timestamp}.pdf")
+
+    records = sequence_records(sap_nr, cantitate, lot_number, field, values)
+    return generator.write_batch_pdfs(records, filename, pages_per_document)
+
+
+def sequence_batch_id(sap_nr, cantitate, lot_number, field, values):
+    """
+    Journal batch id of a sequence job.
+
+    The same job (fixed fields and values) always gets the same id, so
+    printing it again after a crash resumes at its first unconfirmed label.
+
+    Args:
+        sap_nr (str): SAP article number
+        cantitate (str): Quantity value
+        lot_number (str): Lot/Cable ID
+        field (str): Field that receives the sequence values
+        values (list): Values for the incrementing field
+
+    Returns:
+        str: Batch id, e.g. "seq:SAP123|100|*:L123-0001..L123-2000:1f0e3dad"
+    """
+    record = [sap_nr, cantitate, lot_number]
+    record[SEQUENCE_FIELDS.index(field)] = '*'
+    first, last = (values[0], values[-1]) if values else ('', '')
+    digest = hashlib.blake2b('\n'.join(values).encode('utf-8'), digest_size=4).hexdigest()
+    return f"seq:{'|'.join(record)}:{first}..{last}:{digest}"
+
+
+def print_sequence(printer, sap_nr, cantitate, lot_number, field, values, journal=None,
+                   batch_id=None, use_pdf=True, verify=True, pages_per_document=PAGES_PER_DOCUMENT):
+    """
+    Print a sequence job as one streamed batch.
+
+    PDF labels go through print_label.print_label_batch(): the range is
+    preflighted up front and rendered and spooled as multi-page documents
+    of at most pages_per_document labels (one print job and, with a
+    journal, one journal job each), so the same sequence printed again
+    after a crash skips the documents that already went out. PNG labels
+    are single images and print one by one (print_journal.print_batch()
+    with a journal).
+
+    Args:
+        printer (str): Printer name or "PDF"
+        sap_nr (str): SAP article number
+        cantitate (str): Quantity value
+        lot_number (str): Lot/Cable ID
+        field (str): Field that receives the sequence values
+        values (iterable): Values for the incrementing field
+        journal (PrintJournal): Journal to record and resume the job in
+        batch_id (str): Journal batch id (default: sequence_batch_id())
+        use_pdf (bool): True to print PDF labels, False for PNG
+        verify (bool): Decode the rendered barcodes before spooling
+        pages_per_document (int): Labels per PDF print job
+
+    Returns:
+        dict: Counts of 'printed', 'skipped' and 'failed' labels and
+              'unconfirmed' job ids (see print_journal.print_batch)
+
+    Raises:
+        PreflightError: If any label has a value the barcodes cannot encode
+                        (checked before the first label prints)
+    """
+    from print_label import print_label_batch, print_label_standalone
+    from print_journal import print_batch
+    from label_preflight import check_batch
+
+    values = list(values)
+    if batch_id is None:
+        batch_id = sequence_batch_id(sap_nr, cantitate, lot_number, field, values)
+    records = sequence_records(sap_nr, cantitate, lot_number, field, values)
+    if use_pdf:
+        return print_label_batch(records, printer, journal, batch_id, verify=verify,
+                                 pages_per_document=pages_per_document)
+
+    texts = [LabelRecord(*record).text for record in records]
+    if journal is not None:
+        return print_batch(texts, printer, journal, batch_id, use_pdf=False, verify=verify)
+
+    check_batch(texts)
+    summary = {'printed': 0, 'skipped': 0, 'failed': 0, 'unconfirmed': []}
+    for index, text in enumerate(texts):
+        if print_label_standalone(text, printer, preview=0, use_pdf=False, verify=verify,
+                                  job_id=f"{batch_id}:{index}", batch_id=batch_id):
+            summary['printed'] += 1
+        else:
+            summary['failed'] += 1
+    return summary
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Label Printer - End-to-End Load Test
+Drives print_label_standalone from N concurrent virtual stations against
+simulated printers and reports latency percentiles and sustained throughput.
+Runs on a plain Linux box: no CUPS or real printers needed.
+
+Example:
+    python load_test.py --stations 8 --labels 200 --printers 2 \\
+        --latency 0.05 --failure-rate 0.01 --paper-out-every 500
+
+    # Same printers behind one load-balanced pool
+    python load_test.py --stations 8 --labels 200 --printers 4 --pool
+"""
+
+import sys
+import math
+import time
+import argparse
+import threading
+import contextlib
+
+from print_label import print_label_standalone, unregister_printer_backend, get_pdf_generator
+from printer_simulator import add_simulated_printers, remove_simulated_printers
+from printer_pool import PrinterPool, register_pool
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+
+    Args:
+        sorted_values (list): Values in ascending order
+        fraction (float): Percentile as a fraction (0.95 for p95)
+
+    Returns:
+        float: Percentile value (0.0 for an empty list)
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_load_test(stations=4, labels_per_station=50, printer_names=None, use_pdf=True,
+                  verify=True, think_time=0.0, print_func=None):
+    """
+    Run a load test from concurrent virtual stations.
+
+    Each station prints its labels one after another (like an operator
+    station); station i sends to printer_names[i % len(printer_names)].
+
+    Args:
+        stations (int): Number of concurrent virtual stations
+        labels_per_station (int): Labels printed by each station
+        printer_names (list): Printers to target (default: ["PDF"])
+        use_pdf (bool): True for PDF labels, False for PNG
+        verify (bool): Run barcode verification for every label
+        think_time (float): Pause between labels of one station (seconds)
+        print_func (callable): Replaces print_label_standalone(text, printer)
+
+    Returns:
+        dict: Latency percentiles (ms), throughput and failure counts
+    """
+    printer_names = printer_names or ["PDF"]
+    if print_func is None:
+        def print_func(text, printer):
+            return print_label_standalone(text, printer, preview=0, use_pdf=use_pdf,
+                                          verify=verify)
+
+    latencies = []
+    failures = [0]
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(stations + 1)
+
+    def station(index):
+        printer = printer_names[index % len(printer_names)]
+        local_latencies = []
+        local_failures = 0
+        start_barrier.wait()
+        for number in range(labels_per_station):
+            text = f"SAP{index:04d}|{number + 1}|ST{index:02d}-{number:06d}"
+            started = time.perf_counter()
+            ok = print_func(text, printer)
+            local_latencies.append(time.perf_counter() - started)
+            if not ok:
+                local_failures += 1
+            if think_time:
+                time.sleep(think_time)
+        with lock:
+            latencies.extend(local_latencies)
+            failures[0] += local_failures
+
+    threads = [threading.Thread(target=station, args=(i,), daemon=True) for i in range(stations)]
+    for thread in threads:
+        thread.start()
+
+    output_before = get_pdf_generator().output_stats()
+
+    # Library code reports every label with print(); keep the console readable
+    with contextlib.redirect_stdout(None):
+        start_barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+    output_after = get_pdf_generator().output_stats()
+    pdf_labels = output_after['labels'] - output_before['labels']
+    pdf_bytes = output_after['bytes'] - output_before['bytes']
+
+    latencies.sort()
+    total = len(latencies)
+    return {
+        'stations': stations,
+        'labels': total,
+        'failed': failures[0],
+        'elapsed_s': round(elapsed, 3),
+        'labels_per_second': round(total / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        'bytes_per_label': round(pdf_bytes / pdf_labels) if pdf_labels else 0,
+    }
+
+
+def print_report(result, printers=()):
+    """Print a load test result as a readable report."""
+    print("=" * 60)
+    print("LOAD TEST RESULTS")
+    print("=" * 60)
+    print(f"Stations:            {result['stations']}")
+    print(f"Labels:              {result['labels']} ({result['failed']} failed)")
+    print(f"Elapsed:             {result['elapsed_s']} s")
+    print(f"Sustained rate:      {result['labels_per_second']} labels/s")
+    print(f"Latency p50/p95/p99: {result['p50_ms']} / {result['p95_ms']} / {result['p99_ms']} ms"
+          f" (max {result['max_ms']} ms)")
+    if result['bytes_per_label']:
+        print(f"PDF size:            {result['bytes_per_label']} bytes/label")
+    for printer in printers:
+        stats = printer.stats()
+        print(f"  {stats['name']:<10} jobs={stats['jobs']} failed={stats['failed']} "
+              f"paper_out={stats['paper_out_events']} bytes={stats['bytes_received']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='End-to-end label printing load test')
+    parser.add_argument('--stations', type=int, default=4, help='Concurrent virtual stations')
+    parser.add_argument('--labels', type=int, default=50, help='Labels per station')
+    parser.add_argument('--printers', type=int, default=1, help='Simulated printers')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds per printed job')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra latency (s)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Job failure probability')
+    parser.add_argument('--paper-out-every', type=int, default=0, help='Paper-out after N jobs')
+    parser.add_argument('--paper-out-duration', type=float, default=2.0, help='Paper-out length (s)')
+    parser.add_argument('--max-rate', type=float, default=None, help='Jobs/s cap per printer')
+    parser.add_argument('--think-time', type=float, default=0.0, help='Pause between labels (s)')
+    parser.add_argument('--png', action='store_true', help='Use PNG instead of PDF')
+    parser.add_argument('--no-verify', action='store_true', help='Skip barcode verification')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed')
+    parser.add_argument('--pool', action='store_true',
+                        help='Send all stations to one pool of the simulated printers')
+    args = parser.parse_args(argv)
+
+    printers = add_simulated_printers(
+        args.printers,
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        paper_out_every=args.paper_out_every,
+        paper_out_duration=args.paper_out_duration,
+        max_jobs_per_second=args.max_rate,
+        seed=args.seed,
+    )
+    targets = [printer.name for printer in printers]
+    pool = None
+    if args.pool:
+        pool = register_pool(PrinterPool('SIM-POOL', targets))
+        targets = [pool.name]
+    try:
+        result = run_load_test(
+            stations=args.stations,
+            labels_per_station=args.labels,
+            printer_names=targets,
+            use_pdf=not args.png,
+            verify=not args.no_verify,
+            think_time=args.think_time,
+        )
+    finally:
+        remove_simulated_printers(printers)
+        if pool is not None:
+            unregister_printer_backend(pool.name)
+
+    print_report(result, printers)
+    return 0 if result['failed'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
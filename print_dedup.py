@@ -0,0 +1,94 @@
+"""
+Duplicate Print Suppression
+Idempotency keys for the print path. A key is either supplied by the
+client or derived from the label record and printer; a second submission
+with the same key inside the time window is dropped before rendering.
+
+Lookups are O(1): keys live in a dict kept in insertion order, and since
+every key has the same lifetime, expired keys are always at the front and
+are purged from there.
+"""
+
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class DuplicateFilter:
+    """In-memory idempotency index with expiry"""
+
+    def __init__(self, window=10.0, max_keys=100000, clock=time.monotonic):
+        """
+        Initialize duplicate filter.
+
+        Args:
+            window (float): Seconds a key stays active after its first submission
+            max_keys (int): Upper bound on remembered keys (oldest dropped first)
+            clock (callable): Monotonic time source (for tests/simulations)
+        """
+        self.window = window
+        self.max_keys = max_keys
+        self._clock = clock
+        self._expiry = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _purge(self, now):
+        expiry = self._expiry
+        while expiry:
+            key, expires = next(iter(expiry.items()))
+            if expires > now and len(expiry) <= self.max_keys:
+                break
+            expiry.popitem(last=False)
+
+    def check(self, key):
+        """
+        Register a submission.
+
+        Args:
+            key (str): Idempotency key
+
+        Returns:
+            bool: True for a new submission, False for a duplicate
+        """
+        now = self._clock()
+        with self._lock:
+            self._purge(now)
+            expires = self._expiry.get(key)
+            if expires is not None and expires > now:
+                return False
+            self._expiry[key] = now + self.window
+            return True
+
+    def release(self, key):
+        """
+        Forget a key, e.g. after its job failed, so a retry is accepted.
+
+        Args:
+            key (str): Idempotency key
+        """
+        with self._lock:
+            self._expiry.pop(key, None)
+
+    def __len__(self):
+        with self._lock:
+            self._purge(self._clock())
+            return len(self._expiry)
+
+
+def derive_key(text, printer=''):
+    """
+    Derive an idempotency key from a label record and printer.
+
+    Fields are stripped first, so "A|1|B" and " A | 1 | B " give the same key.
+
+    Args:
+        text (str): Label text ("SAP|CANTITATE|LOT")
+        printer (str): Target printer
+
+    Returns:
+        str: Hex key
+    """
+    fields = '|'.join(part.strip() for part in text.split('|'))
+    digest = hashlib.blake2b(f"{printer}\x1f{fields}".encode('utf-8'), digest_size=16)
+    return digest.hexdigest()
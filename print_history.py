@@ -0,0 +1,239 @@
+"""
+Print History
+Searchable index of printed labels, used to find and reprint old labels
+without browsing pdf_backup/ by file name.
+
+Labels are stored in SQLite with case-insensitive B-tree indexes on the
+SAP number and on the lot/cable ID. A prefix search is a range scan of
+one index that stops after `limit` rows, so it returns in well under a
+millisecond with millions of labels recorded. Results come in index
+order: by value, newest first for each value.
+
+Inserts are committed in groups (every commit_every labels or
+commit_interval seconds, like the print journal), so recording a label
+costs microseconds.
+"""
+
+import time
+import sqlite3
+import threading
+
+from label_record import LabelRecord
+
+
+HISTORY_FILE = 'print_history.db'
+
+# Fields that can be searched by prefix
+SEARCH_FIELDS = ('sap_nr', 'lot_number')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS labels (
+    id INTEGER PRIMARY KEY,
+    printed REAL NOT NULL,
+    sap_nr TEXT NOT NULL COLLATE NOCASE,
+    cantitate TEXT NOT NULL,
+    lot_number TEXT NOT NULL COLLATE NOCASE,
+    printer TEXT NOT NULL,
+    file_path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS labels_sap ON labels (sap_nr, id DESC);
+CREATE INDEX IF NOT EXISTS labels_lot ON labels (lot_number, id DESC);
+"""
+
+_COLUMNS = 'id, printed, sap_nr, cantitate, lot_number, printer, file_path'
+
+# Upper bound for a prefix range (sorts after any text starting with the prefix)
+_PREFIX_END = '\U0010ffff'
+
+
+class HistoryEntry:
+    """One printed label"""
+
+    __slots__ = ('entry_id', 'printed', 'sap_nr', 'cantitate', 'lot_number',
+                 'printer', 'file_path')
+
+    def __init__(self, entry_id, printed, sap_nr, cantitate, lot_number, printer, file_path):
+        self.entry_id = entry_id
+        self.printed = printed
+        self.sap_nr = sap_nr
+        self.cantitate = cantitate
+        self.lot_number = lot_number
+        self.printer = printer
+        self.file_path = file_path
+
+    @property
+    def record(self):
+        """The printed label as a LabelRecord."""
+        return LabelRecord(self.sap_nr, self.cantitate, self.lot_number)
+
+    def summary(self):
+        """One display line: time, label text and printer."""
+        printed = time.strftime('%Y-%m-%d %H:%M', time.localtime(self.printed))
+        return f"{printed}  {self.record.text}  ({self.printer})"
+
+    def __repr__(self):
+        return f"HistoryEntry({self.entry_id}, {self.record.text!r}, {self.printer!r})"
+
+
+class PrintHistory:
+    """SQLite index of printed labels with prefix search"""
+
+    def __init__(self, path=HISTORY_FILE, commit_every=64, commit_interval=1.0):
+        """
+        Open (or create) a history database.
+
+        Args:
+            path (str): SQLite file (':memory:' for a throwaway index)
+            commit_every (int): Commit after this many recorded labels
+            commit_interval (float): Commit at least this often (seconds) while recording
+        """
+        self.path = path
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+    def record(self, record, printer, file_path=''):
+        """
+        Add a printed label.
+
+        Args:
+            record (LabelRecord or str): Label that was printed
+            printer (str): Printer it was sent to
+            file_path (str): Rendered document (reused by reprints)
+
+        Returns:
+            int: History entry id
+        """
+        sap_nr, cantitate, lot_number = LabelRecord.parse(record)
+        with self._lock:
+            cursor = self._conn.execute(
+                'INSERT INTO labels (printed, sap_nr, cantitate, lot_number, printer, file_path) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (time.time(), sap_nr, cantitate, lot_number, printer, file_path or ''))
+            self._uncommitted += 1
+            if (self._uncommitted >= self.commit_every
+                    or time.monotonic() - self._last_commit >= self.commit_interval):
+                self._commit()
+            return cursor.lastrowid
+
+    def _commit(self):
+        """Commit recorded labels (caller holds the lock)."""
+        if self._uncommitted:
+            self._conn.commit()
+            self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+    def commit(self):
+        """Write recorded labels to disk now."""
+        with self._lock:
+            self._commit()
+
+    def _query(self, sql, params):
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [HistoryEntry(*row) for row in rows]
+
+    def get(self, entry_id):
+        """
+        Look up one entry.
+
+        Args:
+            entry_id (int): Id returned by record() or found by search()
+
+        Returns:
+            HistoryEntry or None: The entry, or None if unknown
+        """
+        entries = self._query(f'SELECT {_COLUMNS} FROM labels WHERE id = ?', (entry_id,))
+        return entries[0] if entries else None
+
+    def recent(self, limit=50):
+        """
+        Most recently printed labels.
+
+        Args:
+            limit (int): Maximum entries
+
+        Returns:
+            list: HistoryEntry objects, newest first
+        """
+        return self._query(f'SELECT {_COLUMNS} FROM labels ORDER BY id DESC LIMIT ?', (limit,))
+
+    def search(self, prefix, field=None, limit=50):
+        """
+        Find printed labels by SAP number or lot/cable ID prefix (case-insensitive).
+
+        Args:
+            prefix (str): Start of the value to find (empty = recent labels)
+            field (str): 'sap_nr' or 'lot_number' (None = SAP matches, then lot
+                         matches; a label matching both is returned once)
+            limit (int): Maximum entries
+
+        Returns:
+            list: HistoryEntry objects ordered by value, newest first per value
+        """
+        prefix = prefix.strip()
+        if not prefix:
+            return self.recent(limit)
+        if field is not None and field not in SEARCH_FIELDS:
+            raise ValueError(f"Cannot search by {field!r}; use one of {SEARCH_FIELDS}")
+
+        entries = []
+        searched = []
+        for name in (field,) if field else SEARCH_FIELDS:
+            if len(entries) >= limit:
+                break
+            # A row matching an earlier field was already returned there
+            # (all of them, or the limit was reached): skip it in this scan
+            excluded = ''.join(f' AND NOT ({done} >= ? AND {done} < ?)' for done in searched)
+            entries += self._query(
+                f'SELECT {_COLUMNS} FROM labels WHERE {name} >= ? AND {name} < ?{excluded} '
+                f'ORDER BY {name}, id DESC LIMIT ?',
+                (prefix, prefix + _PREFIX_END) * (len(searched) + 1)
+                + (limit - len(entries),))
+            searched.append(name)
+        return entries
+
+    def value_usage(self, field='sap_nr', window=20000):
+        """
+        How often and how recently values were printed (for autocomplete ranking).
+
+        Args:
+            field (str): 'sap_nr' or 'lot_number'
+            window (int): Number of most recent labels to count
+
+        Returns:
+            list: (value, count, last printed) tuples
+        """
+        if field not in SEARCH_FIELDS:
+            raise ValueError(f"Cannot count {field!r}; use one of {SEARCH_FIELDS}")
+        with self._lock:
+            return self._conn.execute(
+                f'SELECT {field}, COUNT(*), MAX(printed) FROM '
+                f'(SELECT {field}, printed FROM labels ORDER BY id DESC LIMIT ?) '
+                f"WHERE {field} != '' GROUP BY {field}",
+                (window,)).fetchall()
+
+    def count(self):
+        """Number of recorded labels."""
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM labels').fetchone()[0]
+
+    def close(self):
+        """Commit and close the database."""
+        with self._lock:
+            self._commit()
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,352 @@
+"""
+Print Job Journal
+Append-only write-ahead journal that tracks every label through
+submitted -> rendered -> spooled -> confirmed (or failed).
+After a crash the journal is replayed so a batch resumes at the first
+unconfirmed label instead of reprinting labels that already went out.
+
+compact() drops the history of confirmed jobs but keeps one "done" record
+per batch listing its confirmed job ids, so a batch run again after a
+compaction still skips the labels that went out.
+
+Records are single tab-separated lines: label texts and errors are
+JSON-encoded, and ids or file paths containing tabs or line breaks are
+refused. Each record is handed to the OS immediately (survives a process
+crash); fsync is batched every sync_every records or sync_interval
+seconds (group commit), so journaling costs microseconds per label.
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+
+
+SUBMITTED = 'submitted'
+RENDERED = 'rendered'
+SPOOLED = 'spooled'
+CONFIRMED = 'confirmed'
+FAILED = 'failed'
+
+# One-letter state codes used on disk
+_STATE_CODES = {
+    SUBMITTED: 'S',
+    RENDERED: 'R',
+    SPOOLED: 'P',
+    CONFIRMED: 'C',
+    FAILED: 'F',
+}
+_CODE_STATES = {code: state for state, code in _STATE_CODES.items()}
+
+# Batch record written by compact(): confirmed job ids of one batch
+_DONE_CODE = 'D'
+
+JOURNAL_FILE = 'print_journal.log'
+
+
+def _check_field(value, name):
+    """Refuse values that would split a tab-separated record."""
+    if '\t' in value or '\n' in value or '\r' in value:
+        raise ValueError(f"Journal {name} cannot contain tabs or line breaks: {value!r}")
+
+
+class JobState:
+    """Replayed state of one journaled job"""
+
+    __slots__ = ('job_id', 'batch_id', 'text', 'state', 'file_path', 'error', 'seq')
+
+    def __init__(self, job_id, batch_id='', text='', seq=0):
+        self.job_id = job_id
+        self.batch_id = batch_id
+        self.text = text
+        self.state = SUBMITTED
+        self.file_path = ''
+        self.error = ''
+        self.seq = seq
+
+    def __repr__(self):
+        return f"JobState({self.job_id!r}, state={self.state!r})"
+
+
+class PrintJournal:
+    """Append-only, fsync-batched journal of print jobs"""
+
+    def __init__(self, path=JOURNAL_FILE, sync_every=64, sync_interval=0.2):
+        """
+        Open (or create) a journal file.
+
+        Args:
+            path (str): Journal file path
+            sync_every (int): fsync after this many records
+            sync_interval (float): fsync at least this often (seconds) while writing
+        """
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._jobs = self.replay(path)
+        self._seq = max((job.seq for job in self._jobs.values()), default=0)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    @staticmethod
+    def new_job_id():
+        """Generate a unique job id for a single label."""
+        return uuid.uuid4().hex[:12]
+
+    @staticmethod
+    def replay(path):
+        """
+        Rebuild job states from a journal file.
+
+        A torn last line (crash during write) is ignored.
+
+        Args:
+            path (str): Journal file path
+
+        Returns:
+            dict: job_id -> JobState, in submission order
+        """
+        jobs = {}
+        try:
+            f = open(path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return jobs
+
+        with f:
+            seq = 0
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                fields = line.rstrip('\n').split('\t')
+                if fields[0] == _DONE_CODE and len(fields) > 2:
+                    for job_id in json.loads(fields[2]):
+                        seq += 1
+                        job = JobState(job_id, fields[1], '', seq)
+                        job.state = CONFIRMED
+                        jobs[job_id] = job
+                    continue
+                state = _CODE_STATES.get(fields[0])
+                if state is None or len(fields) < 2:
+                    continue
+                job_id = fields[1]
+
+                if state == SUBMITTED:
+                    seq += 1
+                    text = json.loads(fields[3]) if len(fields) > 3 else ''
+                    jobs[job_id] = JobState(job_id, fields[2], text, seq)
+                    continue
+
+                job = jobs.get(job_id)
+                if job is None:
+                    continue
+                job.state = state
+                if state == RENDERED and len(fields) > 2:
+                    job.file_path = fields[2]
+                elif state == FAILED and len(fields) > 2:
+                    job.error = json.loads(fields[2])
+        return jobs
+
+    def _write(self, line):
+        """Append a record (caller holds the lock)."""
+        self._file.write(line)
+        self._file.flush()
+        self._unsynced += 1
+        now = time.monotonic()
+        if self._unsynced >= self.sync_every or now - self._last_sync >= self.sync_interval:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+            self._last_sync = now
+
+    def submitted(self, job_id, text, batch_id=''):
+        """
+        Record a new job and its label text.
+
+        Raises:
+            ValueError: If the job or batch id contains a tab or line break
+        """
+        _check_field(job_id, 'job id')
+        _check_field(batch_id, 'batch id')
+        with self._lock:
+            self._seq += 1
+            self._jobs[job_id] = JobState(job_id, batch_id, text, self._seq)
+            self._write(f"S\t{job_id}\t{batch_id}\t{json.dumps(text)}\n")
+
+    def _transition(self, job_id, state, extra='', file_path=None, error=None):
+        # State and record change together: compact() never sees one without the other
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.state = state
+                if file_path is not None:
+                    job.file_path = file_path
+                if error is not None:
+                    job.error = error
+            self._write(f"{_STATE_CODES[state]}\t{job_id}{extra}\n")
+
+    def rendered(self, job_id, file_path=''):
+        """
+        Record that the label file has been rendered.
+
+        Raises:
+            ValueError: If the file path contains a tab or line break
+        """
+        _check_field(file_path, 'file path')
+        self._transition(job_id, RENDERED, f"\t{file_path}", file_path=file_path)
+
+    def spooled(self, job_id):
+        """Record that the label is about to be handed to the spooler."""
+        self._transition(job_id, SPOOLED)
+
+    def confirmed(self, job_id):
+        """Record that the spooler accepted the label."""
+        self._transition(job_id, CONFIRMED)
+
+    def failed(self, job_id, error=''):
+        """Record that the label could not be printed."""
+        self._transition(job_id, FAILED, f"\t{json.dumps(error)}", error=error)
+
+    def state(self, job_id):
+        """Current state of a job (None if unknown)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.state if job else None
+
+    def unconfirmed(self, batch_id=None):
+        """
+        Jobs that were not confirmed, in submission order.
+
+        Jobs in the 'spooled' state may or may not have reached the printer;
+        callers decide whether to reprint them.
+
+        Args:
+            batch_id (str): Only return jobs of this batch
+
+        Returns:
+            list: JobState objects
+        """
+        with self._lock:
+            jobs = [job for job in self._jobs.values()
+                    if job.state != CONFIRMED and (batch_id is None or job.batch_id == batch_id)]
+        return sorted(jobs, key=lambda job: job.seq)
+
+    def sync(self):
+        """Force all journal records to disk."""
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def compact(self):
+        """
+        Rewrite the journal keeping only unconfirmed jobs.
+
+        Confirmed jobs of a batch are reduced to their ids (one record per
+        batch) so print_batch() still skips them; confirmed single labels
+        (no batch id) are dropped. Call between batches to keep the journal
+        small over long shifts.
+        """
+        with self._lock:
+            self._file.close()
+            temp_path = self.path + '.tmp'
+            jobs = sorted(self._jobs.values(), key=lambda job: job.seq)
+            done = {}
+            for job in jobs:
+                if job.state == CONFIRMED and job.batch_id:
+                    done.setdefault(job.batch_id, []).append(job.job_id)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for batch_id, job_ids in done.items():
+                    f.write(f"{_DONE_CODE}\t{batch_id}\t{json.dumps(job_ids)}\n")
+                for job in jobs:
+                    if job.state == CONFIRMED:
+                        continue
+                    f.write(f"S\t{job.job_id}\t{job.batch_id}\t{json.dumps(job.text)}\n")
+                    if job.state != SUBMITTED:
+                        if job.state == RENDERED:
+                            f.write(f"R\t{job.job_id}\t{job.file_path}\n")
+                        elif job.state == FAILED:
+                            f.write(f"F\t{job.job_id}\t{json.dumps(job.error)}\n")
+                        else:
+                            f.write(f"{_STATE_CODES[job.state]}\t{job.job_id}\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self._jobs = {job_id: job for job_id, job in self._jobs.items()
+                          if job.state != CONFIRMED or job.batch_id}
+            for job in self._jobs.values():
+                if job.state == CONFIRMED:
+                    # Only the id survives compaction (see replay)
+                    job.text = ''
+                    job.file_path = ''
+            self._file = open(self.path, 'a', encoding='utf-8')
+            self._unsynced = 0
+
+    def close(self):
+        """Sync and close the journal."""
+        self.sync()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def print_batch(texts, printer, journal, batch_id, use_pdf=True, reprint_spooled=False,
+                verify=True):
+    """
+    Print a batch of labels through the journal, resuming after a crash.
+
+    Labels already confirmed for this batch_id are skipped, so running the
+    same batch again after a crash prints only what did not go out. A label
+    left 'spooled' by the crash may already have been accepted by the
+    printer: it is not printed again unless reprint_spooled is set, and its
+    job id is returned so the caller can check it.
+
+    Args:
+        texts (list): Label texts ("SAP|CANTITATE|LOT") in batch order
+        printer (str): Printer name or "PDF"
+        journal (PrintJournal): Journal to record progress in
+        batch_id (str): Stable id of the batch (e.g. the job file name)
+        use_pdf (bool): True to print PDF labels, False for PNG
+        reprint_spooled (bool): Also print labels left in the 'spooled' state
+        verify (bool): Decode the rendered barcodes before spooling
+
+    Returns:
+        dict: Counts of 'printed', 'skipped' and 'failed' labels, and
+              'unconfirmed': job ids left 'spooled' that were not printed
+
+    Raises:
+        PreflightError: If any label has a value the barcodes cannot encode
+                        (checked before the first label prints)
+    """
+    from print_label import print_label_standalone
+    from label_preflight import check_batch
+
+    check_batch(texts)
+
+    summary = {'printed': 0, 'skipped': 0, 'failed': 0, 'unconfirmed': []}
+    for index, text in enumerate(texts):
+        job_id = f"{batch_id}:{index}"
+        state = journal.state(job_id)
+        if state == CONFIRMED:
+            summary['skipped'] += 1
+            continue
+        if state == SPOOLED and not reprint_spooled:
+            print(f"Label {job_id} may already have printed (spooled before a crash); "
+                  f"not printed again")
+            summary['unconfirmed'].append(job_id)
+            continue
+
+        if print_label_standalone(text, printer, preview=0, use_pdf=use_pdf, verify=verify,
+                                  journal=journal, job_id=job_id, batch_id=batch_id):
+            summary['printed'] += 1
+        else:
+            summary['failed'] += 1
+
+    journal.sync()
+    return summary
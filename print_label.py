@@ -1,12 +1,22 @@
 from PIL import Image, ImageDraw, ImageFont
-import barcode
-from barcode.writer import ImageWriter
+from code128 import encode_widths, widths_to_image
 import time
 import os
 import datetime
 import platform
 import subprocess
-from print_label_pdf import PDFLabelGenerator
+import threading
+import functools
+from collections import OrderedDict
+from print_label_pdf import PDFLabelGenerator, PAGES_PER_DOCUMENT
+from document_cache import DocumentCache
+from label_record import LabelRecord, RecordBatch
+from barcode_verify import verify_image, verify_label_records
+from label_preflight import preflight_record, check_batch
+from print_dedup import DuplicateFilter
+from printer_status import get_status_monitor
+import print_metrics
+import label_profiler
 
 # Cross-platform printer support
 try:
@@ -24,6 +34,217 @@ except ImportError:
 
 SYSTEM = platform.system()  # 'Linux', 'Windows', 'Darwin'
 
+# Long-lived state reused between labels (warm caches, open connections)
+_pdf_generator = None
+_cups_connection = None
+_state_lock = threading.Lock()
+# pycups connections are not thread-safe: calls on the shared one go through this lock
+_cups_lock = threading.RLock()
+
+# Searchable index of printed labels (None = not recorded)
+_print_history = None
+
+# Keys of cached documents whose barcodes already passed verification
+VERIFIED_DOCUMENTS_SIZE = 4096
+_verified_documents = OrderedDict()
+
+# Recent idempotency keys; a repeat within the window is a duplicate
+DUPLICATE_WINDOW_SECONDS = 10.0
+_duplicate_filter = DuplicateFilter(window=DUPLICATE_WINDOW_SECONDS)
+
+# Seconds to wait for CUPS to report the outcome of a job canceled after a timeout
+CANCEL_SETTLE_SECONDS = 2.0
+
+
+def get_pdf_generator():
+    """
+    Get the shared PDF label generator.
+    
+    Reusing one generator keeps its barcode cache warm across labels, and
+    its document cache turns reprints into a lookup.
+    
+    Returns:
+        PDFLabelGenerator: Shared generator instance
+    """
+    global _pdf_generator
+    with _state_lock:
+        if _pdf_generator is None:
+            _pdf_generator = PDFLabelGenerator(document_cache=DocumentCache())
+        return _pdf_generator
+
+
+def set_document_cache(cache):
+    """
+    Replace the document cache of the shared PDF generator.
+    
+    Args:
+        cache (DocumentCache): New cache (e.g. with a disk tier), or None to disable
+    """
+    generator = get_pdf_generator()
+    with _state_lock:
+        generator.document_cache = cache
+        _verified_documents.clear()
+
+
+def set_print_history(history):
+    """
+    Record every printed label in a history index.
+    
+    Args:
+        history (PrintHistory): Index to record into, or None to stop recording
+    """
+    global _print_history
+    _print_history = history
+
+
+def get_print_history():
+    """
+    Get the print history set with set_print_history().
+    
+    Returns:
+        PrintHistory or None: Active history index
+    """
+    return _print_history
+
+
+def verify_pdf_record(record):
+    """
+    Verify the barcodes of a PDF label, once per cached document.
+    
+    Args:
+        record (LabelRecord): Label that was rendered
+        
+    Returns:
+        list: Verification failures (empty if OK or already verified)
+    """
+    generator = get_pdf_generator()
+    cache = generator.document_cache
+    if cache is None:
+        return verify_label_records([record], generator)
+    
+    key = generator.document_key(record)
+    with _state_lock:
+        if key in _verified_documents:
+            _verified_documents.move_to_end(key)
+            return []
+    
+    failures = verify_label_records([record], generator)
+    if failures:
+        # Never serve a document that failed verification again
+        cache.discard(key)
+        return failures
+    with _state_lock:
+        _verified_documents[key] = True
+        if len(_verified_documents) > VERIFIED_DOCUMENTS_SIZE:
+            _verified_documents.popitem(last=False)
+    return failures
+
+
+def warm_up(use_pdf=True, use_png=True, verify=True, printers=True):
+    """
+    Prime the lazily initialized state the first label would otherwise pay for.
+    
+    Renders a throwaway label (discarded, never spooled or counted), loads
+    the label fonts, runs the barcode decoder once and opens the CUPS
+    connection and status monitor.
+    
+    Args:
+        use_pdf (bool): Warm the PDF generator and its warm session
+        use_png (bool): Warm the PNG renderer and its fonts
+        verify (bool): Warm barcode verification
+        printers (bool): Open the CUPS connection and start the status monitor
+        
+    Returns:
+        dict: Milliseconds spent per step
+    """
+    record = LabelRecord('WARMUP', '1', 'WARMUP')
+    timings = {}
+    
+    def step(name, func):
+        started = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            print(f"Warm-up step {name} failed: {e}")
+        timings[name] = round((time.perf_counter() - started) * 1000, 2)
+    
+    if use_pdf:
+        step('pdf', lambda: get_pdf_generator().session().warm_up(*record))
+        if verify:
+            step('pdf_verify', lambda: verify_label_records([record], get_pdf_generator()))
+    if use_png:
+        def warm_png():
+            with create_label_image(record) as label_img:
+                if verify:
+                    verify_label_image(label_img, record)
+        step('png', warm_png)
+    if printers and SYSTEM == "Linux" and CUPS_AVAILABLE:
+        step('cups', get_cups_connection)
+    if printers:
+        step('status_monitor', get_status_monitor().start)
+    return timings
+
+
+def start_warm_up(**kwargs):
+    """
+    Run warm_up() on a background thread.
+    
+    Args:
+        **kwargs: Passed to warm_up()
+        
+    Returns:
+        threading.Thread: The started (daemon) thread
+    """
+    def run():
+        timings = warm_up(**kwargs)
+        print(f"Warm-up finished in {sum(timings.values()):.1f} ms: {timings}")
+    
+    thread = threading.Thread(target=run, name='label-warm-up', daemon=True)
+    thread.start()
+    return thread
+
+
+def get_cups_connection():
+    """
+    Get a CUPS connection, reusing the previous one when possible.
+    
+    Returns:
+        cups.Connection: Open connection to the CUPS server
+    """
+    global _cups_connection
+    with _state_lock:
+        if _cups_connection is None:
+            _cups_connection = cups.Connection()
+        return _cups_connection
+
+
+def reset_cups_connection():
+    """Drop the cached CUPS connection (e.g. after a connection error)."""
+    global _cups_connection
+    with _state_lock:
+        _cups_connection = None
+
+
+# Extra printer backends by name (e.g. simulated printers for load tests).
+# A backend is any object with a print_file(file_path) -> bool method.
+_printer_backends = {}
+
+
+def register_printer_backend(name, backend):
+    """
+    Register a printer backend that print_to_printer routes to by name.
+    
+    Args:
+        name (str): Printer name to register
+        backend: Object with a print_file(file_path) -> bool method
+    """
+    _printer_backends[name] = backend
+
+
+def unregister_printer_backend(name):
+    """Remove a registered printer backend (no error if missing)."""
+    _printer_backends.pop(name, None)
+
 
 def get_available_printers():
     """
@@ -35,9 +256,10 @@ def get_available_printers():
     try:
         if SYSTEM == "Linux" and CUPS_AVAILABLE:
             # Linux: Use CUPS
-            conn = cups.Connection()
-            printers = conn.getPrinters()
-            return list(printers.keys()) if printers else ["PDF"]
+            with _cups_lock:
+                printers = get_cups_connection().getPrinters()
+            printers = list(printers.keys()) if printers else ["PDF"]
+            return printers + list(_printer_backends)
         
         elif SYSTEM == "Windows":
             # Windows: Try win32print first
@@ -45,10 +267,10 @@ def get_available_printers():
                 printers = []
                 for printer_name in win32print.EnumPrinters(win32print.PRINTER_ENUM_LOCAL):
                     printers.append(printer_name[2])
-                return printers if printers else ["PDF"]
+                return (printers if printers else ["PDF"]) + list(_printer_backends)
             except:
                 # Fallback for Windows if win32print fails
-                return ["PDF"]
+                return ["PDF"] + list(_printer_backends)
         
         elif SYSTEM == "Darwin":
             # macOS: Use lpstat command
@@ -60,16 +282,86 @@ def get_available_printers():
                     if line.startswith('printer'):
                         printer_name = line.split()[1]
                         printers.append(printer_name)
-                return printers if printers else ["PDF"]
+                return (printers if printers else ["PDF"]) + list(_printer_backends)
             except:
-                return ["PDF"]
+                return ["PDF"] + list(_printer_backends)
         
         else:
-            return ["PDF"]
+            return ["PDF"] + list(_printer_backends)
     
     except Exception as e:
         print(f"Error getting printers: {e}")
-        return ["PDF"]
+        return ["PDF"] + list(_printer_backends)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_font(size):
+    """Load the label font at a size, falling back to PIL's default font."""
+    font_path = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+    try:
+        return ImageFont.truetype(font_path, size)
+    except IOError:
+        return ImageFont.load_default()
+
+
+# Rendered rows of create_label_image, keyed by (size, row, value) (LRU).
+# Consecutive labels usually repeat SAP and lot: only changed rows are drawn.
+ROW_IMAGE_CACHE_SIZE = 48
+_row_images = OrderedDict()
+_row_images_lock = threading.Lock()
+
+
+def _label_row_image(label_width, row_height, idx, label_name, value):
+    """
+    Render (or reuse) one row of a PNG label: name and barcode, or the value as text.
+    
+    Returns:
+        PIL.Image: Grayscale row image (shared; do not modify or close)
+    """
+    key = (label_width, row_height, idx, value)
+    with _row_images_lock:
+        row_img = _row_images.get(key)
+        if row_img is not None:
+            _row_images.move_to_end(key)
+            return row_img
+    
+    left_margin = 15
+    row_img = Image.new('L', (label_width, row_height), 255)
+    draw = ImageDraw.Draw(row_img)
+    
+    # Draw label name
+    draw.text((left_margin, 3), label_name, fill=0, font=_load_font(16))
+    
+    # Barcode rendered at one pixel per module, filling the row height
+    barcode_width = label_width - left_margin - 10
+    barcode_height = row_height - 25
+    barcode_img = None
+    if value:
+        try:
+            widths = encode_widths(value[:25])
+            barcode_img = widths_to_image(widths, module_px=1, height_px=barcode_height,
+                                          quiet_zone_modules=5, mode='L')
+        except Exception:
+            barcode_img = None
+    
+    if barcode_img:
+        # Widen by a whole number of pixels per module (no resampling): every
+        # module stays the same width and no grey edge pixels are introduced
+        factor = max(1, barcode_width // barcode_img.width)
+        with barcode_img.resize((barcode_img.width * factor, barcode_height),
+                                Image.NEAREST) as barcode_scaled:
+            row_img.paste(barcode_scaled, (left_margin, 20))
+        barcode_img.close()
+    else:
+        # Fallback: show value as text
+        draw.text((left_margin, 25), value if value else "(empty)", fill=0,
+                  font=_load_font(14))
+    
+    with _row_images_lock:
+        _row_images[key] = row_img
+        if len(_row_images) > ROW_IMAGE_CACHE_SIZE:
+            _row_images.popitem(last=False)
+    return row_img
 
 
 def create_label_image(text):
@@ -77,16 +369,12 @@ def create_label_image(text):
     Create a label image with 3 rows: label + barcode for each field.
     
     Args:
-        text (str): Combined text in format "SAP|CANTITATE|LOT" or single value
+        text (str or LabelRecord): "SAP|CANTITATE|LOT", a single value or a record
         
     Returns:
         PIL.Image: The generated label image
     """
-    # Parse the text input
-    parts = text.split('|') if '|' in text else [text, '', '']
-    sap_nr = parts[0].strip() if len(parts) > 0 else ''
-    cantitate = parts[1].strip() if len(parts) > 1 else ''
-    lot_number = parts[2].strip() if len(parts) > 2 else ''
+    sap_nr, cantitate, lot_number = LabelRecord.parse(text)
     
     # Label dimensions (narrower, 3 rows)
     label_width = 800   # 8 cm
@@ -94,21 +382,9 @@ def create_label_image(text):
     
     # Create canvas
     label_img = Image.new('RGB', (label_width, label_height), 'white')
-    draw = ImageDraw.Draw(label_img)
     
     # Row setup - 3 equal rows
     row_height = label_height // 3
-    left_margin = 15
-    row_spacing = 3
-    
-    # Fonts
-    font_path = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
-    try:
-        label_font = ImageFont.truetype(font_path, 16)
-        value_font = ImageFont.truetype(font_path, 14)
-    except IOError:
-        label_font = ImageFont.load_default()
-        value_font = ImageFont.load_default()
     
     # Data for 3 rows
     rows_data = [
@@ -117,107 +393,108 @@ def create_label_image(text):
         ("Lot Nr", lot_number),
     ]
     
-    # Generate barcodes first
-    CODE128 = barcode.get_barcode_class('code128')
-    writer_options = {
-        "write_text": False,
-        "module_width": 0.4,
-        "module_height": 8,
-        "quiet_zone": 2,
-        "font_size": 0
-    }
-    
-    barcode_images = []
-    for _, value in rows_data:
-        if value:
-            try:
-                code = CODE128(value[:25], writer=ImageWriter())
-                filename = code.save('temp_barcode', options=writer_options)
-                barcode_img = Image.open(filename)
-                barcode_images.append(barcode_img)
-            except:
-                barcode_images.append(None)
-        else:
-            barcode_images.append(None)
+    for idx, (label_name, value) in enumerate(rows_data):
+        row_img = _label_row_image(label_width, row_height, idx, label_name, value)
+        label_img.paste(row_img, (0, idx * row_height))
     
-    # Draw each row with label and barcode
-    for idx, ((label_name, value), barcode_img) in enumerate(zip(rows_data, barcode_images)):
-        row_y = idx * row_height
-        
-        # Draw label name
-        draw.text(
-            (left_margin, row_y + 3),
-            label_name,
-            fill='black',
-            font=label_font
-        )
+    return label_img
+
+
+def verify_label_image(label_img, text):
+    """
+    Decode the barcodes of a label made by create_label_image.
+    
+    Scans the middle row of each barcode area as it will be printed, so an
+    unreadable barcode is caught before the label is spooled.
+    
+    Args:
+        label_img (PIL.Image): Label from create_label_image
+        text (str or LabelRecord): Text or record the label was created from
         
-        # Draw barcode if available
-        if barcode_img:
-            # Resize barcode to fit in row width
-            barcode_width = label_width - left_margin - 10
-            barcode_height = row_height - 25
-            barcode_resized = barcode_img.resize((barcode_width, barcode_height), Image.LANCZOS)
-            label_img.paste(barcode_resized, (left_margin, row_y + 20))
-        else:
-            # Fallback: show value as text
-            draw.text(
-                (left_margin, row_y + 25),
-                value if value else "(empty)",
-                fill='black',
-                font=value_font
-            )
-    
-    # Clean up temporary barcode files
-    try:
-        if os.path.exists('temp_barcode.png'):
-            os.remove('temp_barcode.png')
-    except:
-        pass
+    Returns:
+        list: VerificationResult for every failed barcode (empty if all OK)
+    """
+    values = list(LabelRecord.parse(text))
     
-    return label_img
+    # Same geometry as create_label_image
+    label_width, label_height = label_img.size
+    row_height = label_height // 3
+    left_margin = 15
+    barcode_height = row_height - 25
+    
+    failures = []
+    for idx, (field, value) in enumerate(zip(("SAP-Nr", "Cantitate", "Lot Nr"), values)):
+        if not value:
+            continue
+        scan_y = idx * row_height + 20 + barcode_height // 2
+        result = verify_image(label_img, value[:25], y=scan_y,
+                              x_start=left_margin, x_end=label_width - 10)
+        if not result.ok:
+            result.record = 0
+            result.field = field
+            failures.append(result)
+    return failures
 
 
-def create_label_pdf(text):
+def create_label_pdf(text, session=None):
     """
     Create a high-quality PDF label with 3 rows: label + barcode for each field.
-    PDFs are saved to the pdf_backup folder.
+    PDFs are saved to the pdf_backup folder (or the session's backup folder).
     
     Args:
-        text (str): Combined text in format "SAP|CANTITATE|LOT" or single value
+        text (str or LabelRecord): "SAP|CANTITATE|LOT", a single value or a record
+        session (PDFLabelSession): Session to draw with (default: the shared one)
         
     Returns:
         str: Path to the generated PDF file
     """
-    # Parse the text input
-    parts = text.split('|') if '|' in text else [text, '', '']
-    sap_nr = parts[0].strip() if len(parts) > 0 else ''
-    cantitate = parts[1].strip() if len(parts) > 1 else ''
-    lot_number = parts[2].strip() if len(parts) > 2 else ''
+    record = LabelRecord.parse(text)
     
-    # Create PDF using high-quality generator
-    generator = PDFLabelGenerator()
+    # Create PDF using the shared high-quality generator (warm barcode cache)
+    generator = get_pdf_generator()
     
     # Ensure pdf_backup folder exists
-    pdf_backup_dir = 'pdf_backup'
+    pdf_backup_dir = (session is not None and session.backup_dir) or 'pdf_backup'
     os.makedirs(pdf_backup_dir, exist_ok=True)
     
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Microseconds keep names unique when several labels are made per second
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
     pdf_filename = os.path.join(pdf_backup_dir, f"final_label_{timestamp}.pdf")
     
-    return generator.create_label_pdf(sap_nr, cantitate, lot_number, pdf_filename)
+    return generator.create_label_pdf(record, filename=pdf_filename, session=session)
 
 
-def print_to_printer(printer_name, file_path):
+def _cancel_cups_job(printer_name, job_id):
+    """Cancel a CUPS job (returns False if CUPS refused, e.g. it already finished)."""
+    try:
+        with _cups_lock:
+            get_cups_connection().cancelJob(job_id)
+    except Exception as e:
+        print(f"Could not cancel print job {job_id} on {printer_name}: {e}")
+        return False
+    print(f"Print job {job_id} on {printer_name} canceled after timeout")
+    return True
+
+
+def print_to_printer(printer_name, file_path, wait=False, timeout=60):
     """
     Print file to printer (cross-platform).
     
+    On Linux/CUPS a printer the status monitor reports as stopped or out of
+    media is refused up front, and with wait=True the job is tracked until
+    CUPS reports it completed, aborted or canceled. A job still pending
+    after the timeout is canceled before False is returned, so the caller
+    can safely send the label elsewhere.
+    
     Args:
         printer_name (str): Name of printer or "PDF" for PDF output
         file_path (str): Path to file to print
+        wait (bool): Wait for the job to finish printing (CUPS only)
+        timeout (float): Maximum seconds to wait for completion
         
     Returns:
-        bool: True if successful
+        bool: True if the label was handed to the printer (or saved for "PDF"),
+              False if printing failed (the label file is kept as fallback)
     """
     try:
         if printer_name == "PDF":
@@ -225,11 +502,55 @@ def print_to_printer(printer_name, file_path):
             print(f"PDF output: {file_path}")
             return True
         
+        elif printer_name in _printer_backends:
+            # Registered backend (e.g. simulated printer or pool); with wait
+            # it must cancel a job that is still running after the timeout
+            backend = _printer_backends[printer_name]
+            if wait:
+                printed = backend.print_file(file_path, timeout=timeout)
+            else:
+                printed = backend.print_file(file_path)
+            if printed:
+                print(f"Label sent to printer: {printer_name}")
+                return True
+            print(f"Printer {printer_name} rejected the label")
+            return False
+        
         elif SYSTEM == "Linux" and CUPS_AVAILABLE:
             # Linux: Use CUPS
-            conn = cups.Connection()
-            conn.printFile(printer_name, file_path, "Label Print", {})
-            print(f"Label sent to printer: {printer_name}")
+            monitor = get_status_monitor()
+            status = monitor.get_status(printer_name)
+            if status is not None and not status.ready:
+                print(f"Printer {printer_name} is not ready ({status.summary()})")
+                return False
+            
+            with _cups_lock:
+                conn = get_cups_connection()
+                try:
+                    job_id = conn.printFile(printer_name, file_path, "Label Print", {})
+                except cups.IPPError:
+                    raise
+                except Exception:
+                    # Stale connection (e.g. cupsd restarted) - reconnect once
+                    reset_cups_connection()
+                    conn = get_cups_connection()
+                    job_id = conn.printFile(printer_name, file_path, "Label Print", {})
+            print(f"Label sent to printer: {printer_name} (job {job_id})")
+            
+            if wait:
+                result = monitor.track(printer_name, job_id)
+                if not result.wait(timeout):
+                    if result.done:
+                        state = result.state
+                    else:
+                        # Cancel before reporting failure, or a retry on another
+                        # printer prints the label twice when this job finishes late
+                        _cancel_cups_job(printer_name, job_id)
+                        if result.wait(CANCEL_SETTLE_SECONDS):
+                            return True
+                        state = "timed out"
+                    print(f"Print job {job_id} on {printer_name} did not complete: {state}")
+                    return False
             return True
         
         elif SYSTEM == "Windows":
@@ -254,7 +575,7 @@ def print_to_printer(printer_name, file_path):
             except Exception as e:
                 print(f"Windows print error: {e}")
                 print("PDF backup saved as fallback")
-                return True
+                return False
         
         elif SYSTEM == "Darwin":
             # macOS: Use lp command
@@ -270,25 +591,352 @@ def print_to_printer(printer_name, file_path):
         print(f"Printer error: {str(e)}")
         print("Label already saved to file as fallback...")
         print(f"Label file: {file_path}")
+        return False
+
+
+def spool_label(printer, file_path, journal=None, job_id=None, wait=False):
+    """
+    Send a rendered label to the printer, recording progress in the journal.
+    
+    Args:
+        printer (str): Printer name or "PDF"
+        file_path (str): Rendered label file
+        journal (PrintJournal): Optional job journal
+        job_id (str): Journal job id
+        wait (bool): Wait until the printer reports the job finished
+        
+    Returns:
+        bool: True if the printer accepted (or with wait, completed) the label
+    """
+    if journal is None:
+        return print_to_printer(printer, file_path, wait=wait)
+    
+    journal.spooled(job_id)
+    if print_to_printer(printer, file_path, wait=wait):
+        journal.confirmed(job_id)
+        return True
+    journal.failed(job_id, "printer did not accept the job")
+    return False
+
+
+def spool_and_record(record, printer, file_path, journal=None, job_id=None, wait=False,
+                     use_pdf=True):
+    """
+    Spool a rendered label and add it to the print history if it printed.
+    
+    Args:
+        record (LabelRecord or str): Label being printed
+        printer (str): Printer name or "PDF"
+        file_path (str): Rendered label file
+        journal (PrintJournal): Optional job journal
+        job_id (str): Journal job id
+        wait (bool): Wait until the printer reports the job finished
+        use_pdf (bool): False for PNG labels (their file is not kept for reprints)
+        
+    Returns:
+        bool: True if the printer accepted (or with wait, completed) the label
+    """
+    success = spool_label(printer, file_path, journal, job_id, wait)
+    history = _print_history
+    if success and history is not None:
+        history.record(record, printer, file_path if use_pdf else '')
+    return success
+
+
+def reprint_label(entry, printer=None, journal=None, wait=False):
+    """
+    Print a label from the print history again.
+    
+    The stored PDF is spooled as it is; if it no longer exists the label is
+    rendered again (normally a document cache hit).
+    
+    Args:
+        entry (HistoryEntry or int): History entry or its id
+        printer (str): Target printer (default: the printer used originally)
+        journal (PrintJournal): Optional job journal
+        wait (bool): Wait until the printer reports the job finished (CUPS)
+        
+    Returns:
+        bool: True if the label was printed
+    """
+    history = _print_history
+    if not hasattr(entry, 'record'):
+        if history is None:
+            print("Reprint failed: no print history")
+            return False
+        entry = history.get(entry)
+        if entry is None:
+            print("Reprint failed: unknown history entry")
+            return False
+    
+    printer = printer or entry.printer
+    record = entry.record
+    print_metrics.increment(print_metrics.LABELS_SUBMITTED)
+    job_id = None
+    if journal is not None:
+        job_id = journal.new_job_id()
+        journal.submitted(job_id, record.text, 'reprint')
+    
+    try:
+        file_path = entry.file_path
+        if not file_path or not os.path.exists(file_path):
+            file_path = create_label_pdf(record)
+        if journal is not None:
+            journal.rendered(job_id, file_path)
+        print(f"Reprinting {record.text} on {printer}")
+        success = spool_and_record(record, printer, file_path, journal, job_id, wait)
+    except Exception as e:
+        print(f"Error reprinting label: {str(e)}")
+        if journal is not None:
+            journal.failed(job_id, str(e))
+        success = False
+    
+    print_metrics.increment(print_metrics.LABELS_PRINTED if success
+                            else print_metrics.LABELS_FAILED)
+    return success
+
+
+def print_label_batch(records, printer, journal=None, batch_id='', verify=True, wait=False,
+                      reprint_spooled=False, pages_per_document=PAGES_PER_DOCUMENT):
+    """
+    Print a batch as multi-page PDF jobs of at most pages_per_document labels.
+    
+    The batch is streamed through PDFLabelGenerator.iter_batch_pdfs(), so
+    memory and the number of spool jobs stay bounded however long it is.
+    The whole batch is preflighted before the first document renders and
+    each document's barcodes are verified before it is spooled. With a
+    journal every document is one job ("<batch_id>:<first>-<last>", label
+    indexes); the same batch printed again after a crash skips documents
+    already confirmed (use the same pages_per_document). A document left
+    'spooled' by the crash is not printed again unless reprint_spooled is set.
+    
+    Args:
+        records (iterable): LabelRecords, texts or a RecordBatch
+        printer (str): Printer name or "PDF"
+        journal (PrintJournal): Optional journal to record and resume the batch in
+        batch_id (str): Stable id of the batch (needed to resume)
+        verify (bool): Decode the rendered barcodes before spooling
+        wait (bool): Wait until the printer reports each job finished (CUPS)
+        reprint_spooled (bool): Also print documents left in the 'spooled' state
+        pages_per_document (int): Labels per document (and spool job)
+        
+    Returns:
+        dict: Counts of 'printed', 'skipped' and 'failed' labels, and
+              'unconfirmed': job ids of documents left 'spooled' that were not printed
+    
+    Raises:
+        PreflightError: If any label has a value the barcodes cannot encode
+    """
+    from print_journal import CONFIRMED, SPOOLED
+    
+    batch = records if isinstance(records, RecordBatch) else RecordBatch.from_records(records)
+    check_batch(batch)
+    
+    generator = get_pdf_generator()
+    pdf_backup_dir = 'pdf_backup'
+    os.makedirs(pdf_backup_dir, exist_ok=True)
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    summary = {'printed': 0, 'skipped': 0, 'failed': 0, 'unconfirmed': []}
+    
+    def job_id(number):
+        first = number * pages_per_document
+        last = min(first + pages_per_document, len(batch)) - 1
+        return f"{batch_id}:{first}-{last}", first, last
+    
+    current = None          # journal job of the document in progress
+    
+    def skip(number):
+        # Called just before a document renders: journal it as submitted
+        nonlocal current
+        if journal is None:
+            return False
+        job, first, last = job_id(number)
+        state = journal.state(job)
+        if state == CONFIRMED or (state == SPOOLED and not reprint_spooled):
+            return True
+        journal.submitted(job, f"{batch[first].text} .. {batch[last].text}", batch_id)
+        current = job
+        return False
+    
+    def document_path(number):
+        return os.path.join(pdf_backup_dir, f"batch_{timestamp}_{number + 1:04d}.pdf")
+    
+    unconfirmed_labels = 0
+    try:
+        for number, chunk, file_path in generator.iter_batch_pdfs(
+                batch, pages_per_document, filename=document_path, skip=skip):
+            job = job_id(number)[0] if journal is not None else None
+            current = job if file_path is not None else None
+            if file_path is None:
+                if journal.state(job) == CONFIRMED:
+                    summary['skipped'] += len(chunk)
+                else:
+                    print(f"Labels {job} may already have printed (spooled before a crash); "
+                          f"not printed again")
+                    summary['unconfirmed'].append(job)
+                    unconfirmed_labels += len(chunk)
+                continue
+            
+            print_metrics.increment(print_metrics.LABELS_SUBMITTED, len(chunk))
+            print(f"PDF batch created: {file_path} ({len(chunk)} labels)")
+            if journal is not None:
+                journal.rendered(job, file_path)
+            
+            failures = verify_label_records(chunk, generator) if verify else []
+            if failures:
+                for failure in failures:
+                    failure.record += number * pages_per_document
+                    print(f"Barcode verification failed: {failure}")
+                if journal is not None:
+                    journal.failed(job, "barcode verification failed")
+                success = False
+            else:
+                success = spool_label(printer, file_path, journal, job, wait)
+            
+            if success:
+                summary['printed'] += len(chunk)
+                print_metrics.increment(print_metrics.LABELS_PRINTED, len(chunk))
+                history = _print_history
+                if history is not None:
+                    # Reprints render the single label again (the file holds the whole document)
+                    for record in chunk:
+                        history.record(record, printer, '')
+            else:
+                print_metrics.increment(print_metrics.LABELS_FAILED, len(chunk))
+    except Exception as e:
+        # A render error stops the batch; the rest is reported as failed
+        print(f"Error printing batch: {str(e)}")
+        if current is not None and journal.state(current) != CONFIRMED:
+            journal.failed(current, str(e))
+    finally:
+        if journal is not None:
+            journal.sync()
+    
+    summary['failed'] = (len(batch) - summary['printed'] - summary['skipped']
+                         - unconfirmed_labels)
+    return summary
+
+
+def claim_print_key(key):
+    """
+    Register an idempotency key for a print submission.
+    
+    Args:
+        key (str): Client-supplied key or one from print_dedup.derive_key()
+        
+    Returns:
+        bool: True if the submission is new, False if it is a duplicate
+              (duplicates are counted in print_metrics)
+    """
+    if _duplicate_filter.check(key):
         return True
+    print(f"Duplicate print submission suppressed (key {key})")
+    print_metrics.increment(print_metrics.DUPLICATES_SUPPRESSED)
+    return False
 
 
-def print_label_standalone(value, printer, preview=0, use_pdf=True):
+def release_print_key(key):
+    """Release an idempotency key so the same label can be submitted again."""
+    _duplicate_filter.release(key)
+
+
+def print_label_standalone(value, printer, preview=0, use_pdf=True, verify=True,
+                           journal=None, job_id=None, batch_id='', idempotency_key=None,
+                           wait=False, session=None):
     """
     Print a label with the specified text on the specified printer.
     
     Args:
-        value (str): The text to print on the label
+        value (str or LabelRecord): The text ("SAP|CANTITATE|LOT") or record to print
         printer (str): The name of the printer to use
         preview (int): 0 = no preview, 1-3 = 3s preview, >3 = 5s preview
         use_pdf (bool): True to use PDF (recommended for quality), False for PNG
+        verify (bool): Decode the rendered barcodes and refuse to print on mismatch
+        journal (PrintJournal): Optional write-ahead journal to record the job in
+        job_id (str): Journal job id (generated if None)
+        batch_id (str): Journal batch id the job belongs to
+        idempotency_key (str): If given, a repeated submission with the same key
+                               within the duplicate window is dropped before
+                               rendering and reported as successful
+        wait (bool): Wait until the printer reports the job finished (CUPS)
+        session (PDFLabelSession): Session PDF labels are drawn with
+                                   (default: the generator's shared session)
     
     Returns:
         bool: True if printing was successful, False otherwise
     """
-    # For tracking if file was created
-    file_created = False
+    return print_label_job(value, printer, preview, use_pdf, verify, journal, job_id,
+                           batch_id, idempotency_key, wait, session)['ok']
+
+
+def print_label_job(value, printer, preview=0, use_pdf=True, verify=True, journal=None,
+                    job_id=None, batch_id='', idempotency_key=None, wait=False,
+                    session=None):
+    """
+    Print a label and report the outcome (see print_label_standalone).
+    
+    This is the one render -> verify -> spool pipeline used by the GUI, the
+    CLI, the daemon and the queue. With no printer the label is only
+    rendered and verified (nothing is journaled or spooled).
+    
+    Returns:
+        dict: 'ok' (bool), 'file' (rendered label, once rendered), 'error'
+              (reason when not ok) and 'duplicate' (True when the idempotency
+              key was already submitted within the duplicate window)
+    """
+    if idempotency_key is not None and not claim_print_key(idempotency_key):
+        return {'ok': True, 'duplicate': True}
+    if not printer:
+        journal = None
+    
+    print_metrics.increment(print_metrics.LABELS_SUBMITTED)
+    profiler = label_profiler.active
+    if profiler is None:
+        result = _render_and_print(value, printer, preview, use_pdf, verify,
+                                   journal, job_id, batch_id, wait, session)
+    else:
+        result = profiler.call(_render_and_print, value, printer, preview, use_pdf, verify,
+                               journal, job_id, batch_id, wait, session)
+    if result['ok']:
+        print_metrics.increment(print_metrics.LABELS_PRINTED)
+    else:
+        print_metrics.increment(print_metrics.LABELS_FAILED)
+        if idempotency_key is not None:
+            release_print_key(idempotency_key)
+    return result
+
+
+def _render_and_print(value, printer, preview, use_pdf, verify, journal, job_id, batch_id,
+                      wait=False, session=None):
+    """Render, verify and spool one label (see print_label_job)."""
+    result = {'ok': False}
     temp_file = None
+    label_img = None
+    
+    def fail(error):
+        result['error'] = error
+        if journal is not None:
+            journal.failed(job_id, error)
+        return result
+    
+    record = LabelRecord.parse(value)
+    if not isinstance(value, str):
+        value = record.text
+    
+    if journal is not None:
+        if job_id is None:
+            job_id = journal.new_job_id()
+        journal.submitted(job_id, value, batch_id)
+    
+    # Refuse values the barcodes cannot encode instead of printing a text fallback
+    issues = preflight_record(record)
+    if issues:
+        for issue in issues:
+            print(f"Label rejected: {issue}")
+        result['error'] = "; ".join(str(issue) for issue in issues)
+        if journal is not None:
+            journal.failed(job_id, "invalid label value")
+        return result
     
     try:
         # Debug output
@@ -298,17 +946,38 @@ def print_label_standalone(value, printer, preview=0, use_pdf=True):
         
         # Create label in selected format
         if use_pdf:
-            temp_file = create_label_pdf(value)
+            temp_file = create_label_pdf(record, session)
             print(f"PDF label created: {temp_file}")
             print(f"PDF backup saved to: {temp_file}")
         else:
             # Create the label image (PNG)
-            label_img = create_label_image(value)
+            label_img = create_label_image(record)
             temp_file = 'final_label.png'
             label_img.save(temp_file)
             print(f"PNG label created: {temp_file}")
         
-        file_created = True
+        result['file'] = temp_file
+        if journal is not None:
+            journal.rendered(job_id, temp_file)
+        
+        # Check the rendered barcodes before anything is spooled
+        if verify:
+            if use_pdf:
+                failures = verify_pdf_record(record)
+            else:
+                failures = verify_label_image(label_img, record)
+            if failures:
+                for failure in failures:
+                    print(f"Barcode verification failed: {failure}")
+                result['error'] = "; ".join(repr(failure) for failure in failures)
+                if journal is not None:
+                    journal.failed(job_id, "barcode verification failed")
+                return result
+        
+        if not printer:
+            # Render only
+            result['ok'] = True
+            return result
         
         # Convert preview to int if it's a string
         if isinstance(preview, str):
@@ -331,26 +1000,31 @@ def print_label_standalone(value, printer, preview=0, use_pdf=True):
                 print("\nPrinting now...")
             except KeyboardInterrupt:
                 print("\nCancelled by user")
-                return False
+                return fail("cancelled by user")
             
             # Print after preview
             print("Sending to printer...")
-            return print_to_printer(printer, temp_file)
         else:
             print("Direct printing without preview...")
-            # Direct printing without preview (preview = 0)
-            return print_to_printer(printer, temp_file)
+        
+        result['ok'] = spool_and_record(record, printer, temp_file, journal, job_id, wait,
+                                        use_pdf)
+        if not result['ok']:
+            result['error'] = "printing failed"
+        return result
             
     except Exception as e:
         print(f"Error printing label: {str(e)}")
-        return False
+        return fail(str(e))
         
     finally:
         # This block always executes, ensuring cleanup
+        if label_img is not None:
+            label_img.close()
         if use_pdf:
             print(f"Cleanup complete - PDF backup saved to pdf_backup folder")
         else:
             print("Cleanup complete - label file retained for reference")
 
 
-# Main code removed - import this module or run as part of the Kivy GUI application
+# Import this module, run the Kivy GUI application, or use label_cli.py from the command line
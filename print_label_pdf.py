@@ -8,19 +8,113 @@ Simplified layout: no borders, just field names and barcodes.
 from reportlab.lib.pagesizes import landscape
 from reportlab.lib.units import cm, mm
 from reportlab.pdfgen import canvas
-from barcode import Code128
-from barcode.writer import ImageWriter
-import io
+from reportlab.pdfbase import pdfdoc, pdfmetrics
+from reportlab.lib.rl_accel import fp_str
 from PIL import Image
+from code128 import encode_widths, total_modules, widths_to_image
+from label_record import LabelRecord
+from document_cache import document_key
+import io
 import os
-import tempfile
+import zlib
+import hashlib
 import datetime
+import threading
+from itertools import islice
+from collections import OrderedDict
+
+
+# Bump when the label layout changes so cached documents are not reused
+TEMPLATE_VERSION = 1
+
+# Labels per document when a batch is streamed as several PDFs (iter_batch_pdfs)
+PAGES_PER_DOCUMENT = 500
+
+
+class BilevelImage:
+    """
+    Black and white image prepared for PDF embedding.
+    
+    Pixels are stored packed at 1 bit per pixel and Flate-compressed once,
+    so embedding costs nothing but a copy of the compressed stream. The
+    name is derived from the content: a barcode drawn several times in one
+    document is stored once.
+    """
+    
+    __slots__ = ('name', 'width', 'height', 'data')
+    
+    def __init__(self, img):
+        """
+        Args:
+            img (PIL.Image): Source image (converted to mode '1')
+        """
+        if img.mode != '1':
+            img = img.convert('1')
+        self.width, self.height = img.size
+        # PIL packs mode '1' rows MSB first, 1 = white: same as PDF DeviceGray
+        self.data = zlib.compress(img.tobytes(), 9)
+        self.name = 'BC' + hashlib.blake2b(
+            b'%d:%d:' % img.size + self.data, digest_size=10).hexdigest()
+    
+    def to_image(self):
+        """
+        Decode the embedded stream back into an image (what the PDF shows).
+        
+        Returns:
+            PIL.Image: Mode '1' image
+        """
+        return Image.frombytes('1', (self.width, self.height), zlib.decompress(self.data))
+    
+    def xobject(self):
+        """New PDF image XObject for this image (one per document)."""
+        obj = pdfdoc.PDFImageXObject(self.name)
+        obj.width = self.width
+        obj.height = self.height
+        obj.bitsPerComponent = 1
+        obj.colorSpace = 'DeviceGray'
+        obj.streamContent = self.data
+        obj._filters = ('FlateDecode',)
+        return obj
+    
+    def draw(self, c, x, y, width, height):
+        """
+        Draw the image on a canvas, embedding its stream on first use.
+        
+        Args:
+            c (canvas.Canvas): Target canvas
+            x, y (float): Lower-left corner in points
+            width, height (float): Drawn size in points
+        """
+        reg_name = self.register(c)
+        c.saveState()
+        c.translate(x, y)
+        c.scale(width, height)
+        c._code.append(f"/{reg_name} Do")
+        c.restoreState()
+    
+    def register(self, c):
+        """
+        Make the image available to the current page without drawing it.
+        
+        Args:
+            c (canvas.Canvas): Target canvas
+            
+        Returns:
+            str: XObject name to use with the Do operator
+        """
+        doc = c._doc
+        reg_name = doc.getXObjectName(self.name)
+        if reg_name not in doc.idToObject:
+            doc.Reference(self.xobject(), reg_name)
+        c._currentPageHasImages = 1
+        c._formsinuse.append(self.name)
+        return reg_name
 
 
 class PDFLabelGenerator:
     """Generate high-quality PDF labels with barcodes"""
     
-    def __init__(self, label_width=11.5, label_height=8, dpi=300):
+    def __init__(self, label_width=11.5, label_height=8, dpi=300, document_cache=None):
         """
         Initialize PDF label generator.
         
@@ -28,19 +122,77 @@ class PDFLabelGenerator:
             label_width (float): Width in cm (default 11.5 cm)
             label_height (float): Height in cm (default 8 cm)
             dpi (int): DPI for barcode generation (default 300 for print quality)
+            document_cache (DocumentCache): Cache of finished single-label PDFs
         """
         self.label_width = label_width * cm
         self.label_height = label_height * cm
         self.dpi = dpi
         self.margin = 3 * mm  # Minimal margin
+        # Barcode geometry (module width is rounded to whole printer dots)
+        self.module_width_mm = 0.5
+        self.barcode_height_mm = 16
+        self.quiet_zone_modules = 4
+        # Recently rendered barcodes, keyed by value (LRU)
+        self.barcode_cache_size = 64
+        self._barcode_cache = OrderedDict()
+        # Drawn rows, keyed by (template, row, value): content stream
+        # operators that are replayed when the same row appears again (LRU)
+        self.row_cache_size = 256
+        self._row_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Output size accounting (see output_stats)
+        self._documents = 0
+        self._labels = 0
+        self._bytes = 0
+        # Warm writer behind create_label_pdf (see PDFLabelSession)
+        self._session = None
+        self.document_cache = document_cache
     
-    def generate_barcode_image(self, value, height_mm=18):
+    def mm_to_dots(self, length_mm):
+        """Convert a length in mm to whole printer dots at self.dpi."""
+        return max(1, int(round(length_mm * self.dpi / 25.4)))
+    
+    def dots_to_points(self, dots):
+        """Convert printer dots at self.dpi to PDF points."""
+        return dots * 72.0 / self.dpi
+    
+    def snap_to_dots(self, points):
+        """Round a PDF coordinate to the nearest printer dot boundary."""
+        return self.dots_to_points(round(points * self.dpi / 72.0))
+    
+    def max_barcode_dots(self):
+        """Widest barcode (quiet zones included) that fits on the label, in dots."""
+        max_width = self.label_width - 2 * self.margin - 2 * mm
+        return int(max_width * self.dpi / 72.0)
+    
+    def module_dots(self, modules):
+        """
+        Choose an integer number of printer dots per barcode module.
+        
+        Uses the dot count closest to module_width_mm at self.dpi
+        (4 dots at 203 DPI, 6 at 300, 12 at 600) and steps down by whole
+        dots when the symbol would not fit the label width.
+        
+        Args:
+            modules (int): Symbol width in modules, quiet zones included
+            
+        Returns:
+            int: Dots per module (at least 1)
+        """
+        fit = self.max_barcode_dots() // max(1, modules)
+        return max(1, min(self.mm_to_dots(self.module_width_mm), fit))
+    
+    def generate_barcode_image(self, value, height_mm=None):
         """
         Generate barcode image from text value.
         
+        The bitmap is rendered at the printer resolution (self.dpi): every
+        module is a whole number of dots, so it can be placed on the page
+        1:1 without resampling.
+        
         Args:
             value (str): Text to encode in barcode (max 25 chars)
-            height_mm (int): Barcode height in mm (default 18mm for 1.8cm)
+            height_mm (float): Barcode height in mm (default barcode_height_mm)
             
         Returns:
             PIL.Image or None: Generated barcode image
@@ -52,59 +204,60 @@ class PDFLabelGenerator:
             # Truncate to 25 characters (Code128 limitation)
             value_truncated = value.strip()[:25]
             
-            # Create barcode
-            barcode_instance = Code128(value_truncated, writer=ImageWriter())
-            
-            # Generate in memory using a temporary directory
-            temp_dir = tempfile.gettempdir()
-            temp_name = f"barcode_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
-            temp_base_path = os.path.join(temp_dir, temp_name)
-            
-            # Barcode options - generate at high DPI for quality
-            options = {
-                'write_text': False,
-                'module_width': 0.5,  # Width of each bar in mm
-                'module_height': 8,  # Height in mm
-                'quiet_zone': 2,
-                'font_size': 0
-            }
-            
-            barcode_instance.save(temp_base_path, options=options)
-            
-            # The barcode.save() adds .png extension automatically
-            temp_path = temp_base_path + '.png'
-            
-            # Load and return image
-            img = Image.open(temp_path)
-            # Convert to RGB if needed
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # Clean up temp file
-            try:
-                os.remove(temp_path)
-            except:
-                pass
+            # Encode to module widths (optimal A/B/C code-set switching)
+            widths = encode_widths(value_truncated)
             
-            return img
+            modules = total_modules(widths) + 2 * self.quiet_zone_modules
+            module_px = self.module_dots(modules)
+            height_px = self.mm_to_dots(height_mm or self.barcode_height_mm)
+            return widths_to_image(widths, module_px, height_px,
+                                   quiet_zone_modules=self.quiet_zone_modules, mode='1')
         except Exception as e:
             # Log error but don't fail silently
             print(f"Barcode generation error for '{value}': {e}")
             return None
     
-    def create_label_pdf(self, sap_nr, cantitate, lot_number, filename=None):
+    def get_barcode(self, value):
         """
-        Create a PDF label with three rows of data and barcodes.
-        Each row shows label name, barcode, and value text.
+        Get a drawable barcode for a value, reusing previously rendered ones.
+        
+        Batch jobs (serial ranges, quantity splits) repeat the same SAP and
+        lot values on every label, so only values not seen recently are
+        encoded again.
+        
+        Args:
+            value (str): Barcode value (already stripped and truncated)
+            
+        Returns:
+            BilevelImage or None: 1-bit barcode, None on failure
+        """
+        with self._cache_lock:
+            cached = self._barcode_cache.get(value)
+            if cached is not None:
+                self._barcode_cache.move_to_end(value)
+                return cached
+        
+        barcode_img = self.generate_barcode_image(value)
+        if not barcode_img:
+            return None
+        
+        cached = BilevelImage(barcode_img)
+        barcode_img.close()
+        with self._cache_lock:
+            self._barcode_cache[value] = cached
+            if len(self._barcode_cache) > self.barcode_cache_size:
+                self._barcode_cache.popitem(last=False)
+        return cached
+    
+    def draw_label(self, c, sap_nr, cantitate, lot_number):
+        """
+        Draw one label (three rows) on the current page of a canvas.
         
         Args:
+            c (canvas.Canvas): Target canvas
             sap_nr (str): SAP article number
             cantitate (str): Quantity value
             lot_number (str): Lot/Cable ID
-            filename (str): Output filename (if None, returns bytes)
-            
-        Returns:
-            bytes or str: PDF content as bytes or filename if saved
         """
         # Prepare data for rows
         rows_data = [
@@ -113,127 +266,331 @@ class PDFLabelGenerator:
             ("Lot Nr", lot_number),
         ]
         
-        # Create PDF canvas in memory or to file
-        if filename:
-            pdf_buffer = filename
-        else:
-            pdf_buffer = io.BytesIO()
-        
-        # Create canvas with label dimensions
-        c = canvas.Canvas(pdf_buffer, pagesize=(self.label_width, self.label_height))
-        
         # Calculate dimensions
-        usable_width = self.label_width - 2 * self.margin
         row_height = (self.label_height - 2 * self.margin) / 3
+        template = self.template_key()
+        doc = c._doc
         
-        # Draw each row - label name, barcode, and value text
+        # Draw each row - label name, barcode, and value text. Consecutive
+        # labels usually repeat SAP and lot, so only changed rows are drawn;
+        # the others replay their recorded operators.
         for idx, (label_name, value) in enumerate(rows_data):
-            y_position = self.label_height - self.margin - (idx + 1) * row_height
+            key = (template, idx, value)
+            with self._cache_lock:
+                fragment = self._row_cache.get(key)
+                if fragment is not None:
+                    self._row_cache.move_to_end(key)
             
-            # Draw label name (small, at top of row)
-            c.setFont("Helvetica-Bold", 8)
-            c.drawString(
-                self.margin,
-                y_position + row_height - 3 * mm,
-                label_name
-            )
+            # Font resource names (F1, F2...) are per document: replay only
+            # where they match the document the row was recorded in
+            if fragment is not None and all(doc.fontMapping.get(font) == internal
+                                            for font, internal in fragment[1]):
+                code, _, barcode = fragment
+                if barcode is not None:
+                    barcode.register(c)
+                c._code.extend(code)
+                continue
             
-            # Generate and draw barcode if value exists
-            if value and value.strip():
-                barcode_value = value.strip()[:25]
-                
-                # Fixed barcode height: 1.6 cm (16mm) for optimal readability
-                barcode_height_mm = 16
-                barcode_height = barcode_height_mm * mm
+            start = len(c._code)
+            y_position = self.label_height - self.margin - (idx + 1) * row_height
+            barcode = self._draw_row(c, label_name, value, y_position, row_height)
+            fragment = (tuple(c._code[start:]), tuple(doc.fontMapping.items()), barcode)
+            with self._cache_lock:
+                self._row_cache[key] = fragment
+                if len(self._row_cache) > self.row_cache_size:
+                    self._row_cache.popitem(last=False)
+    
+    def _draw_row(self, c, label_name, value, y_position, row_height):
+        """
+        Draw one row of a label.
+        
+        Returns:
+            BilevelImage or None: Barcode drawn in the row
+        """
+        barcode = None
+        # Draw label name (small, at top of row)
+        c.setFont("Helvetica-Bold", 8)
+        c.drawString(
+            self.margin,
+            y_position + row_height - 3 * mm,
+            label_name
+        )
+        
+        # Generate and draw barcode if value exists
+        if value and value.strip():
+            barcode_value = value.strip()[:25]
+            
+            try:
+                barcode = self.get_barcode(barcode_value)
                 
-                try:
-                    barcode_img = self.generate_barcode_image(barcode_value, height_mm=barcode_height_mm)
+                if barcode:
+                    # One image pixel per printer dot: no resampling
+                    barcode_width = self.dots_to_points(barcode.width)
+                    barcode_height = self.dots_to_points(barcode.height)
+                    
+                    # Position barcode vertically centered in middle of row,
+                    # aligned to the printer's dot grid
+                    barcode_x = self.snap_to_dots(self.margin)
+                    barcode_y = self.snap_to_dots(
+                        y_position + (row_height - barcode_height) / 2)
+                    
+                    # Draw barcode image (1-bit, stored once per document)
+                    barcode.draw(c, barcode_x, barcode_y, barcode_width, barcode_height)
                     
-                    if barcode_img:
-                        # Calculate barcode dimensions
-                        max_barcode_width = usable_width - 2 * mm
-                        aspect_ratio = barcode_img.width / barcode_img.height
-                        barcode_width = barcode_height * aspect_ratio
-                        
-                        # Constrain width to fit in label
-                        if barcode_width > max_barcode_width:
-                            barcode_width = max_barcode_width
-                        
-                        # Save barcode temporarily and draw on PDF
-                        barcode_temp = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-                        barcode_path = barcode_temp.name
-                        barcode_temp.close()
-                        
-                        barcode_img.save(barcode_path, 'PNG')
-                        
-                        # Position barcode vertically centered in middle of row
-                        barcode_y = y_position + (row_height - barcode_height) / 2
-                        
-                        # Draw barcode image
-                        c.drawImage(
-                            barcode_path,
-                            self.margin,
-                            barcode_y,
-                            width=barcode_width,
-                            height=barcode_height,
-                            preserveAspectRatio=True
-                        )
-                        
-                        # Draw small text below barcode showing the value
-                        c.setFont("Helvetica", 6)
-                        c.drawString(
-                            self.margin,
-                            barcode_y - 3 * mm,
-                            f"({barcode_value})"
-                        )
-                        
-                        # Clean up
-                        try:
-                            os.remove(barcode_path)
-                        except:
-                            pass
-                    else:
-                        # If barcode generation failed, show text
-                        c.setFont("Helvetica", 10)
-                        c.drawString(
-                            self.margin,
-                            y_position + row_height / 2,
-                            f"[No Barcode: {barcode_value}]"
-                        )
-                except Exception as e:
-                    # Fallback: draw value as text with error indicator
-                    print(f"PDF barcode error: {e}")
+                    # Draw small text below barcode showing the value
+                    c.setFont("Helvetica", 6)
+                    c.drawString(
+                        self.margin,
+                        barcode_y - 3 * mm,
+                        f"({barcode_value})"
+                    )
+                else:
+                    # If barcode generation failed, show text
                     c.setFont("Helvetica", 10)
                     c.drawString(
                         self.margin,
                         y_position + row_height / 2,
-                        f"[Text: {barcode_value}]"
+                        f"[No Barcode: {barcode_value}]"
                     )
-            else:
-                # Empty value - show placeholder
-                c.setFont("Helvetica", 8)
+            except Exception as e:
+                # Fallback: draw value as text with error indicator
+                print(f"PDF barcode error: {e}")
+                c.setFont("Helvetica", 10)
                 c.drawString(
                     self.margin,
                     y_position + row_height / 2,
-                    "(empty)"
+                    f"[Text: {barcode_value}]"
                 )
+        else:
+            # Empty value - show placeholder
+            c.setFont("Helvetica", 8)
+            c.drawString(
+                self.margin,
+                y_position + row_height / 2,
+                "(empty)"
+            )
+        return barcode
+    
+    def create_label_pdf(self, sap_nr, cantitate='', lot_number='', filename=None,
+                         session=None):
+        """
+        Create a PDF label with three rows of data and barcodes.
+        Each row shows label name, barcode, and value text.
+        
+        Args:
+            sap_nr (str or LabelRecord): SAP article number, or a whole record
+            cantitate (str): Quantity value
+            lot_number (str): Lot/Cable ID
+            filename (str): Output filename (if None, returns bytes)
+            session (PDFLabelSession): Session to draw with (default: the shared one)
+            
+        Returns:
+            bytes or str: PDF content as bytes or filename if saved
+        """
+        if isinstance(sap_nr, LabelRecord):
+            sap_nr, cantitate, lot_number = sap_nr
+        session = session or self.session()
+        if self.document_cache is None:
+            return session.write(sap_nr, cantitate, lot_number, filename)
+        
+        # Repeated labels and reprints are served without rendering
+        key = self.document_key(sap_nr, cantitate, lot_number)
+        pdf_bytes = self.document_cache.get(key)
+        if pdf_bytes is None:
+            pdf_bytes = session.render(sap_nr, cantitate, lot_number)
+            self.document_cache.put(key, pdf_bytes)
+        
+        if not filename:
+            return pdf_bytes
+        with open(filename, 'wb') as f:
+            f.write(pdf_bytes)
+        return filename
+    
+    def template_key(self):
+        """Fingerprint of every setting that affects the rendered document."""
+        return (f"v{TEMPLATE_VERSION}:{self.label_width:.4f}x{self.label_height:.4f}:"
+                f"{self.dpi}:{self.margin:.4f}:{self.module_width_mm}:"
+                f"{self.barcode_height_mm}:{self.quiet_zone_modules}")
+    
+    def document_key(self, sap_nr, cantitate='', lot_number=''):
+        """
+        Content address of a single-label document.
+        
+        Args:
+            sap_nr (str or LabelRecord): SAP article number, or a whole record
+            cantitate (str): Quantity value
+            lot_number (str): Lot/Cable ID
+            
+        Returns:
+            str: Hex key for DocumentCache
+        """
+        if isinstance(sap_nr, LabelRecord):
+            sap_nr, cantitate, lot_number = sap_nr
+        return document_key(self.template_key(), sap_nr, cantitate, lot_number)
+    
+    def session(self):
+        """
+        Shared warm session used for single labels.
         
+        Returns:
+            PDFLabelSession: Session without printer or backup folder
+        """
+        with self._cache_lock:
+            if self._session is None:
+                self._session = PDFLabelSession(self)
+            return self._session
+    
+    def open_session(self, printer=None, backup_dir='pdf_backup'):
+        """
+        Open a continuous print session (e.g. for a whole shift at a station).
+        
+        Args:
+            printer (str): Printer every emitted label is sent to (None = backup only)
+            backup_dir (str): Folder each label PDF is written to
+            
+        Returns:
+            PDFLabelSession: Open session (close it, or use it as a context manager)
+        """
+        return PDFLabelSession(self, printer=printer, backup_dir=backup_dir)
+    
+    def create_batch_pdf(self, records, filename=None):
+        """
+        Create one multi-page PDF with a page per label.
+        
+        Barcodes for values repeated across records are rendered only once.
+        The canvas holds every page until the document is saved: long
+        batches go through iter_batch_pdfs() or write_batch_pdfs().
+        
+        Args:
+            records (iterable): LabelRecords, a RecordBatch or
+                                (sap_nr, cantitate, lot_number) tuples
+            filename (str): Output filename (if None, returns bytes)
+            
+        Returns:
+            bytes or str: PDF content as bytes or filename if saved
+        """
+        # Create PDF canvas in memory or to file
+        if filename:
+            pdf_buffer = filename
+        else:
+            pdf_buffer = io.BytesIO()
+        
+        # Create canvas with label dimensions (compressed page streams);
+        # invariant output: the same records always give the same bytes
+        c = canvas.Canvas(pdf_buffer, pagesize=(self.label_width, self.label_height),
+                          pageCompression=1, invariant=1)
+        
+        labels = 0
+        for sap_nr, cantitate, lot_number in records:
+            self.draw_label(c, sap_nr, cantitate, lot_number)
+            c.showPage()
+            labels += 1
+
         # Save PDF
         c.save()
-        
+
         # Return filename or bytes
         if filename:
+            self._count_output(labels, os.path.getsize(filename))
             return filename
         else:
             pdf_buffer.seek(0)
-            return pdf_buffer.getvalue()
+            pdf_bytes = pdf_buffer.getvalue()
+            self._count_output(labels, len(pdf_bytes))
+            return pdf_bytes
+
+    def _count_output(self, labels, size):
+        with self._cache_lock:
+            self._documents += 1
+            self._labels += labels
+            self._bytes += size
+
+    def output_stats(self):
+        """
+        Size of the PDF output produced by this generator so far.
+        
+        Returns:
+            dict: documents, labels, bytes and bytes_per_label
+        """
+        with self._cache_lock:
+            labels = self._labels
+            return {
+                'documents': self._documents,
+                'labels': labels,
+                'bytes': self._bytes,
+                'bytes_per_label': round(self._bytes / labels) if labels else 0,
+            }
+
+    def iter_batch_pdfs(self, records, pages_per_document=PAGES_PER_DOCUMENT, filename=None,
+                        skip=None):
+        """
+        Stream a batch as a series of multi-page PDF documents.
+        
+        A reportlab canvas keeps every page in memory until it is saved, so
+        very long batches are cut into documents of at most
+        pages_per_document pages. Memory stays bounded no matter how many
+        records the (lazy) input yields: only the records of the current
+        document are held.
+        
+        Args:
+            records (iterable): LabelRecords, a RecordBatch or
+                                (sap_nr, cantitate, lot_number) tuples
+            pages_per_document (int): Maximum labels per document
+            filename (callable): filename(number) -> path document `number`
+                                 (0-based) is saved to (None = yield bytes)
+            skip (callable): skip(number) -> True to pass over a document
+                             without rendering it (e.g. already printed);
+                             called just before each document renders
+            
+        Yields:
+            tuple: (document number, its records, PDF bytes or filename;
+                   None for skipped documents)
+        """
+        if pages_per_document < 1:
+            raise ValueError("pages_per_document must be at least 1")
+        records = iter(records)
+        number = 0
+        while True:
+            chunk = list(islice(records, pages_per_document))
+            if not chunk:
+                return
+            if skip is not None and skip(number):
+                yield number, chunk, None
+            else:
+                yield number, chunk, self.create_batch_pdf(
+                    chunk, filename(number) if filename is not None else None)
+            number += 1
+    
+    def write_batch_pdfs(self, records, filename, pages_per_document=PAGES_PER_DOCUMENT):
+        """
+        Write a batch to PDF files of at most pages_per_document labels.
+        
+        The first document is written to filename, the next ones next to it
+        with a counter (labels.pdf, labels_0002.pdf, ...).
+        
+        Args:
+            records (iterable): LabelRecords, a RecordBatch or
+                                (sap_nr, cantitate, lot_number) tuples
+            filename (str): Path of the first document
+            pages_per_document (int): Maximum labels per document
+            
+        Returns:
+            list: Paths of the written documents
+        """
+        stem, suffix = os.path.splitext(filename)
+        
+        def document_path(number):
+            return filename if number == 0 else f"{stem}_{number + 1:04d}{suffix}"
+        
+        return [path for _, _, path in self.iter_batch_pdfs(records, pages_per_document,
+                                                            filename=document_path)]
     
-    def create_label_pdf_file(self, sap_nr, cantitate, lot_number, filename=None):
+    def create_label_pdf_file(self, sap_nr, cantitate='', lot_number='', filename=None):
         """
         Create PDF label file and return the filename.
         
         Args:
-            sap_nr (str): SAP article number
+            sap_nr (str or LabelRecord): SAP article number, or a whole record
             cantitate (str): Quantity value
             lot_number (str): Lot/Cable ID
             filename (str): Output filename (if None, auto-generates)
@@ -248,24 +605,256 @@ class PDFLabelGenerator:
         return self.create_label_pdf(sap_nr, cantitate, lot_number, filename)
 
 
+class PDFLabelSession:
+    """
+    Continuous writer that emits each label as its own one-page PDF job.
+    
+    A new reportlab document per label pays for canvas and font setup and
+    the full object serializer every time. A session keeps one canvas open
+    as a drawing surface and caches the serialized fonts and barcode image
+    streams, so each label costs its drawing operators plus a small PDF
+    assembled around them. Output is deterministic: the same record always
+    gives the same bytes.
+    """
+    
+    def __init__(self, generator, printer=None, backup_dir=None, recycle_every=1000):
+        """
+        Initialize session.
+        
+        Args:
+            generator (PDFLabelGenerator): Layout and barcode cache to draw with
+            printer (str): Printer emit() sends each label to (None = render only)
+            backup_dir (str): Folder emit() writes each label to
+            recycle_every (int): Labels drawn before the drawing surface is replaced
+        """
+        self.generator = generator
+        self.printer = printer
+        self.backup_dir = backup_dir
+        self.recycle_every = recycle_every
+        self.image_cache_size = 256
+        self.labels = 0
+        self.bytes = 0
+        self.closed = False
+        
+        self._lock = threading.Lock()
+        self._canvas = None
+        self._drawn = 0
+        self._fonts = {}                # internal name (e.g. F1) -> font dictionary
+        self._images = OrderedDict()    # XObject name -> serialized image (LRU)
+        
+        if backup_dir:
+            os.makedirs(backup_dir, exist_ok=True)
+    
+    def _surface(self):
+        """Drawing canvas; replaced periodically to drop old image registrations."""
+        if self._canvas is None or self._drawn >= self.recycle_every:
+            self._canvas = canvas.Canvas(
+                io.BytesIO(),
+                pagesize=(self.generator.label_width, self.generator.label_height)
+            )
+            self._drawn = 0
+        return self._canvas
+    
+    def _font_object(self, psname, internal_name):
+        font = self._fonts.get(internal_name)
+        if font is None:
+            face = pdfmetrics.getFont(psname)
+            font = (b'<< /BaseFont /%s /Encoding /%s /Name /%s /Subtype /Type1 /Type /Font >>'
+                    % (face.face.name.encode('ascii'), face.encoding.name.encode('ascii'),
+                       internal_name.encode('ascii')))
+            self._fonts[internal_name] = font
+        return font
+    
+    def _image_object(self, doc, name):
+        image = self._images.get(name)
+        if image is not None:
+            self._images.move_to_end(name)
+            return image
+        
+        obj = doc.idToObject[doc.getXObjectName(name)]
+        filters = ' '.join('/' + f for f in obj._filters)
+        image = (b'<< /BitsPerComponent %d /ColorSpace /%s /Filter [ %s ] /Height %d '
+                 b'/Length %d /Subtype /Image /Type /XObject /Width %d >>\nstream\n'
+                 % (obj.bitsPerComponent, obj.colorSpace.encode('ascii'),
+                    filters.encode('ascii'), obj.height, len(obj.streamContent), obj.width)
+                 + obj.streamContent + b'\nendstream')
+        self._images[name] = image
+        if len(self._images) > self.image_cache_size:
+            self._images.popitem(last=False)
+        return image
+    
+    def _assemble(self, c, content):
+        """Build a complete one-page PDF around a page content stream."""
+        doc = c._doc
+        fonts = [(internal.lstrip('/'), self._font_object(psname, internal.lstrip('/')))
+                 for psname, internal in doc.fontMapping.items()]
+        images = [(doc.getXObjectName(name), self._image_object(doc, name))
+                  for name in dict.fromkeys(c._formsinuse)]
+        
+        first_resource = 5
+        font_refs = ' '.join(f'/{name} {first_resource + i} 0 R'
+                             for i, (name, _) in enumerate(fonts))
+        first_image = first_resource + len(fonts)
+        image_refs = ' '.join(f'/{name} {first_image + i} 0 R'
+                              for i, (name, _) in enumerate(images))
+        
+        stream = zlib.compress(content.encode('latin-1'), 6)
+        page = (f'<< /Contents 4 0 R /MediaBox [ 0 0 {fp_str(self.generator.label_width)} '
+                f'{fp_str(self.generator.label_height)} ] /Parent 2 0 R '
+                f'/Resources << /Font << {font_refs} >> /ProcSet [ /PDF /Text /ImageB ] '
+                f'/XObject << {image_refs} >> >> /Type /Page >>').encode('ascii')
+        objects = [
+            b'<< /Pages 2 0 R /Type /Catalog >>',
+            b'<< /Count 1 /Kids [ 3 0 R ] /Type /Pages >>',
+            page,
+            b'<< /Filter [ /FlateDecode ] /Length %d >>\nstream\n' % len(stream)
+            + stream + b'\nendstream',
+        ]
+        objects.extend(font for _, font in fonts)
+        objects.extend(image for _, image in images)
+        
+        parts = [b'%PDF-1.4\n%\x93\x8c\x8b\x9e\n']
+        position = len(parts[0])
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            chunk = b'%d 0 obj\n%s\nendobj\n' % (number, body)
+            offsets.append(position)
+            parts.append(chunk)
+            position += len(chunk)
+        
+        parts.append(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+        parts.extend(b'%010d 00000 n \n' % offset for offset in offsets)
+        parts.append(b'trailer\n<< /Root 1 0 R /Size %d >>\nstartxref\n%d\n%%%%EOF\n'
+                     % (len(objects) + 1, position))
+        return b''.join(parts)
+    
+    def render(self, sap_nr, cantitate, lot_number):
+        """
+        Render one label as a self-contained PDF.
+        
+        Args:
+            sap_nr (str): SAP article number
+            cantitate (str): Quantity value
+            lot_number (str): Lot/Cable ID
+            
+        Returns:
+            bytes: PDF content
+        """
+        with self._lock:
+            pdf_bytes = self._draw(sap_nr, cantitate, lot_number)
+            self.labels += 1
+            self.bytes += len(pdf_bytes)
+        self.generator._count_output(1, len(pdf_bytes))
+        return pdf_bytes
+    
+    def _draw(self, sap_nr, cantitate, lot_number):
+        """Draw and assemble one label (caller holds the lock)."""
+        if self.closed:
+            raise ValueError("PDF label session is closed")
+        c = self._surface()
+        try:
+            self.generator.draw_label(c, sap_nr, cantitate, lot_number)
+            return self._assemble(c, '\n'.join([c._preamble] + c._code + [' ']))
+        finally:
+            # Reset the page accumulators for the next label
+            c._startPage()
+            self._drawn += 1
+    
+    def warm_up(self, sap_nr='WARMUP', cantitate='1', lot_number='WARMUP'):
+        """
+        Render a throwaway label and discard it.
+        
+        Creates the drawing surface and loads font metrics and serialized
+        objects, so the first real label does not pay for them. Nothing is
+        written or counted in the output statistics.
+        """
+        with self._lock:
+            self._draw(sap_nr, cantitate, lot_number)
+    
+    def write(self, sap_nr, cantitate, lot_number, filename=None):
+        """
+        Render one label and write it to a file.
+        
+        Args:
+            sap_nr (str): SAP article number
+            cantitate (str): Quantity value
+            lot_number (str): Lot/Cable ID
+            filename (str): Output filename (if None, returns bytes)
+            
+        Returns:
+            bytes or str: PDF content as bytes or filename if saved
+        """
+        pdf_bytes = self.render(sap_nr, cantitate, lot_number)
+        if not filename:
+            return pdf_bytes
+        with open(filename, 'wb') as f:
+            f.write(pdf_bytes)
+        return filename
+    
+    def emit(self, sap_nr, cantitate, lot_number, **options):
+        """
+        Render one label, write it to the backup folder and send it to the printer.
+        
+        The label goes through print_label.print_label_job (preflight,
+        barcode verification, journal, history, duplicate keys and metrics),
+        drawn on this session. Each label is flushed as soon as it is drawn,
+        so a long session never holds more than the label being printed.
+        
+        Args:
+            sap_nr (str): SAP article number
+            cantitate (str): Quantity value
+            lot_number (str): Lot/Cable ID
+            **options: print_label_job options (verify, journal, idempotency_key, ...)
+            
+        Returns:
+            str or None: Path of the label PDF, None if it was rejected or printing failed
+        """
+        from print_label import print_label_job
+        result = print_label_job(LabelRecord(sap_nr, cantitate, lot_number), self.printer,
+                                 session=self, **options)
+        return result.get('file') if result['ok'] else None
+    
+    def stats(self):
+        """
+        Labels and bytes produced by this session.
+        
+        Returns:
+            dict: labels, bytes and bytes_per_label
+        """
+        with self._lock:
+            return {
+                'labels': self.labels,
+                'bytes': self.bytes,
+                'bytes_per_label': round(self.bytes / self.labels) if self.labels else 0,
+            }
+    
+    def close(self):
+        """Release the drawing surface and cached resources."""
+        with self._lock:
+            self.closed = True
+            self._canvas = None
+            self._fonts.clear()
+            self._images.clear()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
 def create_label_pdf_simple(text):
     """
     Simple wrapper to create PDF from combined text (SAP|CANTITATE|LOT).
     
     Args:
-        text (str): Combined text in format "SAP|CANTITATE|LOT"
+        text (str or LabelRecord): Combined text in format "SAP|CANTITATE|LOT"
         
     Returns:
         bytes: PDF content
     """
-    # Parse text
-    parts = text.split('|') if '|' in text else [text, '', '']
-    sap_nr = parts[0].strip() if len(parts) > 0 else ''
-    cantitate = parts[1].strip() if len(parts) > 1 else ''
-    lot_number = parts[2].strip() if len(parts) > 2 else ''
-    
     generator = PDFLabelGenerator()
-    pdf_bytes = generator.create_label_pdf(sap_nr, cantitate, lot_number)
+    pdf_bytes = generator.create_label_pdf(LabelRecord.parse(text))
     
     return pdf_bytes
 
@@ -275,21 +864,11 @@ def create_label_pdf_file(text, filename=None):
     Create PDF label file from combined text.
     
     Args:
-        text (str): Combined text in format "SAP|CANTITATE|LOT"
+        text (str or LabelRecord): Combined text in format "SAP|CANTITATE|LOT"
         filename (str): Output filename (auto-generates if None)
         
     Returns:
         str: Path to created PDF file
     """
-    # Parse text
-    parts = text.split('|') if '|' in text else [text, '', '']
-    sap_nr = parts[0].strip() if len(parts) > 0 else ''
-    cantitate = parts[1].strip() if len(parts) > 1 else ''
-    lot_number = parts[2].strip() if len(parts) > 2 else ''
-    
-    if not filename:
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"label_{timestamp}.pdf"
-    
     generator = PDFLabelGenerator()
-    return generator.create_label_pdf(sap_nr, cantitate, lot_number, filename)
+    return generator.create_label_pdf_file(LabelRecord.parse(text), filename=filename)
@@ -0,0 +1,53 @@
+"""
+Print Metrics
+Process-wide, thread-safe counters for the render and print pipeline
+(labels printed, failed, duplicates suppressed, ...).
+"""
+
+import threading
+from collections import Counter
+
+
+_lock = threading.Lock()
+_counters = Counter()
+
+# Counter names used by the print path
+LABELS_SUBMITTED = 'labels_submitted'
+LABELS_PRINTED = 'labels_printed'
+LABELS_FAILED = 'labels_failed'
+DUPLICATES_SUPPRESSED = 'duplicates_suppressed'
+
+
+def increment(name, amount=1):
+    """
+    Add to a counter.
+
+    Args:
+        name (str): Counter name
+        amount (int): Value to add
+    """
+    with _lock:
+        _counters[name] += amount
+
+
+def get(name):
+    """Current value of a counter (0 if never incremented)."""
+    with _lock:
+        return _counters[name]
+
+
+def snapshot():
+    """
+    Copy of all counters.
+
+    Returns:
+        dict: Counter name -> value
+    """
+    with _lock:
+        return dict(_counters)
+
+
+def reset():
+    """Reset all counters to zero."""
+    with _lock:
+        _counters.clear()
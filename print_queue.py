@@ -0,0 +1,388 @@
+"""
+Print Queue
+Background queue for batch printing from the GUI. Jobs are printed by a
+small pool of worker threads; the queue can be paused, resumed and
+canceled while it runs.
+
+The GUI never walks the job list. It polls snapshot(), which only copies
+counters and a bounded window of jobs, so refreshing the dashboard costs
+the same with ten or ten thousand queued labels.
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+from collections import deque
+
+from label_record import RecordBatch, read_batch_file, record_text
+from label_preflight import check_batch
+
+
+PENDING = 'pending'
+ACTIVE = 'active'
+DONE = 'done'
+FAILED = 'failed'
+CANCELED = 'canceled'
+
+
+class QueueJob:
+    """One label in the print queue"""
+
+    __slots__ = ('job_id', 'text', 'printer', 'batch_id', 'state', 'error',
+                 'submitted', 'started', 'finished')
+
+    def __init__(self, job_id, text, printer, batch_id=''):
+        self.job_id = job_id
+        self.text = text
+        self.printer = printer
+        self.batch_id = batch_id
+        self.state = PENDING
+        self.error = ''
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+
+    def summary(self):
+        """Copy of the fields the dashboard shows."""
+        return {
+            'job_id': self.job_id,
+            'text': self.text,
+            'printer': self.printer,
+            'batch_id': self.batch_id,
+            'state': self.state,
+            'error': self.error,
+        }
+
+
+def read_import_batch(path):
+    """
+    Read the label records of a bulk import file.
+
+    Supported formats:
+        .csv    columns sap/qty/lot (header optional; first three columns)
+        .jsonl  one record per line, as accepted by label_cli.py pipe
+        other   one "SAP|CANTITATE|LOT" text per line
+
+    Args:
+        path (str): Import file
+
+    Returns:
+        RecordBatch: Records in file order
+    """
+    if os.path.splitext(path)[1].lower() not in ('.jsonl', '.json'):
+        return read_batch_file(path)
+
+    texts = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                texts.append(record_text(json.loads(line)))
+    return RecordBatch.from_records(texts)
+
+
+def read_import_file(path):
+    """
+    Read label texts for bulk import (see read_import_batch for formats).
+
+    Args:
+        path (str): Import file
+
+    Returns:
+        list: Label texts
+    """
+    return list(read_import_batch(path).texts())
+
+
+class PrintQueue:
+    """Thread-safe label print queue with pause, resume and cancel"""
+
+    def __init__(self, workers=2, journal=None, print_func=None, history=200):
+        """
+        Initialize print queue.
+
+        Args:
+            workers (int): Jobs printed at the same time
+            journal (PrintJournal): Optional job journal passed to the print path
+            print_func (callable): Replaces print_label_standalone(text, printer, **kw)
+            history (int): Finished jobs kept for the dashboard
+        """
+        self.workers = workers
+        self.journal = journal
+        self._print_func = print_func
+
+        self._condition = threading.Condition()
+        self._pending = deque()
+        self._jobs = {}                     # unfinished jobs by id
+        self._active = {}                   # job_id -> QueueJob
+        self._finished = deque(maxlen=history)
+        self._finish_times = deque()        # for labels per minute
+        self._counts = {PENDING: 0, ACTIVE: 0, DONE: 0, FAILED: 0, CANCELED: 0}
+        self._printers = {}                 # printer -> state counts
+        self._batches = {}                  # batch_id -> [total, finished]
+        self._paused = False
+        self._stopped = False
+        self._threads = []
+        self._next_id = 1
+
+    # -- submitting ---------------------------------------------------------
+
+    def _count(self, job, old_state, new_state):
+        """Move a job between state counters (caller holds the lock)."""
+        counts = self._printers.setdefault(
+            job.printer, {PENDING: 0, ACTIVE: 0, DONE: 0, FAILED: 0, CANCELED: 0})
+        if old_state is not None:
+            self._counts[old_state] -= 1
+            counts[old_state] -= 1
+        self._counts[new_state] += 1
+        counts[new_state] += 1
+        job.state = new_state
+
+    def submit(self, text, printer, batch_id=''):
+        """
+        Queue one label.
+
+        Args:
+            text (str): Label text ("SAP|CANTITATE|LOT")
+            printer (str): Target printer
+            batch_id (str): Batch the job belongs to
+
+        Returns:
+            str: Job id
+        """
+        return self.submit_many([text], printer, batch_id)[0]
+
+    def submit_many(self, texts, printer, batch_id=None):
+        """
+        Queue a batch of labels.
+
+        Args:
+            texts (iterable): Label texts
+            printer (str): Target printer
+            batch_id (str): Batch id (generated if None)
+
+        Returns:
+            list: Job ids in submission order
+        """
+        if batch_id is None:
+            batch_id = uuid.uuid4().hex[:8]
+        job_ids = []
+        with self._condition:
+            for text in texts:
+                job_id = f"Q{self._next_id:06d}"
+                self._next_id += 1
+                job = QueueJob(job_id, text, printer, batch_id)
+                self._count(job, None, PENDING)
+                self._pending.append(job)
+                self._jobs[job_id] = job
+                job_ids.append(job_id)
+            if batch_id:
+                batch = self._batches.setdefault(batch_id, [0, 0])
+                batch[0] += len(job_ids)
+            self._condition.notify_all()
+        self.start()
+        return job_ids
+
+    def import_file(self, path, printer):
+        """
+        Queue every label of an import file (see read_import_batch).
+
+        The whole file is preflighted first; nothing is queued if any
+        record has a value the barcodes cannot encode.
+
+        Args:
+            path (str): Import file
+            printer (str): Target printer
+
+        Returns:
+            list: Job ids
+
+        Raises:
+            PreflightError: With the invalid rows
+        """
+        batch = read_import_batch(path)
+        check_batch(batch)
+        return self.submit_many(batch.texts(), printer)
+
+    # -- control ------------------------------------------------------------
+
+    def pause(self):
+        """Stop starting new jobs (jobs already printing finish)."""
+        with self._condition:
+            self._paused = True
+
+    def resume(self):
+        """Continue printing after pause()."""
+        with self._condition:
+            self._paused = False
+            self._condition.notify_all()
+
+    @property
+    def paused(self):
+        return self._paused
+
+    def cancel(self, job_id=None, batch_id=None):
+        """
+        Cancel pending jobs. Jobs already printing are not interrupted.
+
+        Args:
+            job_id (str): Cancel this job only
+            batch_id (str): Cancel the pending jobs of this batch
+                            (with neither argument, all pending jobs are canceled)
+
+        Returns:
+            int: Number of jobs canceled
+        """
+        canceled = 0
+        with self._condition:
+            if job_id is not None:
+                jobs = [self._jobs.get(job_id)]
+            else:
+                jobs = [job for job in self._pending
+                        if batch_id is None or job.batch_id == batch_id]
+            for job in jobs:
+                if job is None or job.state != PENDING:
+                    continue
+                # Left in the deque; workers skip canceled jobs
+                self._finish(job, CANCELED)
+                canceled += 1
+            if job_id is None and batch_id is None:
+                self._pending.clear()
+        return canceled
+
+    def start(self):
+        """Start the worker threads (no-op if already running)."""
+        with self._condition:
+            self._stopped = False
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._worker, daemon=True,
+                                          name=f'print-queue-{len(self._threads)}')
+                self._threads.append(thread)
+                thread.start()
+
+    def stop(self, timeout=5.0):
+        """Stop the workers after their current job; pending jobs stay queued."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def wait(self, timeout=None):
+        """
+        Block until no jobs are pending or active.
+
+        Args:
+            timeout (float): Seconds to wait (None = forever)
+
+        Returns:
+            bool: True if the queue drained
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._counts[PENDING] or self._counts[ACTIVE]:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    # -- workers ------------------------------------------------------------
+
+    def _finish(self, job, state, error=''):
+        """Record a finished job (caller holds the lock)."""
+        self._count(job, job.state, state)
+        job.error = error
+        job.finished = time.time()
+        self._jobs.pop(job.job_id, None)
+        self._active.pop(job.job_id, None)
+        self._finished.append(job)
+        if state != CANCELED:
+            self._finish_times.append(time.monotonic())
+        batch = self._batches.get(job.batch_id)
+        if batch is not None:
+            batch[1] += 1
+            if batch[1] >= batch[0]:
+                del self._batches[job.batch_id]
+        self._condition.notify_all()
+
+    def _next_job(self):
+        with self._condition:
+            while True:
+                if self._stopped:
+                    return None
+                if not self._paused:
+                    while self._pending and self._pending[0].state != PENDING:
+                        self._pending.popleft()
+                    if self._pending:
+                        job = self._pending.popleft()
+                        self._count(job, PENDING, ACTIVE)
+                        job.started = time.time()
+                        self._active[job.job_id] = job
+                        return job
+                self._condition.wait()
+
+    def _print(self, job):
+        if self._print_func is not None:
+            return self._print_func(job.text, job.printer)
+        from print_label import print_label_standalone
+        return print_label_standalone(job.text, job.printer, preview=0, use_pdf=True,
+                                      journal=self.journal, batch_id=job.batch_id)
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                ok = self._print(job)
+                error = '' if ok else 'print failed'
+            except Exception as e:
+                ok, error = False, str(e)
+            with self._condition:
+                self._finish(job, DONE if ok else FAILED, error)
+
+    # -- dashboard ------------------------------------------------------------
+
+    def snapshot(self, pending_limit=20, finished_limit=20):
+        """
+        Consistent copy of the queue state for display.
+
+        Only counters and bounded windows of jobs are copied, so the cost
+        does not grow with the queue length.
+
+        Args:
+            pending_limit (int): Pending jobs to include (from the front)
+            finished_limit (int): Most recently finished jobs to include
+
+        Returns:
+            dict: counts, per-printer counts, batch progress, labels per
+                  minute, paused flag and job summaries
+        """
+        now = time.monotonic()
+        with self._condition:
+            while self._finish_times and now - self._finish_times[0] > 60.0:
+                self._finish_times.popleft()
+
+            pending = []
+            for job in self._pending:
+                if len(pending) >= pending_limit:
+                    break
+                if job.state == PENDING:
+                    pending.append(job.summary())
+
+            finished = list(self._finished)[-finished_limit:]
+            return {
+                'counts': dict(self._counts),
+                'printers': {name: dict(counts) for name, counts in self._printers.items()},
+                'batches': {batch_id: {'total': total, 'finished': done}
+                            for batch_id, (total, done) in self._batches.items()},
+                'labels_per_minute': len(self._finish_times),
+                'paused': self._paused,
+                'pending': pending,
+                'active': [job.summary() for job in self._active.values()],
+                'finished': [job.summary() for job in reversed(finished)],
+            }
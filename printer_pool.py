@@ -0,0 +1,253 @@
+"""
+Printer Pools
+A printer pool is a logical destination that maps to several physical
+printers. Each job is routed to the member with the earliest expected
+completion time (queue depth x measured seconds per job), skipping
+unhealthy members and honouring a per-printer rate limit, so no single
+spooler is overrun while its neighbour sits idle.
+
+A member's job is sent with print_to_printer(..., wait=True), so its
+queue depth and job time cover the whole job until the printer reports it
+completed (CUPS), not just the hand-off to the spooler. A job that does
+not finish within job_timeout is canceled by print_to_printer before the
+pool tries the next member, so a late job cannot print a second copy.
+Concurrency comes
+from the callers (queue workers): each one blocks on its job, up to
+max_in_flight per member.
+
+Pools register themselves as printer backends, so a pool name can be
+selected anywhere a printer name is accepted (GUI spinner, CLI, batch).
+
+Pool definitions can be loaded from printer_pools.json:
+    {"Line1": {"printers": ["Zebra-1", "Zebra-2"], "max_jobs_per_second": 2}}
+"""
+
+import os
+import json
+import time
+import threading
+
+
+POOLS_FILE = 'printer_pools.json'
+
+
+class PoolMember:
+    """Live scheduling state of one printer in a pool"""
+
+    def __init__(self, name, max_jobs_per_second=None, initial_job_seconds=0.5):
+        self.name = name
+        self.max_jobs_per_second = max_jobs_per_second
+        self.in_flight = 0
+        self.job_seconds = initial_job_seconds  # EWMA of measured job time
+        self.next_start = 0.0                   # earliest start allowed by the rate limit
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self.jobs = 0
+        self.failed = 0
+
+    def healthy(self, now):
+        return now >= self.unhealthy_until
+
+    def expected_finish(self, now):
+        """Seconds until a new job on this printer would complete."""
+        wait = max(0.0, self.next_start - now)
+        return wait + (self.in_flight + 1) * self.job_seconds
+
+    def stats(self):
+        return {
+            'name': self.name,
+            'in_flight': self.in_flight,
+            'job_seconds': round(self.job_seconds, 4),
+            'jobs': self.jobs,
+            'failed': self.failed,
+            'healthy': self.healthy(time.monotonic()),
+        }
+
+
+class PrinterPool:
+    """Logical printer that load-balances jobs across member printers"""
+
+    def __init__(self, name, printers, max_jobs_per_second=None, max_in_flight=4,
+                 max_failures=3, cooldown=30.0, smoothing=0.2, job_timeout=60.0,
+                 print_func=None):
+        """
+        Initialize printer pool.
+
+        Args:
+            name (str): Pool name (used like a printer name)
+            printers (list): Member printer names
+            max_jobs_per_second (float): Rate limit per member (None = unlimited)
+            max_in_flight (int): Jobs outstanding per member before it counts as full
+            max_failures (int): Consecutive failures before a member is taken out
+            cooldown (float): Seconds an unhealthy member is skipped
+            smoothing (float): Weight of the newest job time in the moving average
+            job_timeout (float): Seconds to wait for a member to finish a job
+                                 before it counts as failed
+            print_func (callable): print_to_printer(printer, file_path) replacement
+                                   (must return when the job has printed)
+        """
+        if not printers:
+            raise ValueError(f"Printer pool {name} has no printers")
+
+        self.name = name
+        self.members = [PoolMember(printer, max_jobs_per_second) for printer in printers]
+        self.max_in_flight = max_in_flight
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+        self.job_timeout = job_timeout
+        self._print_func = print_func
+        self._condition = threading.Condition()
+
+    def _send(self, printer, file_path, timeout):
+        if self._print_func is not None:
+            return self._print_func(printer, file_path)
+        from print_label import print_to_printer
+        # Wait for completion so in_flight and job_seconds measure printing time
+        return print_to_printer(printer, file_path, wait=True, timeout=timeout)
+
+    def _choose(self, exclude):
+        """Pick the member with the earliest expected finish (caller holds the lock)."""
+        now = time.monotonic()
+        candidates = [m for m in self.members
+                      if m.name not in exclude and m.in_flight < self.max_in_flight]
+        healthy = [m for m in candidates if m.healthy(now)]
+        if healthy:
+            candidates = healthy
+        elif any(m.healthy(now) for m in self.members if m.name not in exclude):
+            # Healthy members exist but are full - wait for one of them
+            return None
+        if not candidates:
+            return None
+        return min(candidates, key=lambda m: m.expected_finish(now))
+
+    def _acquire(self, exclude):
+        """Reserve a member for a job, blocking while all members are full."""
+        with self._condition:
+            while True:
+                if all(m.name in exclude for m in self.members):
+                    return None
+                member = self._choose(exclude)
+                if member is not None:
+                    now = time.monotonic()
+                    start = max(now, member.next_start)
+                    if member.max_jobs_per_second:
+                        member.next_start = start + 1.0 / member.max_jobs_per_second
+                    member.in_flight += 1
+                    return member, start - now
+                self._condition.wait(0.1)
+
+    def _release(self, member, elapsed, success):
+        with self._condition:
+            member.in_flight -= 1
+            member.jobs += 1
+            if success:
+                member.consecutive_failures = 0
+                member.job_seconds += self.smoothing * (elapsed - member.job_seconds)
+            else:
+                member.failed += 1
+                member.consecutive_failures += 1
+                if member.consecutive_failures >= self.max_failures:
+                    member.unhealthy_until = time.monotonic() + self.cooldown
+                    print(f"Pool {self.name}: {member.name} marked unhealthy "
+                          f"for {self.cooldown:.0f}s")
+            self._condition.notify_all()
+
+    def print_file(self, file_path, timeout=None):
+        """
+        Print a file on the best available member.
+
+        A failed job is retried once on each other member before the pool
+        reports failure.
+
+        Args:
+            file_path (str): Rendered label file
+            timeout (float): Seconds to wait for each member (at most job_timeout)
+
+        Returns:
+            bool: True if a member printed the job
+        """
+        if timeout is None or timeout > self.job_timeout:
+            timeout = self.job_timeout
+        tried = set()
+        while True:
+            acquired = self._acquire(tried)
+            if acquired is None:
+                return False
+            member, delay = acquired
+            if delay > 0:
+                time.sleep(delay)
+
+            started = time.monotonic()
+            try:
+                success = self._send(member.name, file_path, timeout)
+            except Exception as e:
+                print(f"Pool {self.name}: {member.name} error: {e}")
+                success = False
+            self._release(member, time.monotonic() - started, success)
+
+            if success:
+                return True
+            tried.add(member.name)
+
+    def mark_healthy(self, printer):
+        """Put a member back into rotation (e.g. after paper was reloaded)."""
+        with self._condition:
+            for member in self.members:
+                if member.name == printer:
+                    member.consecutive_failures = 0
+                    member.unhealthy_until = 0.0
+            self._condition.notify_all()
+
+    def stats(self):
+        """
+        Per-member scheduling state.
+
+        Returns:
+            list: One dict per member
+        """
+        with self._condition:
+            return [member.stats() for member in self.members]
+
+
+def register_pool(pool):
+    """Register a pool so its name can be used as a printer."""
+    from print_label import register_printer_backend
+    register_printer_backend(pool.name, pool)
+    return pool
+
+
+def load_printer_pools(path=POOLS_FILE):
+    """
+    Load pool definitions from a JSON file and register them.
+
+    Each entry is either a list of printer names or an object with
+    "printers" plus optional PrinterPool settings.
+
+    Args:
+        path (str): Pool definition file
+
+    Returns:
+        list: Registered PrinterPool objects (empty if the file does not exist)
+    """
+    if not os.path.exists(path):
+        return []
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            definitions = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error loading printer pools from {path}: {e}")
+        return []
+
+    pools = []
+    for name, definition in definitions.items():
+        if isinstance(definition, list):
+            definition = {'printers': definition}
+        options = dict(definition)
+        printers = options.pop('printers', [])
+        try:
+            pools.append(register_pool(PrinterPool(name, printers, **options)))
+        except (TypeError, ValueError) as e:
+            print(f"Invalid printer pool {name}: {e}")
+    return pools
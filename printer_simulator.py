@@ -0,0 +1,180 @@
+"""
+Printer Simulator
+Simulated label printer backend for load testing without real printers or
+CUPS. A simulated printer prints one job at a time with configurable
+latency, random failures, paper-out events and a throughput cap.
+
+Register it with print_label.register_printer_backend() (or use
+add_simulated_printers()) and print to it by name like any other printer.
+"""
+
+import os
+import time
+import random
+import threading
+
+
+IDLE = 'idle'
+PRINTING = 'printing'
+PAPER_OUT = 'paper-out'
+
+
+class SimulatedPrinter:
+    """Simulated label printer with a single print head"""
+
+    def __init__(self, name, latency=0.05, jitter=0.0, failure_rate=0.0,
+                 paper_out_every=0, paper_out_duration=2.0, max_jobs_per_second=None,
+                 seed=None):
+        """
+        Initialize simulated printer.
+
+        Args:
+            name (str): Printer name
+            latency (float): Seconds to print one job
+            jitter (float): Random extra latency, uniform in [0, jitter] seconds
+            failure_rate (float): Probability that a job fails (0.0 - 1.0)
+            paper_out_every (int): Run out of paper after this many jobs (0 = never)
+            paper_out_duration (float): Seconds until paper is "reloaded"
+            max_jobs_per_second (float): Throughput cap (None = limited by latency only)
+            seed (int): Seed for reproducible failures and jitter
+        """
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.paper_out_every = paper_out_every
+        self.paper_out_duration = paper_out_duration
+        self.max_jobs_per_second = max_jobs_per_second
+
+        self._rng = random.Random(seed)
+        self._head = threading.Lock()      # one job on the print head at a time
+        self._stats_lock = threading.Lock()
+        self._next_start = 0.0             # earliest start allowed by the throughput cap
+        self._paper_out_until = 0.0
+        self._since_paper = 0
+        self.state = IDLE
+
+        self.jobs = 0
+        self.failed = 0
+        self.canceled = 0
+        self.paper_out_events = 0
+        self.bytes_received = 0
+        self.queued = 0
+
+    def print_file(self, file_path, timeout=None):
+        """
+        Print a file (blocks for the simulated print time).
+
+        Args:
+            file_path (str): Rendered label file
+            timeout (float): Cancel the job if it has not printed after this
+                             many seconds (None = wait for it)
+
+        Returns:
+            bool: True if the job printed, False on failure, paper-out or timeout
+        """
+        size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+        with self._stats_lock:
+            self.queued += 1
+
+        try:
+            with self._head:
+                now = time.monotonic()
+
+                if now < self._paper_out_until:
+                    self.state = PAPER_OUT
+                    with self._stats_lock:
+                        self.failed += 1
+                    return False
+
+                if self.max_jobs_per_second:
+                    if now < self._next_start:
+                        time.sleep(self._next_start - now)
+                    self._next_start = max(now, self._next_start) + 1.0 / self.max_jobs_per_second
+
+                self.state = PRINTING
+                delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0)
+                if timeout is not None and delay > timeout:
+                    # Canceled by the spooler before the label came out
+                    time.sleep(timeout)
+                    self.state = IDLE
+                    with self._stats_lock:
+                        self.canceled += 1
+                    return False
+                if delay > 0:
+                    time.sleep(delay)
+                failed = self._rng.random() < self.failure_rate
+
+                self._since_paper += 1
+                if self.paper_out_every and self._since_paper >= self.paper_out_every:
+                    self._since_paper = 0
+                    self._paper_out_until = time.monotonic() + self.paper_out_duration
+                    with self._stats_lock:
+                        self.paper_out_events += 1
+                    self.state = PAPER_OUT
+                else:
+                    self.state = IDLE
+
+                with self._stats_lock:
+                    self.jobs += 1
+                    self.bytes_received += size
+                    if failed:
+                        self.failed += 1
+                return not failed
+        finally:
+            with self._stats_lock:
+                self.queued -= 1
+
+    def reload_paper(self):
+        """End a paper-out condition immediately."""
+        self._paper_out_until = 0.0
+        self.state = IDLE
+
+    def stats(self):
+        """
+        Get printer counters.
+
+        Returns:
+            dict: jobs, failed, canceled, paper_out_events, bytes_received, queued, state
+        """
+        with self._stats_lock:
+            return {
+                'name': self.name,
+                'jobs': self.jobs,
+                'failed': self.failed,
+                'canceled': self.canceled,
+                'paper_out_events': self.paper_out_events,
+                'bytes_received': self.bytes_received,
+                'queued': self.queued,
+                'state': self.state,
+            }
+
+
+def add_simulated_printers(count, prefix='SIM', **options):
+    """
+    Create simulated printers and register them as printer backends.
+
+    Args:
+        count (int): Number of printers
+        prefix (str): Name prefix ("SIM-1", "SIM-2", ...)
+        **options: SimulatedPrinter options (latency, failure_rate, ...)
+
+    Returns:
+        list: The registered SimulatedPrinter objects
+    """
+    from print_label import register_printer_backend
+
+    printers = []
+    for index in range(1, count + 1):
+        printer = SimulatedPrinter(f"{prefix}-{index}", **options)
+        register_printer_backend(printer.name, printer)
+        printers.append(printer)
+    return printers
+
+
+def remove_simulated_printers(printers):
+    """Unregister simulated printers created by add_simulated_printers."""
+    from print_label import unregister_printer_backend
+
+    for printer in printers:
+        unregister_printer_backend(printer.name)
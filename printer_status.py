@@ -0,0 +1,420 @@
+"""
+Printer Status Monitor
+Tracks submitted CUPS jobs to completion and caches printer state.
+
+A single background thread serves every caller over its own CUPS
+connection (pycups connections are not thread-safe, so it never shares
+the one print threads use). It uses a CUPS event
+subscription (pull/ippget) where the server supports it and otherwise
+polls with one batched getJobs() + getPrinters() call per interval, no
+matter how many jobs are outstanding. Callers block on their own job's
+result instead of polling the spooler themselves, and listeners (the GUI)
+are notified when a printer's state changes.
+
+Printers registered with print_label.register_printer_backend() report
+the backend's `state` attribute (e.g. simulated printers).
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+
+# CUPS job states (IPP job-state)
+JOB_PENDING = 3
+JOB_HELD = 4
+JOB_PROCESSING = 5
+JOB_STOPPED = 6
+JOB_CANCELED = 7
+JOB_ABORTED = 8
+JOB_COMPLETED = 9
+
+_FINAL_JOB_STATES = {
+    JOB_CANCELED: 'canceled',
+    JOB_ABORTED: 'aborted',
+    JOB_COMPLETED: 'completed',
+}
+
+# CUPS printer states (IPP printer-state)
+_PRINTER_STATES = {3: 'idle', 4: 'processing', 5: 'stopped'}
+
+# Final states of untracked jobs kept for a late track() call
+RECENT_JOBS_SIZE = 1024
+
+# printer-state-reasons that mean a job cannot print right now
+BLOCKING_REASONS = ('media-empty', 'media-needed', 'media-jam', 'offline',
+                    'paused', 'door-open', 'cover-open', 'shutdown')
+
+
+class JobResult:
+    """Completion result of one tracked print job"""
+
+    def __init__(self, printer, job_id):
+        self.printer = printer
+        self.job_id = job_id
+        self.state = 'pending'
+        self.reasons = []
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def ok(self):
+        return self.state == 'completed'
+
+    def _finish(self, state, reasons=None):
+        self.state = state
+        self.reasons = list(reasons or [])
+        self._done.set()
+
+    def wait(self, timeout=None):
+        """
+        Block until the job finishes.
+
+        Args:
+            timeout (float): Seconds to wait (None = forever)
+
+        Returns:
+            bool: True if the job completed successfully
+        """
+        self._done.wait(timeout)
+        return self.ok
+
+    def __repr__(self):
+        return f"JobResult({self.printer!r}, {self.job_id}, {self.state!r})"
+
+
+class PrinterState:
+    """Cached state of one printer"""
+
+    __slots__ = ('name', 'state', 'reasons', 'message', 'updated')
+
+    def __init__(self, name, state='unknown', reasons=(), message=''):
+        self.name = name
+        self.state = state
+        self.reasons = tuple(reasons)
+        self.message = message
+        self.updated = time.monotonic()
+
+    @property
+    def ready(self):
+        """False when the printer is stopped or reports a blocking reason."""
+        if self.state == 'stopped':
+            return False
+        return not any(reason.startswith(BLOCKING_REASONS) for reason in self.reasons)
+
+    def summary(self):
+        """Short human-readable status (e.g. "idle" or "stopped: media-empty")."""
+        reasons = [r for r in self.reasons if r != 'none']
+        return f"{self.state}: {', '.join(reasons)}" if reasons else self.state
+
+    def __eq__(self, other):
+        return (isinstance(other, PrinterState) and self.state == other.state
+                and self.reasons == other.reasons)
+
+    def __repr__(self):
+        return f"PrinterState({self.name!r}, {self.summary()!r})"
+
+
+class PrinterStatusMonitor:
+    """Background job tracker and printer status cache"""
+
+    def __init__(self, connection_factory=None, poll_interval=0.5, idle_interval=5.0):
+        """
+        Initialize status monitor.
+
+        Args:
+            connection_factory (callable): Returns a cups.Connection
+                                           (default: a connection owned by the monitor)
+            poll_interval (float): Seconds between polls while jobs are outstanding
+            idle_interval (float): Seconds between printer-state refreshes when idle
+        """
+        self._connection_factory = connection_factory
+        self.poll_interval = poll_interval
+        self.idle_interval = idle_interval
+
+        self._lock = threading.Lock()
+        self._jobs = {}            # job_id -> JobResult
+        self._recent = OrderedDict()    # untracked job_id -> (state, reasons)
+        self._printers = {}        # name -> PrinterState
+        self._listeners = []
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._subscription_id = None
+        self._sequence = 0
+        self._subscriptions_supported = True
+        self._conn = None
+
+    # -- public API -------------------------------------------------------
+
+    def start(self):
+        """Start the monitor thread (no-op if already running)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='printer-status',
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the monitor thread and cancel the CUPS subscription."""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._cancel_subscription()
+
+    def track(self, printer, job_id):
+        """
+        Start tracking a submitted CUPS job.
+
+        Args:
+            printer (str): Printer name
+            job_id (int): CUPS job id returned by printFile()
+
+        Returns:
+            JobResult: Result object to wait on
+        """
+        result = JobResult(printer, job_id)
+        with self._lock:
+            finished = self._recent.pop(job_id, None)
+            if finished is None:
+                self._jobs[job_id] = result
+        if finished is not None:
+            # The job finished before printFile() returned to the caller
+            result._finish(*finished)
+            return result
+        self.start()
+        self._wakeup.set()
+        return result
+
+    def get_status(self, printer):
+        """
+        Cached state of a printer.
+
+        Args:
+            printer (str): Printer name
+
+        Returns:
+            PrinterState or None: None if the printer has not been seen yet
+        """
+        with self._lock:
+            state = self._printers.get(printer)
+        if state is None:
+            state = self._backend_state(printer)
+        return state
+
+    def snapshot(self):
+        """
+        Copy of all cached printer states.
+
+        Returns:
+            dict: name -> PrinterState
+        """
+        with self._lock:
+            states = dict(self._printers)
+        return states
+
+    def add_listener(self, callback):
+        """
+        Register a callback for printer state changes.
+
+        The callback runs on the monitor thread as callback(name, old, new),
+        where old may be None. GUI code must hand off to its UI thread.
+
+        Args:
+            callback (callable): Change handler
+        """
+        with self._lock:
+            self._listeners.append(callback)
+        self.start()
+
+    def remove_listener(self, callback):
+        """Unregister a printer state callback."""
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def refresh(self):
+        """Ask the monitor thread to refresh as soon as possible."""
+        self._wakeup.set()
+
+    # -- monitor thread -----------------------------------------------------
+
+    def _connection(self):
+        """The monitor's CUPS connection, or None when CUPS is not available."""
+        if self._connection_factory is not None:
+            return self._connection_factory()
+        if self._conn is None:
+            import print_label
+            if not (print_label.SYSTEM == "Linux" and print_label.CUPS_AVAILABLE):
+                return None
+            self._conn = print_label.cups.Connection()
+        return self._conn
+
+    def _backend_state(self, printer):
+        from print_label import _printer_backends
+        backend = _printer_backends.get(printer)
+        if backend is None:
+            return None
+        return PrinterState(printer, getattr(backend, 'state', 'idle'))
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                conn = self._connection()
+                if conn is None:
+                    # Nothing to track without CUPS (backend states are read on demand)
+                    self._fail_outstanding_jobs()
+                elif not self._poll_events(conn):
+                    self._poll_jobs(conn)
+                    self._poll_printers(conn)
+            except Exception as e:
+                print(f"Printer status error: {e}")
+                # Reconnect next round; print threads keep their own connection
+                self._conn = None
+                self._subscription_id = None
+
+            with self._lock:
+                busy = bool(self._jobs)
+            self._wakeup.wait(self.poll_interval if busy else self.idle_interval)
+            self._wakeup.clear()
+
+    def _poll_events(self, conn):
+        """
+        Process events from a CUPS pull subscription.
+
+        Returns:
+            bool: True if the subscription handled this round
+        """
+        if not self._subscriptions_supported:
+            return False
+
+        if self._subscription_id is None:
+            try:
+                self._subscription_id = conn.createSubscription(
+                    '/',
+                    events=['job-completed', 'job-state-changed', 'printer-state-changed'],
+                    lease_duration=3600,
+                )
+                self._sequence = 0
+                # Seed the caches once; events keep them current afterwards
+                self._poll_jobs(conn)
+                self._poll_printers(conn)
+                return True
+            except Exception:
+                self._subscriptions_supported = False
+                return False
+
+        notifications = conn.getNotifications([self._subscription_id],
+                                              sequence_numbers=[self._sequence + 1])
+        printers_changed = False
+        for event in notifications.get('events', []):
+            self._sequence = max(self._sequence, event.get('notify-sequence-number', 0))
+            job_id = event.get('notify-job-id')
+            job_state = event.get('job-state')
+            if job_id is not None and job_state in _FINAL_JOB_STATES:
+                self._finish_job(job_id, _FINAL_JOB_STATES[job_state],
+                                 event.get('job-state-reasons', []))
+            if event.get('notify-subscribed-event') == 'printer-state-changed':
+                printers_changed = True
+        if printers_changed:
+            self._poll_printers(conn)
+        return True
+
+    def _poll_jobs(self, conn):
+        with self._lock:
+            outstanding = list(self._jobs)
+        if not outstanding:
+            return
+
+        # One call returns every job that is still queued or printing
+        active = conn.getJobs(which_jobs='not-completed')
+        for job_id in outstanding:
+            if job_id in active:
+                continue
+            try:
+                attributes = conn.getJobAttributes(
+                    job_id, requested_attributes=['job-state', 'job-state-reasons'])
+                state = attributes.get('job-state', JOB_COMPLETED)
+                reasons = attributes.get('job-state-reasons', [])
+            except Exception:
+                # Job already purged from history - it left the queue normally
+                state, reasons = JOB_COMPLETED, []
+            if isinstance(reasons, str):
+                reasons = [reasons]
+            self._finish_job(job_id, _FINAL_JOB_STATES.get(state, 'completed'), reasons)
+
+    def _poll_printers(self, conn):
+        printers = conn.getPrinters()
+        for name, attributes in printers.items():
+            reasons = attributes.get('printer-state-reasons', [])
+            if isinstance(reasons, str):
+                reasons = [reasons]
+            self._update_printer(PrinterState(
+                name,
+                _PRINTER_STATES.get(attributes.get('printer-state'), 'unknown'),
+                reasons,
+                attributes.get('printer-state-message', ''),
+            ))
+
+    def _fail_outstanding_jobs(self):
+        with self._lock:
+            jobs, self._jobs = self._jobs, {}
+        for result in jobs.values():
+            result._finish('unknown', ['status tracking unavailable'])
+
+    def _finish_job(self, job_id, state, reasons):
+        with self._lock:
+            result = self._jobs.pop(job_id, None)
+            if result is None:
+                # Not tracked (yet): remember it in case track() comes late
+                self._recent[job_id] = (state, reasons)
+                while len(self._recent) > RECENT_JOBS_SIZE:
+                    self._recent.popitem(last=False)
+        if result is not None:
+            result._finish(state, reasons)
+
+    def _update_printer(self, new_state):
+        with self._lock:
+            old_state = self._printers.get(new_state.name)
+            self._printers[new_state.name] = new_state
+            listeners = list(self._listeners) if old_state != new_state else []
+        for callback in listeners:
+            try:
+                callback(new_state.name, old_state, new_state)
+            except Exception as e:
+                print(f"Printer status listener error: {e}")
+
+    def _cancel_subscription(self):
+        if self._subscription_id is None:
+            return
+        try:
+            conn = self._connection()
+            if conn is not None:
+                conn.cancelSubscription(self._subscription_id)
+        except Exception:
+            pass
+        self._subscription_id = None
+
+
+_monitor = None
+_monitor_lock = threading.Lock()
+
+
+def get_status_monitor():
+    """
+    Get the shared printer status monitor.
+
+    Returns:
+        PrinterStatusMonitor: Process-wide monitor (started on first use)
+    """
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = PrinterStatusMonitor()
+        return _monitor
@@ -0,0 +1,336 @@
+"""
+SAP Autocomplete
+Suggests SAP article numbers while the operator types.
+
+The article catalog (200k+ numbers) is compiled once into a prefix index
+file: a sorted table of fixed-size offsets followed by the entries. The
+file is memory-mapped, so opening it costs the same for 1k or 1M articles
+and only the pages touched by a lookup are read. A lookup is a binary
+search for the first entry with the typed prefix (about 18 probes for
+200k articles) followed by a short forward scan.
+
+Values the operator used recently or often (from the print history and
+the current session) are ranked before plain catalog matches.
+
+Index file layout (little-endian):
+    magic  b'SAPIDX1\\0'
+    count  uint32
+    offsets uint32[count + 1]   (start of each entry in the data block)
+    data    entries "VALUE\\tDESCRIPTION" in UTF-8, sorted by VALUE.upper()
+"""
+
+import os
+import csv
+import sys
+import mmap
+import math
+import time
+import heapq
+import struct
+import threading
+from array import array
+
+
+CATALOG_FILE = 'sap_catalog.csv'
+INDEX_FILE = 'sap_catalog.idx'
+
+_MAGIC = b'SAPIDX1\0'
+_HEADER = struct.Struct('<8sI')
+
+# Header cells that mark the first catalog row as column titles
+_HEADER_NAMES = {'sap', 'sap_nr', 'sap-nr', 'sap nr', 'material', 'article', 'articol'}
+
+# Days until a use counts half as much for ranking
+USAGE_HALF_LIFE_DAYS = 7.0
+
+
+def read_catalog(path):
+    """
+    Read article numbers (and optional descriptions) from a catalog file.
+
+    .csv files use the first column as the SAP number and the second as
+    its description; other files hold one SAP number per line.
+
+    Args:
+        path (str): Catalog file
+
+    Returns:
+        list: (sap_nr, description) tuples in file order
+    """
+    entries = []
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if path.lower().endswith('.csv'):
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+            except csv.Error:
+                dialect = csv.excel
+            rows = csv.reader(f, dialect)
+        else:
+            rows = ([line] for line in f)
+        for row in rows:
+            if not row:
+                continue
+            value = row[0].strip()
+            if not entries and value.lower() in _HEADER_NAMES:
+                continue
+            if value:
+                description = row[1].strip() if len(row) > 1 else ''
+                entries.append((value, description))
+    return entries
+
+
+def build_index(entries, index_path=INDEX_FILE):
+    """
+    Write a prefix index file.
+
+    Args:
+        entries (iterable): (sap_nr, description) tuples; for repeated
+                            numbers (case-insensitive) the first one wins
+        index_path (str): Index file to write (replaced atomically)
+
+    Returns:
+        int: Number of articles in the index
+    """
+    unique = {}
+    for value, description in entries:
+        # Tabs and newlines would break the entry format
+        value = ' '.join(value.split())
+        key = value.upper()
+        if key not in unique:
+            unique[key] = f"{value}\t{' '.join(description.split())}"
+
+    offsets = array('I', [0])
+    data = bytearray()
+    for key in sorted(unique):
+        data += unique[key].encode('utf-8')
+        offsets.append(len(data))
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+
+    temp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, len(unique)))
+        f.write(offsets.tobytes())
+        f.write(data)
+    os.replace(temp_path, index_path)
+    return len(unique)
+
+
+class CatalogIndex:
+    """Memory-mapped prefix index of SAP article numbers"""
+
+    def __init__(self, index_path=INDEX_FILE):
+        """
+        Open an index written by build_index().
+
+        Args:
+            index_path (str): Index file
+
+        Raises:
+            ValueError: If the file is not a SAP catalog index
+        """
+        self.path = index_path
+        with open(index_path, 'rb') as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size or header[:8] != _MAGIC:
+                raise ValueError(f"{index_path} is not a SAP catalog index")
+            _, self.count = _HEADER.unpack(header)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        table_end = _HEADER.size + 4 * (self.count + 1)
+        self._table = memoryview(self._map)[_HEADER.size:table_end]
+        if sys.byteorder == 'little':
+            self._offsets = self._table.cast('I')
+        else:
+            self._offsets = array('I', self._table.tobytes())
+            self._offsets.byteswap()
+        self._data_start = table_end
+
+    def __len__(self):
+        return self.count
+
+    def _entry(self, position):
+        """Raw entry bytes at a sorted position."""
+        start = self._data_start + self._offsets[position]
+        end = self._data_start + self._offsets[position + 1]
+        return self._map[start:end]
+
+    def _value(self, position):
+        entry = self._entry(position)
+        tab = entry.find(b'\t')
+        return entry[:tab].decode('utf-8')
+
+    def entry(self, position):
+        """
+        Article at a sorted position.
+
+        Returns:
+            tuple: (sap_nr, description)
+        """
+        value, _, description = self._entry(position).decode('utf-8').partition('\t')
+        return value, description
+
+    def _lower_bound(self, key):
+        """First position whose upper-cased value is >= key."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._value(middle).upper() < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def search(self, prefix, limit=8):
+        """
+        Articles starting with a prefix (case-insensitive), in catalog order.
+
+        Args:
+            prefix (str): Typed text
+            limit (int): Maximum results
+
+        Returns:
+            list: (sap_nr, description) tuples
+        """
+        key = prefix.strip().upper()
+        results = []
+        position = self._lower_bound(key)
+        while position < self.count and len(results) < limit:
+            value, description = self.entry(position)
+            if not value.upper().startswith(key):
+                break
+            results.append((value, description))
+            position += 1
+        return results
+
+    def __contains__(self, value):
+        key = value.strip().upper()
+        position = self._lower_bound(key)
+        return position < self.count and self._value(position).upper() == key
+
+    def close(self):
+        """Unmap the index file."""
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._table.release()
+        self._map.close()
+
+
+def load_catalog_index(catalog_path=CATALOG_FILE, index_path=INDEX_FILE):
+    """
+    Open the catalog index, rebuilding it first if the catalog is newer.
+
+    Args:
+        catalog_path (str): Catalog file (.csv or one number per line)
+        index_path (str): Index file
+
+    Returns:
+        CatalogIndex or None: None if neither file exists
+    """
+    catalog_time = os.path.getmtime(catalog_path) if os.path.exists(catalog_path) else None
+    index_time = os.path.getmtime(index_path) if os.path.exists(index_path) else None
+    if catalog_time is None and index_time is None:
+        return None
+    if catalog_time is not None and (index_time is None or catalog_time > index_time):
+        count = build_index(read_catalog(catalog_path), index_path)
+        print(f"SAP catalog index built: {count} articles")
+    try:
+        return CatalogIndex(index_path)
+    except (OSError, ValueError) as e:
+        print(f"Error opening SAP catalog index: {e}")
+        return None
+
+
+class SapAutocomplete:
+    """Ranked SAP suggestions: used values first, then catalog matches"""
+
+    def __init__(self, index=None, half_life_days=USAGE_HALF_LIFE_DAYS):
+        """
+        Initialize autocomplete.
+
+        Args:
+            index (CatalogIndex): Catalog index (None = suggest used values only)
+            half_life_days (float): Age at which a use counts half for ranking
+        """
+        self.index = index
+        self.half_life = half_life_days * 86400.0
+        self._lock = threading.Lock()
+        self._usage = {}        # upper-cased value -> [value, count, last used]
+
+    def load_usage(self, usage):
+        """
+        Seed usage counts, e.g. from PrintHistory.value_usage().
+
+        Args:
+            usage (iterable): (value, count, last used as epoch seconds) tuples
+        """
+        with self._lock:
+            for value, count, last_used in usage:
+                self._add_use(value, count, last_used)
+
+    def record_use(self, value):
+        """Count one use of a value (e.g. a printed label)."""
+        with self._lock:
+            self._add_use(value, 1, time.time())
+
+    def _add_use(self, value, count, last_used):
+        value = value.strip()
+        if not value:
+            return
+        usage = self._usage.get(value.upper())
+        if usage is None:
+            self._usage[value.upper()] = [value, count, last_used]
+        else:
+            usage[1] += count
+            usage[2] = max(usage[2], last_used)
+
+    def _score(self, count, last_used, now):
+        """Use count decayed by the age of the last use."""
+        age = max(0.0, now - last_used)
+        return count * math.exp(-age * math.log(2) / self.half_life)
+
+    def suggest(self, prefix, limit=8):
+        """
+        Suggestions for the typed text.
+
+        Args:
+            prefix (str): Typed text (empty = most used values)
+            limit (int): Maximum suggestions
+
+        Returns:
+            list: (sap_nr, description) tuples, best first
+        """
+        key = prefix.strip().upper()
+        now = time.time()
+        with self._lock:
+            used = [(self._score(count, last_used, now), value)
+                    for upper, (value, count, last_used) in self._usage.items()
+                    if upper.startswith(key)]
+
+        suggestions = []
+        seen = set()
+        for _, value in heapq.nlargest(limit, used, key=lambda item: item[0]):
+            suggestions.append((value, ''))
+            seen.add(value.upper())
+
+        if self.index is not None:
+            if suggestions:
+                # Fill in descriptions of used values that are in the catalog
+                for position, (value, _) in enumerate(suggestions):
+                    match = self.index.search(value, 1)
+                    if match and match[0][0].upper() == value.upper():
+                        suggestions[position] = match[0]
+            if key and len(suggestions) < limit:
+                for value, description in self.index.search(key, limit + len(seen)):
+                    if value.upper() not in seen:
+                        suggestions.append((value, description))
+                        if len(suggestions) >= limit:
+                            break
+        return suggestions
+
+    def close(self):
+        """Unmap the catalog index."""
+        if self.index is not None:
+            self.index.close()
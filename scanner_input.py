@@ -0,0 +1,167 @@
+"""
+Scanner Input
+Keyboard-wedge barcode scanner support for the label form.
+
+A wedge scanner "types" a barcode as a burst of key presses a few
+milliseconds apart, usually followed by Enter or Tab. ScanDetector tells
+these bursts apart from an operator typing (gaps of 100 ms and more), and
+ScanRecordBuilder routes each scan to the next empty label field, so a
+label is complete after one scan of a combined "SAP|CANTITATE|LOT" code or
+one scan per field.
+
+Both classes are plain Python (no Kivy) and cost microseconds per key, so
+they can run directly in the GUI key handler.
+"""
+
+import time
+
+from label_record import LabelRecord, FIELDS
+
+
+# Keys a scanner sends after a code
+TERMINATORS = '\r\n\t'
+
+
+class ScanDetector:
+    """Groups key presses into scanner bursts"""
+
+    def __init__(self, max_gap=0.04, min_length=3, terminators=TERMINATORS,
+                 clock=time.monotonic):
+        """
+        Initialize detector.
+
+        Args:
+            max_gap (float): Longest pause between two keys of one scan (seconds)
+            min_length (int): Shortest burst accepted as a scan without a
+                              terminator (terminated bursts may be shorter,
+                              e.g. a quantity)
+            terminators (str): Characters that end a scan
+            clock (callable): Time source (seconds)
+        """
+        self.max_gap = max_gap
+        self.min_length = min_length
+        self.terminators = terminators
+        self._clock = clock
+        self._buffer = []
+        self._last_key = None
+
+    @property
+    def pending(self):
+        """True while characters of a possible scan are buffered."""
+        return bool(self._buffer)
+
+    def feed(self, char, now=None):
+        """
+        Process one key press.
+
+        Args:
+            char (str): Typed character (terminators end the scan)
+            now (float): Time of the key press (default: clock())
+
+        Returns:
+            str or None: A completed scan, or None
+        """
+        now = self._clock() if now is None else now
+        scan = None
+        if self._last_key is not None and now - self._last_key > self.max_gap:
+            # A pause ends the burst: scanners without a terminator end here
+            scan = self._take()
+        self._last_key = now
+
+        if char in self.terminators:
+            # A terminator straight after fast keys marks even a short code as scanned
+            completed = self._take(1)
+            self._last_key = None
+            return completed or scan
+        self._buffer.append(char)
+        return scan
+
+    def flush(self, now=None):
+        """
+        Finish a burst after the keys stopped (call max_gap after the last key).
+
+        Args:
+            now (float): Current time (default: clock())
+
+        Returns:
+            str or None: The buffered scan if the burst is over, else None
+        """
+        now = self._clock() if now is None else now
+        if self._last_key is None or now - self._last_key <= self.max_gap:
+            return None
+        self._last_key = None
+        return self._take()
+
+    def _take(self, min_length=None):
+        """Return the buffered burst if it is long enough to be a scan, and clear it."""
+        text = ''.join(self._buffer)
+        self._buffer.clear()
+        return text if len(text) >= (min_length or self.min_length) else None
+
+    def reset(self):
+        """Drop buffered characters."""
+        self._buffer.clear()
+        self._last_key = None
+
+
+class ScanRecordBuilder:
+    """Collects scans into label records, one field per scan"""
+
+    def __init__(self, separator='|'):
+        """
+        Args:
+            separator (str): Field separator of combined scans
+        """
+        self.separator = separator
+        self.values = dict.fromkeys(FIELDS, '')
+
+    @property
+    def next_field(self):
+        """First empty field ('sap_nr', 'cantitate' or 'lot_number'), or None."""
+        for field in FIELDS:
+            if not self.values[field]:
+                return field
+        return None
+
+    def set(self, field, value):
+        """Set a field directly (e.g. from a manual edit)."""
+        self.values[field] = value.strip()
+
+    def add(self, scan):
+        """
+        Route one scan.
+
+        A scan containing the separator is a combined label and sets each
+        field it carries; any other scan fills the next empty field.
+
+        Args:
+            scan (str): Scanned code
+
+        Returns:
+            LabelRecord or None: The label once all fields are filled
+        """
+        scan = scan.strip()
+        if not scan:
+            return None
+        if self.separator in scan:
+            record = LabelRecord.parse(scan.replace(self.separator, '|'))
+            for field, value in zip(FIELDS, record):
+                if value:
+                    self.values[field] = value
+        else:
+            field = self.next_field
+            if field is None:
+                # Every field is filled already: start the next label
+                self.reset()
+                field = FIELDS[0]
+            self.values[field] = scan
+
+        if self.next_field is None:
+            record = LabelRecord(*(self.values[name] for name in FIELDS))
+            self.reset()
+            return record
+        return None
+
+    def reset(self):
+        """Clear all fields."""
+        self.values = dict.fromkeys(FIELDS, '')
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Label Printer - Soak Test
+Renders a very large number of labels in one process while tracking
+resident memory (RSS) and tracemalloc snapshots, and fails when memory
+grows past a threshold after warm-up. Catches leaks such as unclosed PIL
+images or unbounded caches before they hit a shift-long GUI session.
+
+Example:
+    python soak_test.py --labels 2000000 --mode both --threshold-mb 20
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+import contextlib
+
+from print_label import create_label_image
+from print_label_pdf import PDFLabelGenerator
+
+
+def current_rss_bytes():
+    """
+    Resident set size of this process in bytes.
+
+    Uses /proc on Linux and falls back to the peak RSS from getrusage
+    elsewhere (0 if neither is available).
+
+    Returns:
+        int: RSS in bytes
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes on Linux
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        return 0
+
+
+def soak_records(count, distinct_values=100000):
+    """
+    Generate label records for the soak run.
+
+    Values cycle through distinct_values so caches fill up and evict the
+    way they do over a real shift.
+
+    Args:
+        count (int): Number of records
+        distinct_values (int): Number of distinct lot values
+
+    Yields:
+        tuple: (sap_nr, cantitate, lot_number)
+    """
+    for number in range(count):
+        key = number % distinct_values
+        yield (f"SAP{key % 997:06d}", str(number % 5000 + 1), f"LOT-{key:08d}")
+
+
+def run_soak(labels=1000000, mode='pdf', warmup=2000, interval=10000, threshold_mb=25.0,
+             trace_window=200, top=10):
+    """
+    Render labels in a loop and check memory growth.
+
+    tracemalloc slows rendering several times over, so it only runs for a
+    window of trace_window labels at every sample point. Allocations still
+    alive at the end of a window were retained by those labels; the window
+    with the most retained memory is reported by allocation site.
+
+    Args:
+        labels (int): Labels to render after warm-up
+        mode (str): 'pdf', 'image' or 'both'
+        warmup (int): Labels rendered before the baseline is taken
+        interval (int): Labels between memory samples
+        threshold_mb (float): Maximum allowed RSS growth after warm-up
+        trace_window (int): Labels traced by tracemalloc per sample (0 = off)
+        top (int): Allocation sites to report
+
+    Returns:
+        dict: Baseline, peak and final memory, rate and pass/fail
+    """
+    generator = PDFLabelGenerator()
+
+    def render(record):
+        with contextlib.redirect_stdout(None):
+            if mode in ('pdf', 'both'):
+                generator.create_label_pdf(*record)
+            if mode in ('image', 'both'):
+                with create_label_image('|'.join(record)):
+                    pass
+
+    for record in soak_records(warmup):
+        render(record)
+
+    baseline_rss = current_rss_bytes()
+    peak_rss = baseline_rss
+    worst_window = None  # (retained bytes, stats)
+
+    started = time.perf_counter()
+    print(f"Soak: {labels} labels, mode={mode}, baseline RSS {baseline_rss / 1e6:.1f} MB")
+    tracing_until = 0
+    for number, record in enumerate(soak_records(labels), 1):
+        if trace_window and number % interval == 1 % interval:
+            tracemalloc.start()
+            window_start = tracemalloc.take_snapshot()
+            tracing_until = number + trace_window - 1
+
+        render(record)
+
+        if tracing_until and number >= tracing_until:
+            stats = tracemalloc.take_snapshot().compare_to(window_start, 'lineno')
+            tracemalloc.stop()
+            tracing_until = 0
+            retained = sum(stat.size_diff for stat in stats)
+            if worst_window is None or retained > worst_window[0]:
+                worst_window = (retained, stats)
+
+        if number % interval == 0:
+            rss = current_rss_bytes()
+            peak_rss = max(peak_rss, rss)
+            rate = number / (time.perf_counter() - started)
+            print(f"  {number:>10} labels  RSS {rss / 1e6:.1f} MB  {rate:.0f} labels/s")
+
+    if tracing_until:
+        tracemalloc.stop()
+
+    elapsed = time.perf_counter() - started
+    final_rss = current_rss_bytes()
+    peak_rss = max(peak_rss, final_rss)
+    growth_mb = (final_rss - baseline_rss) / 1e6
+
+    if worst_window is not None:
+        retained, stats = worst_window
+        print(f"Largest traced window retained {retained / 1024:.1f} KiB "
+              f"over {trace_window} labels; top allocation sites:")
+        for stat in [stat for stat in stats if stat.size_diff > 0][:top]:
+            print(f"  {stat}")
+
+    result = {
+        'labels': labels,
+        'elapsed_s': round(elapsed, 2),
+        'labels_per_second': round(labels / elapsed, 1) if elapsed else 0.0,
+        'baseline_rss_mb': round(baseline_rss / 1e6, 1),
+        'peak_rss_mb': round(peak_rss / 1e6, 1),
+        'final_rss_mb': round(final_rss / 1e6, 1),
+        'growth_mb': round(growth_mb, 1),
+        'passed': growth_mb <= threshold_mb,
+    }
+    print(f"RSS baseline {result['baseline_rss_mb']} MB, peak {result['peak_rss_mb']} MB, "
+          f"final {result['final_rss_mb']} MB (growth {result['growth_mb']} MB, "
+          f"limit {threshold_mb} MB)")
+    print("PASSED" if result['passed'] else "FAILED: memory growth above threshold")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Memory soak test for label rendering')
+    parser.add_argument('--labels', type=int, default=1000000, help='Labels to render')
+    parser.add_argument('--mode', choices=('pdf', 'image', 'both'), default='pdf',
+                        help='Render path to exercise')
+    parser.add_argument('--warmup', type=int, default=2000, help='Warm-up labels')
+    parser.add_argument('--interval', type=int, default=10000, help='Labels between samples')
+    parser.add_argument('--threshold-mb', type=float, default=25.0,
+                        help='Maximum RSS growth after warm-up')
+    parser.add_argument('--trace-window', type=int, default=200,
+                        help='Labels traced by tracemalloc per sample (0 = off)')
+    parser.add_argument('--top', type=int, default=10, help='Allocation sites to report')
+    args = parser.parse_args(argv)
+
+    result = run_soak(args.labels, args.mode, args.warmup, args.interval, args.threshold_mb,
+                      args.trace_window, args.top)
+    return 0 if result['passed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,20 @@
+"""
+Shared test setup.
+The application modules live at the repository root, not in a package.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in a temporary directory (labels are written to pdf_backup/ there)."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,33 @@
+"""Tests for barcode verification of rendered labels."""
+
+import zlib
+
+from print_label_pdf import PDFLabelGenerator
+from barcode_verify import verify_label_records
+
+
+def test_valid_records_pass():
+    generator = PDFLabelGenerator()
+    records = [('SAP123', '100', 'LOT-1'), ('SAP123', '200', 'LOT-2')]
+    assert verify_label_records(records, generator) == []
+
+
+def test_decodes_the_image_the_document_embeds():
+    generator = PDFLabelGenerator()
+    barcode = generator.get_barcode('SAP123')
+    # Corrupt the cached 1-bit stream: a fresh rendering would still decode
+    blank = zlib.decompress(barcode.data).translate(bytes([255]) * 256)
+    barcode.data = zlib.compress(blank, 9)
+
+    failures = verify_label_records([('SAP123', '', '')], generator)
+    assert len(failures) == 1
+    assert failures[0].expected == 'SAP123'
+    assert failures[0].field == 'SAP-Nr'
+    assert not failures[0].ok
+
+
+def test_sampling_skips_records():
+    generator = PDFLabelGenerator()
+    barcode = generator.get_barcode('BAD')
+    barcode.data = zlib.compress(bytes(len(zlib.decompress(barcode.data))), 9)
+    assert verify_label_records([('BAD', '', '')] * 20, generator, sample_rate=0.0) == []
@@ -0,0 +1,90 @@
+"""Tests for bounded-memory batch rendering and the soak test."""
+
+import os
+import tracemalloc
+
+import pytest
+
+from print_label_pdf import PDFLabelGenerator
+from soak_test import run_soak
+
+
+def records(count):
+    for number in range(count):
+        yield ('SAP1', '5', f"L-{number % 20:04d}")
+
+
+def peak_memory(func):
+    """Peak traced allocation (bytes) while func runs."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_iter_batch_pdfs_splits_into_documents():
+    generator = PDFLabelGenerator()
+    documents = list(generator.iter_batch_pdfs(records(12), pages_per_document=5))
+    assert [(number, len(chunk)) for number, chunk, _ in documents] == [(0, 5), (1, 5), (2, 2)]
+    assert all(pdf.startswith(b'%PDF') for _, _, pdf in documents)
+    assert generator.output_stats()['labels'] == 12
+    with pytest.raises(ValueError):
+        next(generator.iter_batch_pdfs(records(1), pages_per_document=0))
+
+
+def test_iter_batch_pdfs_skips_documents_without_rendering():
+    generator = PDFLabelGenerator()
+    documents = list(generator.iter_batch_pdfs(records(10), 4, skip=lambda number: number == 1))
+    assert [pdf is None for _, _, pdf in documents] == [False, True, False]
+    assert generator.output_stats()['labels'] == 6
+
+
+def test_write_batch_pdfs_numbers_files(tmp_path):
+    generator = PDFLabelGenerator()
+    paths = generator.write_batch_pdfs(records(7), str(tmp_path / 'run.pdf'), 3)
+    assert [os.path.basename(path) for path in paths] == ['run.pdf', 'run_0002.pdf',
+                                                          'run_0003.pdf']
+    assert all(os.path.getsize(path) > 0 for path in paths)
+
+
+def test_memory_stays_flat_as_batch_grows():
+    generator = PDFLabelGenerator()
+
+    def stream(count):
+        for _ in generator.iter_batch_pdfs(records(count), pages_per_document=25):
+            pass
+
+    stream(50)      # warm barcode and row caches
+    small = peak_memory(lambda: stream(100))
+    large = peak_memory(lambda: stream(400))
+    whole = peak_memory(lambda: generator.create_batch_pdf(records(400)))
+    # Only one document of pages is held at a time
+    assert large < small * 1.5
+    assert large * 2 < whole
+
+
+def test_soak_run_reports_memory(capsys):
+    result = run_soak(labels=60, mode='both', warmup=10, interval=30, threshold_mb=200,
+                      trace_window=5)
+    assert result['labels'] == 60
+    assert result['passed']
+    assert result['baseline_rss_mb'] > 0
+    assert 'PASSED' in capsys.readouterr().out
+
+
+def test_soak_fails_above_threshold():
+    result = run_soak(labels=20, mode='pdf', warmup=5, interval=10, threshold_mb=-1,
+                      trace_window=0)
+    assert not result['passed']
+
+
+def test_cli_batch_renders_bounded_documents(workdir, capsys):
+    from label_cli import main
+
+    (workdir / 'labels.txt').write_text(''.join(f"SAP1|5|L-{n}\n" for n in range(7)))
+    assert main(['batch', 'labels.txt', '--pages-per-document', '3', '-o', 'out.pdf']) == 0
+    paths = capsys.readouterr().out.split()
+    assert [os.path.basename(path) for path in paths] == ['out.pdf', 'out_0002.pdf',
+                                                          'out_0003.pdf']
@@ -0,0 +1,66 @@
+"""Tests for the built-in Code128 encoder."""
+
+import pytest
+
+from code128 import (
+    encode_symbols, encode_widths, total_modules, widths_to_image, START, STOP, CODE_B, CODE_C,
+)
+from barcode_verify import decode_symbols, scan_runs, decode_runs
+
+
+VALUES = [
+    'SAP123456',
+    '0001234567890',
+    'REEL-001/A',
+    'ab12cd3456ef',
+    'A',
+    '7',
+    'X\x01Y\x1dZ',      # control characters (code set A)
+    '~`{|}',
+    '1234567890123456789012345',
+]
+
+
+@pytest.mark.parametrize('value', VALUES)
+def test_symbols_round_trip(value):
+    assert decode_symbols(encode_symbols(value)) == value
+
+
+@pytest.mark.parametrize('value', VALUES)
+@pytest.mark.parametrize('module_px', [1, 3])
+def test_raster_round_trip(value, module_px):
+    img = widths_to_image(encode_widths(value), module_px, 10, mode='1')
+    assert decode_runs(scan_runs(img)) == value
+
+
+def test_symbol_layout_and_checksum():
+    symbols = encode_symbols('AB')
+    assert symbols[0] == START[CODE_B]
+    assert symbols[-1] == STOP
+    checksum = symbols[0] + sum(weight * symbol for weight, symbol in enumerate(symbols[1:-2], 1))
+    assert symbols[-2] == checksum % 103
+
+
+def test_digit_runs_use_code_set_c():
+    # start, 4 digit pairs, checksum, stop
+    symbols = encode_symbols('12345678')
+    assert symbols[0] == START[CODE_C]
+    assert len(symbols) == 7
+
+
+def test_mixed_value_is_shortest_encoding():
+    # start B, 'A', 'B', switch to C, 3 digit pairs, checksum, stop
+    assert len(encode_symbols('AB123456')) == 9
+    # Too few digits to pay for a switch: stays in code set B
+    assert len(encode_symbols('AB12')) == 7
+
+
+def test_module_count_matches_widths():
+    widths = encode_widths('SAP1')
+    assert total_modules(widths) == 11 * (len(encode_symbols('SAP1')) - 1) + 13
+
+
+@pytest.mark.parametrize('value', ['', 'Ä1'])
+def test_rejects_unencodable_values(value):
+    with pytest.raises(ValueError):
+        encode_symbols(value)
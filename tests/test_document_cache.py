@@ -0,0 +1,81 @@
+"""Tests for the two-tier document cache and template keys."""
+
+import os
+
+import print_label_pdf
+from document_cache import DocumentCache, document_key
+from print_label_pdf import PDFLabelGenerator
+
+
+def test_evicted_from_memory_is_served_from_disk(tmp_path):
+    cache = DocumentCache(max_entries=1, disk_dir=str(tmp_path))
+    cache.put('a', b'first')
+    cache.put('b', b'second')
+    assert cache.stats()['memory_entries'] == 1
+
+    assert cache.get('a') == b'first'
+    assert (cache.hits, cache.disk_hits, cache.misses) == (0, 1, 0)
+    # Promoted back into memory
+    assert cache.get('a') == b'first'
+    assert cache.hits == 1
+
+
+def test_disk_index_survives_restart(tmp_path):
+    DocumentCache(disk_dir=str(tmp_path)).put('a', b'first')
+    cache = DocumentCache(disk_dir=str(tmp_path))
+    assert cache.get('a') == b'first'
+    assert cache.disk_hits == 1
+
+
+def test_disk_tier_evicts_least_recently_used_by_size(tmp_path):
+    cache = DocumentCache(max_entries=1, disk_dir=str(tmp_path), disk_max_bytes=25)
+    for key in 'abc':
+        cache.put(key, key.encode() * 10)
+    stats = cache.stats()
+    assert (stats['disk_entries'], stats['disk_bytes']) == (2, 20)
+    assert not os.path.exists(cache.path('a'))
+    assert cache.get('a') is None
+
+    cache.get('b')                      # b is now more recent than c
+    cache.put('d', b'd' * 10)
+    assert os.path.exists(cache.path('b'))
+    assert not os.path.exists(cache.path('c'))
+
+
+def test_memory_tier_is_bounded_by_bytes():
+    cache = DocumentCache(max_bytes=25)
+    for key in 'abc':
+        cache.put(key, b'x' * 10)
+    assert cache.stats()['memory_bytes'] == 20
+    assert cache.get('a') is None
+    cache.put('big', b'x' * 30)
+    assert cache.get('big') is None
+
+
+def test_discard_removes_both_tiers(tmp_path):
+    cache = DocumentCache(disk_dir=str(tmp_path))
+    cache.put('a', b'first')
+    cache.discard('a')
+    assert cache.get('a') is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_template_key_follows_version_and_layout(monkeypatch):
+    generator = PDFLabelGenerator()
+    key = generator.template_key()
+    document = generator.document_key('SAP1', '5', 'L')
+    assert PDFLabelGenerator().template_key() == key
+
+    monkeypatch.setattr(print_label_pdf, 'TEMPLATE_VERSION', print_label_pdf.TEMPLATE_VERSION + 1)
+    assert generator.template_key() != key
+    assert generator.document_key('SAP1', '5', 'L') != document
+    monkeypatch.undo()
+
+    for changed in (PDFLabelGenerator(label_width=10), PDFLabelGenerator(dpi=203)):
+        assert changed.template_key() != key
+    generator.barcode_height_mm = 12
+    assert generator.template_key() != key
+
+
+def test_document_key_separates_fields():
+    assert document_key('t', 'AB', 'C') != document_key('t', 'A', 'BC')
@@ -0,0 +1,132 @@
+"""Tests for the hot folder watcher: claiming, recovery and resumed batches."""
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+from hot_folder import (
+    HotFolderWatcher, is_job_file, _process_start, PROCESSING_DIR, DONE_DIR, ERROR_DIR,
+)
+from print_journal import PrintJournal, CONFIRMED
+
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def test_is_job_file():
+    assert is_job_file('jobs.csv')
+    assert is_job_file('JOBS.TXT')
+    assert not is_job_file('.jobs.csv')
+    assert not is_job_file('jobs.csv.part')
+    assert not is_job_file('notes.pdf')
+
+
+def test_claim_moves_file_and_loses_race(tmp_path):
+    watcher = HotFolderWatcher(str(tmp_path))
+    (tmp_path / 'a.txt').write_text('A|1|B\n')
+
+    claimed = watcher.claim(str(tmp_path), 'a.txt')
+    owner = f"{os.getpid()}.{_process_start(os.getpid())}"
+    assert claimed == os.path.join(str(tmp_path), PROCESSING_DIR, f"{owner}-a.txt")
+    assert os.path.exists(claimed)
+    # Another watcher got there first
+    assert watcher.claim(str(tmp_path), 'a.txt') is None
+
+
+def test_recover_returns_files_of_dead_watchers(tmp_path):
+    watcher = HotFolderWatcher(str(tmp_path))
+    processing = tmp_path / PROCESSING_DIR
+    (processing / f"{_dead_pid()}-dead.txt").write_text('A|1|B\n')
+    (processing / f"{os.getpid()}-mine.txt").write_text('A|1|B\n')
+
+    assert watcher.recover() == 1
+    assert (tmp_path / 'dead.txt').exists()
+    assert (processing / f"{os.getpid()}-mine.txt").exists()
+
+
+@pytest.mark.skipif(not _process_start(os.getpid()), reason='process start time unavailable')
+def test_recover_returns_files_of_reused_pids(tmp_path):
+    watcher = HotFolderWatcher(str(tmp_path))
+    processing = tmp_path / PROCESSING_DIR
+    started = _process_start(os.getpid())
+    # Same pid, but claimed by an earlier process (e.g. before a reboot)
+    (processing / f"{os.getpid()}.{int(started) - 1}-old.txt").write_text('A|1|B\n')
+    (processing / f"{os.getpid()}.{started}-mine.txt").write_text('A|1|B\n')
+    # Claimed by a version without start times
+    (processing / f"{os.getpid()}-legacy.txt").write_text('A|1|B\n')
+
+    assert watcher.recover() == 1
+    assert (tmp_path / 'old.txt').exists()
+    assert sorted(os.listdir(processing)) == [f"{os.getpid()}-legacy.txt",
+                                              f"{os.getpid()}.{started}-mine.txt"]
+
+
+def test_claimed_file_is_kept_by_its_live_owner(tmp_path):
+    watcher = HotFolderWatcher(str(tmp_path))
+    (tmp_path / 'a.txt').write_text('A|1|B\n')
+    watcher.claim(str(tmp_path), 'a.txt')
+    assert watcher.recover() == 0
+
+
+def test_process_file_done_and_error(tmp_path):
+    printed = []
+
+    def print_func(text, printer, batch_id=''):
+        printed.append(text)
+        return not text.startswith('BAD')
+
+    watcher = HotFolderWatcher(str(tmp_path), print_func=print_func)
+    (tmp_path / 'good.txt').write_text('A|1|B\nC|2|D\n')
+    (tmp_path / 'bad.txt').write_text('A|1|B\nBAD|2|D\n')
+
+    assert watcher.process_file(str(tmp_path), 'good.txt') is True
+    assert watcher.process_file(str(tmp_path), 'bad.txt') is False
+    assert (tmp_path / DONE_DIR / 'good.txt').exists()
+    assert (tmp_path / ERROR_DIR / 'bad.txt').exists()
+    report = (tmp_path / ERROR_DIR / 'bad.txt.error.txt').read_text()
+    assert 'record 2 (BAD|2|D)' in report
+    assert watcher.stats()['labels_printed'] == 3
+
+
+def test_preflight_rejects_file_before_printing(tmp_path):
+    printed = []
+    watcher = HotFolderWatcher(str(tmp_path),
+                               print_func=lambda text, printer, batch_id='': printed.append(text))
+    (tmp_path / 'bad.txt').write_text('A|1|B\nÄ|2|D\n')
+
+    assert watcher.process_file(str(tmp_path), 'bad.txt') is False
+    assert printed == []
+
+
+def test_recovered_file_resumes_after_confirmed_labels(workdir):
+    folder = workdir / 'in'
+    journal = PrintJournal(str(workdir / 'journal.log'))
+    watcher = HotFolderWatcher(str(folder), printer='PDF', verify=False, journal=journal)
+
+    # A watcher that died after confirming the first label
+    claimed = folder / PROCESSING_DIR / f"{_dead_pid()}-jobs.txt"
+    claimed.write_text('A|1|B\nC|2|D\nE|3|F\n')
+    batch_id = HotFolderWatcher.batch_id(str(claimed), 'jobs.txt')
+    journal.submitted(f"{batch_id}:0", 'A|1|B', batch_id)
+    journal.confirmed(f"{batch_id}:0")
+
+    assert watcher.recover() == 1
+    assert watcher.process_file(str(folder), 'jobs.txt') is True
+    assert watcher.labels_printed == 3
+    assert [journal.state(f"{batch_id}:{index}") for index in range(3)] == [CONFIRMED] * 3
+    # Only the two unconfirmed labels went through the pipeline again
+    assert len(os.listdir(workdir / 'pdf_backup')) == 2
+    journal.close()
+
+
+def test_own_journal_is_created_for_printers(tmp_path):
+    watcher = HotFolderWatcher(str(tmp_path), printer='PDF')
+    assert watcher.journal is not None
+    assert watcher.journal.path == os.path.join(str(tmp_path), '.hot_folder_journal.log')
+    watcher.journal.close()
+    assert HotFolderWatcher(str(tmp_path)).journal is None
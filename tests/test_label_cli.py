@@ -0,0 +1,85 @@
+"""Tests for the label_cli pipe mode."""
+
+import io
+import json
+import os
+import sys
+import uuid
+
+import pytest
+
+import label_cli
+
+
+def run(lines, printer=None):
+    output = io.StringIO()
+    failed = label_cli.run_pipe(io.StringIO(''.join(line + '\n' for line in lines)),
+                                output, printer)
+    return failed, [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_pipe_round_trip(workdir):
+    key = uuid.uuid4().hex
+    failed, results = run([
+        json.dumps({'id': 1, 'sap': 'SAP1', 'qty': '5', 'lot': 'L-0001'}),
+        '',
+        json.dumps({'id': 2, 'text': 'SAP2|7|L-0002', 'key': key}),
+        json.dumps({'id': 3, 'text': 'SAP2|7|L-0002', 'key': key}),
+        'not json',
+        json.dumps({'id': 5, 'sap': 'SAPé1', 'qty': '5', 'lot': 'L'}),
+    ], printer='PDF')
+
+    assert failed == 2
+    assert [result['id'] for result in results] == [1, 2, 3, None, 5]
+    first, second, duplicate, malformed, rejected = results
+    assert first['ok'] and first['printer'] == 'PDF'
+    assert os.path.exists(first['file'])
+    assert second['ok'] and 'duplicate' not in second
+    assert duplicate == {'id': 3, 'ok': True, 'duplicate': True, 'ms': duplicate['ms']}
+    assert not malformed['ok'] and malformed['error'].startswith('invalid record')
+    assert not rejected['ok'] and 'file' not in rejected and 'printer' not in rejected
+
+
+def test_pipe_render_only_does_not_journal(workdir):
+    failed, results = run([json.dumps({'id': 'a', 'text': 'SAP1|5|L-0001'})])
+    assert failed == 0
+    assert results[0]['ok'] and 'printer' not in results[0]
+    assert os.path.exists(results[0]['file'])
+
+
+def test_pipe_keeps_diagnostics_off_stdout(workdir, monkeypatch, capsys):
+    records = [json.dumps({'id': n, 'text': f"SAP{n}|5|L-{n:04d}"}) for n in range(3)]
+    monkeypatch.setattr(sys, 'stdin', io.StringIO('\n'.join(records) + '\n'))
+
+    assert label_cli.main(['pipe', '--printer', 'PDF']) == 0
+
+    captured = capsys.readouterr()
+    lines = captured.out.splitlines()
+    assert [json.loads(line)['id'] for line in lines] == [0, 1, 2]
+    assert 'PDF output' in captured.err
+
+
+def test_session_emits_labels_through_the_print_pipeline(workdir):
+    pypdf = pytest.importorskip('pypdf')
+    from print_label import get_pdf_generator
+    from print_journal import PrintJournal
+
+    journal = PrintJournal(str(workdir / 'journal.log'))
+    run_id = uuid.uuid4().hex[:8]
+    values = [('SAP1', '5', f"S1-{run_id}"), ('SAP1', '5', f"S2-{run_id}"),
+              ('SAP2', '7', f"S3-{run_id}")]
+    with get_pdf_generator().open_session('PDF', backup_dir=str(workdir / 'shift')) as session:
+        paths = [session.emit(*value, journal=journal, job_id=f"job{n}")
+                 for n, value in enumerate(values)]
+        assert session.emit('SAPé', '5', 'L', journal=journal, job_id='bad') is None
+        assert session.stats()['labels'] == 3
+    journal.close()
+
+    for path, value in zip(paths, values):
+        assert os.path.dirname(path) == str(workdir / 'shift')
+        reader = pypdf.PdfReader(path, strict=True)
+        assert len(reader.pages) == 1
+        text = reader.pages[0].extract_text()
+        assert all(field in text for field in value)
+    unconfirmed = PrintJournal(str(workdir / 'journal.log')).unconfirmed()
+    assert [(job.job_id, job.state) for job in unconfirmed] == [('bad', 'failed')]
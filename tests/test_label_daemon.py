@@ -0,0 +1,239 @@
+"""Tests for the label daemon protocol and its client."""
+
+import os
+import json
+import time
+import socket
+import threading
+import uuid
+
+import pytest
+
+from label_daemon import LabelDaemon, DaemonClient, is_loopback, parse_address
+
+
+@pytest.fixture
+def serve():
+    """Start daemons on free loopback ports; yields a factory returning (daemon, address)."""
+    daemons = []
+
+    def start(**options):
+        daemon = LabelDaemon('127.0.0.1:0', **options)
+        daemon.start()
+        daemons.append(daemon)
+        host, port = daemon._server.server_address
+        return daemon, f"{host}:{port}"
+
+    yield start
+    for daemon in daemons:
+        daemon.stop()
+
+
+def test_parse_address_and_loopback():
+    assert parse_address('127.0.0.1:8731')[1] == ('127.0.0.1', 8731)
+    with pytest.raises(ValueError):
+        parse_address('no-port')
+    assert is_loopback('127.0.0.1:1')
+    assert is_loopback('localhost:1')
+    assert is_loopback('[::1]:1')
+    assert is_loopback('unix:/tmp/labels.sock')
+    assert not is_loopback('0.0.0.0:1')
+    assert not is_loopback('printserver:1')
+
+
+def test_public_address_needs_token_or_insecure():
+    with pytest.raises(ValueError):
+        LabelDaemon('0.0.0.0:8731')
+    assert LabelDaemon('0.0.0.0:8731', token='secret').token == 'secret'
+    LabelDaemon('0.0.0.0:8731', insecure=True)
+
+
+def test_ping_and_errors(serve):
+    _, address = serve()
+    client = DaemonClient(address, timeout=5, token='')
+    try:
+        assert client.call('ping') == {'ok': True}
+        response = client.call('explode')
+        assert response['ok'] is False
+        assert 'unknown op' in response['error']
+        # The connection survives an error response
+        assert client.call('ping') == {'ok': True}
+    finally:
+        client.close()
+
+
+def test_token_is_checked(serve):
+    _, address = serve(token='secret')
+    anonymous = DaemonClient(address, timeout=5, token='')
+    wrong = DaemonClient(address, timeout=5, token='guess')
+    client = DaemonClient(address, timeout=5, token='secret')
+    try:
+        assert anonymous.call('ping') == {'ok': False, 'error': 'invalid or missing token'}
+        assert wrong.call('ping')['ok'] is False
+        assert client.call('ping') == {'ok': True}
+    finally:
+        for each in (anonymous, wrong, client):
+            each.close()
+
+
+def test_print_to_pdf(serve, workdir):
+    _, address = serve()
+    client = DaemonClient(address, timeout=30, token='')
+    try:
+        assert client.print_label_standalone('A|1|B', 'PDF', verify=False)
+    finally:
+        client.close()
+
+
+def test_get_status_does_not_wait_for_daemon(serve):
+    daemon, address = serve()
+    release = threading.Event()
+    handle = daemon.handle
+
+    def slow_status(request):
+        if request.get('op') == 'status':
+            release.wait(5)
+            return {'ok': True, 'printers': {'Zebra': {'state': 'idle', 'reasons': [],
+                                                       'message': ''}}}
+        return handle(request)
+
+    daemon.handle = slow_status
+    client = DaemonClient(address, timeout=10, status_interval=60, token='')
+    try:
+        started = time.monotonic()
+        assert client.get_status('Zebra') is None
+        assert time.monotonic() - started < 1.0
+        release.set()
+        deadline = time.monotonic() + 5
+        while client.get_status('Zebra') is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert client.get_status('Zebra').state == 'idle'
+    finally:
+        release.set()
+        client.close()
+
+
+class ScriptedDaemon:
+    """
+    Raw line server: reply(request, connection_number) returns the bytes to
+    send back (None = close the connection without answering, a
+    (bytes, True) pair = answer and then close).
+    """
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.requests = []          # (connection number, request)
+        self._listener = socket.create_server(('127.0.0.1', 0))
+        self.address = '127.0.0.1:%d' % self._listener.getsockname()[1]
+        self._connections = 0
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self._listener.accept()
+            except OSError:
+                return
+            self._connections += 1
+            threading.Thread(target=self._serve, args=(sock, self._connections),
+                             daemon=True).start()
+
+    def _serve(self, sock, number):
+        with sock, sock.makefile('rb') as reader:
+            for line in reader:
+                request = json.loads(line)
+                self.requests.append((number, request))
+                response = self.reply(request, number)
+                if response is None:
+                    return
+                response, close = response if isinstance(response, tuple) else (response, False)
+                sock.sendall(response)
+                if close:
+                    return
+
+    def close(self):
+        self._listener.close()
+
+
+@pytest.fixture
+def scripted():
+    servers = []
+
+    def start(reply):
+        server = ScriptedDaemon(reply)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def test_stale_pooled_connection_is_replaced(scripted):
+    # The daemon closes the first connection after answering on it
+    server = scripted(lambda request, number: (b'{"ok": true, "n": %d}\n' % number, True))
+    client = DaemonClient(server.address, timeout=5, token='')
+    try:
+        assert client.call('ping') == {'ok': True, 'n': 1}
+        time.sleep(0.05)
+        assert client.call('ping') == {'ok': True, 'n': 2}
+        assert [number for number, _ in server.requests] == [1, 2]
+    finally:
+        client.close()
+
+
+def test_timeout_is_not_retried(scripted):
+    def reply(request, number):
+        if request['op'] == 'print':
+            time.sleep(0.5)
+        return b'{"ok": true}\n'
+
+    server = scripted(reply)
+    client = DaemonClient(server.address, timeout=0.2, token='')
+    try:
+        client.call('ping')                 # leaves a pooled connection
+        with pytest.raises(socket.timeout):
+            client.call('print', text='A|1|B', printer='PDF')
+        assert [request['op'] for _, request in server.requests] == ['ping', 'print']
+    finally:
+        client.close()
+
+
+def test_partial_response_is_not_retried(scripted):
+    server = scripted(lambda request, number: (b'{"ok": true}\n' if request['op'] == 'ping'
+                                               else b'{"ok": tr'))
+    client = DaemonClient(server.address, timeout=0.5, token='')
+    try:
+        client.call('ping')
+        with pytest.raises(OSError):
+            client.call('print', text='A|1|B', printer='PDF')
+        assert [request['op'] for _, request in server.requests] == ['ping', 'print']
+    finally:
+        client.close()
+
+
+def test_print_requests_carry_an_idempotency_key(scripted):
+    server = scripted(lambda request, number: b'{"ok": true}\n')
+    client = DaemonClient(server.address, timeout=5, token='')
+    try:
+        assert client.print_label_standalone('A|1|B', 'PDF')
+        assert client.print_label_standalone('A|1|B', 'PDF')
+        assert client.print_label_standalone('A|1|B', 'PDF', idempotency_key='press-1')
+        assert client.reprint_label(12)
+        keys = [request['key'] for _, request in server.requests]
+        assert all(keys) and len(set(keys)) == 4
+        assert keys[2] == 'press-1'
+    finally:
+        client.close()
+
+
+def test_daemon_prints_a_repeated_key_once(serve, workdir):
+    _, address = serve()
+    key = uuid.uuid4().hex
+    client = DaemonClient(address, timeout=30, token='')
+    try:
+        assert client.print_label_standalone('A|1|B', 'PDF', verify=False, idempotency_key=key)
+        assert client.print_label_standalone('A|1|B', 'PDF', verify=False, idempotency_key=key)
+        assert len(os.listdir(workdir / 'pdf_backup')) == 1
+    finally:
+        client.close()
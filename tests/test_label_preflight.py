@@ -0,0 +1,49 @@
+"""Tests for batch preflight checks."""
+
+import pytest
+
+from label_preflight import (check_value, check_batch, preflight_batch, preflight_record,
+                             PreflightError, MAX_BARCODE_CHARS)
+
+
+def test_check_value_accepts_all_ascii():
+    assert check_value('SAP-123') is None
+    # Control characters are encoded through code set A
+    assert check_value('A\x01B\x1f\x7f') is None
+    assert check_value('X' * MAX_BARCODE_CHARS) is None
+
+
+def test_check_value_rejects_non_ascii_and_long_values():
+    assert 'position 2' in check_value('AÄB')
+    assert check_value('X' * (MAX_BARCODE_CHARS + 1)) == '26 characters (max 25)'
+
+
+def test_preflight_batch_reports_rows_in_order():
+    texts = ['A|1|L', 'Ä|1|L', 'A|1|L', 'B|2|' + 'L' * 30, 'Ä|€|L']
+    issues = preflight_batch(texts)
+    assert [(issue.row, issue.field) for issue in issues] == [
+        (2, 'sap_nr'), (4, 'lot_number'), (5, 'sap_nr'), (5, 'cantitate')]
+    assert [repr(issue) for issue in preflight_batch(texts, max_issues=2)] == [
+        repr(issue) for issue in issues[:2]]
+
+
+def test_many_bad_values_match_byte_search():
+    # More distinct bad values than the byte search handles
+    texts = [f"É{index}|1|L" if index % 3 == 0 else f"S{index}|1|L" for index in range(120)]
+    issues = preflight_batch(texts)
+    assert [issue.row for issue in issues] == list(range(1, 121, 3))
+    assert all(issue.field == 'sap_nr' for issue in issues)
+
+
+def test_check_batch_raises_with_issues():
+    check_batch(['A|1|L'])
+    with pytest.raises(PreflightError) as error:
+        check_batch(['A|1|L', 'Ä|1|L'])
+    assert len(error.value.issues) == 1
+    assert 'row 2: SAP-Nr' in str(error.value)
+
+
+def test_preflight_record():
+    assert preflight_record('A|1|L') == []
+    issues = preflight_record('A|Ω|L')
+    assert [(issue.row, issue.field) for issue in issues] == [(1, 'cantitate')]
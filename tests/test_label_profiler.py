@@ -0,0 +1,63 @@
+"""Tests for the on-demand pipeline profiler."""
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+import label_profiler
+from label_profiler import JobProfiler, parse_spec, stats_to_stacks
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def work(n):
+    return sum(i * i for i in range(n))
+
+
+def test_parse_spec():
+    assert isinstance(parse_spec('cprofile:3'), JobProfiler)
+    assert parse_spec('cprofile:3').max_jobs == 3
+    assert parse_spec('sample:1.5').duration == 1.5
+    with pytest.raises(ValueError):
+        parse_spec('trace:10')
+    with pytest.raises(ValueError):
+        parse_spec('cprofile:many')
+
+
+def test_job_profiler_writes_results_after_max_jobs(tmp_path, capsys):
+    profiler = label_profiler.enable(JobProfiler(max_jobs=2, output_dir=str(tmp_path)))
+    assert label_profiler.active is profiler
+    for _ in range(2):
+        assert profiler.call(work, 1000) == work(1000)
+
+    assert label_profiler.active is None
+    pstats_path, collapsed_path = profiler.paths
+    assert os.path.exists(pstats_path)
+    with open(collapsed_path, encoding='utf-8') as f:
+        assert any('work' in line for line in f)
+    # Messages stay off stdout (label_cli.py pipe writes JSON there)
+    captured = capsys.readouterr()
+    assert captured.out == ''
+    assert 'Profile written' in captured.err
+
+
+def test_stats_to_stacks_keeps_call_paths():
+    stats = {
+        ('m', 1, 'root'): (1, 1, 0.1, 1.0, {}),
+        ('m', 2, 'child'): (1, 1, 0.9, 0.9, {('m', 1, 'root'): (1, 1, 0.9, 0.9)}),
+    }
+    stacks = stats_to_stacks(stats)
+    assert stacks[(('m', 1, 'root'),)] == pytest.approx(0.1e6)
+    assert stacks[(('m', 1, 'root'), ('m', 2, 'child'))] == pytest.approx(0.9e6)
+
+
+def test_importing_print_label_does_not_start_profiling(tmp_path):
+    code = ("import print_label, label_profiler, sys; "
+            "sys.exit(label_profiler.active is not None)")
+    env = dict(os.environ, LABEL_PROFILE='cprofile:1', LABEL_PROFILE_DIR=str(tmp_path))
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == ''
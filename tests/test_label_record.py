@@ -0,0 +1,60 @@
+"""Tests for LabelRecord and the columnar batch parser."""
+
+import pytest
+
+import label_record
+from label_record import LabelRecord, RecordBatch, parse_batch, parse_csv
+
+
+SAMPLES = [
+    'SAP1|10|LOT1\nSAP1|20|LOT2\nSAP2|10|LOT1\n',
+    ' SAP1 | 10 |LOT1 \r\nSAP1|20|LOT2\r\n',
+    'SAP1|10|LOT1\n\nSAP9\nSAP1|20|LOT2|extra\n|5|\n',
+    'A||\n||C\n|B|\n',
+    'SÄP|1|LÖT\nSAP|2|LOT',
+    'ONLY-SAP\n',
+]
+
+
+def expected_records(data, delimiter='|'):
+    lines = data.replace('\r\n', '\n').split('\n')
+    return [LabelRecord.from_text(line, delimiter) for line in lines if line.strip()]
+
+
+@pytest.mark.parametrize('data', SAMPLES)
+def test_parse_batch_matches_from_text(data):
+    assert list(parse_batch(data)) == expected_records(data)
+
+
+@pytest.mark.parametrize('data', SAMPLES)
+def test_parse_batch_matches_from_text_across_blocks(data, monkeypatch):
+    # Tiny blocks mix the fast path and the per-line path in one batch
+    monkeypatch.setattr(label_record, '_CHUNK_CHARS', 8)
+    data = data * 5
+    assert list(parse_batch(data)) == expected_records(data)
+
+
+def test_parse_batch_accepts_bytes_and_other_delimiters():
+    assert list(parse_batch(b'A;1;B\n', delimiter=';')) == [LabelRecord('A', '1', 'B')]
+
+
+def test_batch_stores_each_value_once():
+    batch = parse_batch('SAP1|10|LOT1\n' * 1000)
+    assert len(batch) == 1000
+    assert {'SAP1', '10', 'LOT1'} <= set(batch.values)
+    assert len(batch.values) <= 4       # plus '' for empty fields
+    assert list(batch.texts())[:2] == ['SAP1|10|LOT1', 'SAP1|10|LOT1']
+
+
+def test_from_records_accepts_mixed_input():
+    batch = RecordBatch.from_records(['A|1|B', ('C', 2, None), LabelRecord('D')])
+    assert list(batch) == [LabelRecord('A', '1', 'B'), LabelRecord('C', '2', ''),
+                           LabelRecord('D')]
+
+
+def test_parse_csv_with_header_and_quotes():
+    plain = parse_csv('sap,qty,lot\nSAP1,10,LOT1\n')
+    quoted = parse_csv('sap,qty,lot\n"SAP,1",10,LOT1\n')
+    assert list(plain) == [LabelRecord('SAP1', '10', 'LOT1')]
+    assert list(quoted)[-1] == LabelRecord('SAP,1', '10', 'LOT1')
+
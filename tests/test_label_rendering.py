@@ -0,0 +1,60 @@
+"""Tests for dot-aligned barcode rendering (PDF and PNG labels)."""
+
+import pytest
+
+from barcode_verify import scan_runs, verify_image
+from print_label import create_label_image
+from print_label_pdf import PDFLabelGenerator, BilevelImage
+
+
+@pytest.mark.parametrize('dpi, dots', [(203, 4), (300, 6)])
+def test_modules_are_whole_printer_dots(dpi, dots):
+    generator = PDFLabelGenerator(dpi=dpi)
+    img = generator.generate_barcode_image('SAP-123456')
+    runs = scan_runs(img)
+    assert min(runs) == dots
+    assert all(run % dots == 0 for run in runs)
+    # Placed 1:1: the drawn width is the bitmap width in dots
+    width_dots = generator.dots_to_points(img.width) * dpi / 72.0
+    assert width_dots == pytest.approx(img.width)
+    assert verify_image(img, 'SAP-123456').ok
+
+
+def test_long_value_steps_down_by_whole_dots():
+    generator = PDFLabelGenerator(dpi=300)
+    img = generator.generate_barcode_image('ABCDEFGHIJKLMNOPQRSTUVWXY')
+    dots = min(scan_runs(img))
+    assert dots < 6
+    assert all(run % dots == 0 for run in scan_runs(img))
+    assert img.width <= generator.max_barcode_dots()
+
+
+def test_png_label_barcodes_are_not_resampled():
+    label = create_label_image('SAP1|12345|L-0001').convert('L')
+    row_height = label.height // 3
+    for idx, value in enumerate(['SAP1', '12345', 'L-0001']):
+        y = idx * row_height + 20 + (row_height - 25) // 2
+        row = label.crop((15, y, label.width - 10, y + 1))
+        assert set(row.tobytes()) <= {0, 255}
+        runs = scan_runs(label, y, 15, label.width - 10)
+        assert all(run % min(runs) == 0 for run in runs)
+        assert verify_image(label, value, y, 15, label.width - 10).ok
+
+
+@pytest.mark.parametrize('value', ['SAP123', '0123456789', 'Lot-ab 17'])
+def test_bilevel_image_round_trips(value):
+    generator = PDFLabelGenerator()
+    img = generator.generate_barcode_image(value)
+    barcode = BilevelImage(img)
+    decoded = barcode.to_image()
+    assert decoded.mode == '1'
+    assert (decoded.width, decoded.height) == img.size
+    assert decoded.tobytes() == img.convert('1').tobytes()
+    assert verify_image(decoded, value).ok
+
+
+def test_bilevel_image_name_follows_content():
+    generator = PDFLabelGenerator()
+    first = BilevelImage(generator.generate_barcode_image('SAP123'))
+    assert first.name == BilevelImage(generator.generate_barcode_image('SAP123')).name
+    assert first.name != BilevelImage(generator.generate_barcode_image('SAP124')).name
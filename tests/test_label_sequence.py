@@ -0,0 +1,118 @@
+"""Tests for serial-number ranges, counters and sequence printing."""
+
+import math
+
+import pytest
+
+import print_label
+from label_sequence import (
+    counter_values, split_quantity, sequence_records, CounterStore,
+    reserve_counter_values, sequence_batch_id, print_sequence,
+)
+from label_preflight import PreflightError
+from print_journal import PrintJournal, CONFIRMED
+
+
+def test_counter_values_are_padded_and_inclusive():
+    assert list(counter_values(8, 11, width=3, prefix='L-')) == ['L-008', 'L-009', 'L-010', 'L-011']
+    assert list(counter_values(3, 1, step=-1)) == ['3', '2', '1']
+
+
+def test_split_quantity():
+    assert list(split_quantity(1000, 300)) == ['300', '300', '300', '100']
+    with pytest.raises(ValueError):
+        list(split_quantity(10, 0))
+
+
+def test_sequence_records_vary_one_field():
+    records = list(sequence_records('SAP1', '5', '', 'lot_number', ['A', 'B']))
+    assert records == [('SAP1', '5', 'A'), ('SAP1', '5', 'B')]
+
+
+def test_counter_store_never_repeats_values(tmp_path):
+    store = CounterStore(str(tmp_path / 'counters.json'))
+    first = list(reserve_counter_values(store, 'L1', 3, width=2))
+    second = list(reserve_counter_values(CounterStore(store.path), 'L1', 2, width=2))
+    assert first == ['01', '02', '03']
+    assert second == ['04', '05']
+
+
+def test_batch_id_is_deterministic():
+    values = ['L-001', 'L-002']
+    batch_id = sequence_batch_id('SAP1', '5', 'L-', 'lot_number', values)
+    assert batch_id == sequence_batch_id('SAP1', '5', 'L-', 'lot_number', list(values))
+    assert batch_id != sequence_batch_id('SAP1', '5', 'L-', 'lot_number', ['L-001', 'L-003'])
+    assert batch_id != sequence_batch_id('SAP2', '5', 'L-', 'lot_number', values)
+
+
+def test_print_sequence_resumes_from_journal(workdir):
+    values = ['L-001', 'L-002', 'L-003']
+    with PrintJournal(str(workdir / 'journal.log')) as journal:
+        summary = print_sequence('PDF', 'SAP1', '5', '', 'lot_number', values,
+                                 journal=journal, batch_id='seq1')
+        assert summary == {'printed': 3, 'skipped': 0, 'failed': 0, 'unconfirmed': []}
+        assert journal.state('seq1:0-2') == CONFIRMED
+
+    # A second run of the same job (e.g. after a crash) prints nothing again
+    with PrintJournal(str(workdir / 'journal.log')) as journal:
+        summary = print_sequence('PDF', 'SAP1', '5', '', 'lot_number', values,
+                                 journal=journal, batch_id='seq1')
+    assert summary['printed'] == 0
+    assert summary['skipped'] == 3
+
+
+def test_print_sequence_preflights_before_printing(workdir):
+    with pytest.raises(PreflightError):
+        print_sequence('PDF', 'SAP1', '5', '', 'lot_number', ['OK', 'ÜBER'])
+
+
+class CountingPrinter:
+    """Printer backend that counts spool calls and can refuse some of them"""
+
+    def __init__(self, fail_calls=()):
+        self.calls = 0
+        self.fail_calls = set(fail_calls)
+
+    def print_file(self, file_path):
+        self.calls += 1
+        return self.calls not in self.fail_calls
+
+
+@pytest.fixture
+def counting_printer():
+    printers = []
+
+    def register(**options):
+        printer = CountingPrinter(**options)
+        print_label.register_printer_backend(f"COUNT-{len(printers)}", printer)
+        printers.append(printer)
+        return f"COUNT-{len(printers) - 1}", printer
+
+    yield register
+    for index in range(len(printers)):
+        print_label.unregister_printer_backend(f"COUNT-{index}")
+
+
+def test_long_range_is_spooled_in_documents(workdir, counting_printer):
+    name, printer = counting_printer()
+    values = [f"L-{number:04d}" for number in range(1, 2001)]
+    summary = print_sequence(name, 'SAP1', '5', '', 'lot_number', values, verify=False,
+                             pages_per_document=300)
+    assert summary == {'printed': 2000, 'skipped': 0, 'failed': 0, 'unconfirmed': []}
+    assert printer.calls == math.ceil(2000 / 300)
+    assert len(list((workdir / 'pdf_backup').iterdir())) == printer.calls
+
+
+def test_failed_document_is_printed_again_on_resume(workdir, counting_printer):
+    name, printer = counting_printer(fail_calls={2})
+    values = [f"L-{number:02d}" for number in range(1, 11)]
+    with PrintJournal(str(workdir / 'journal.log')) as journal:
+        summary = print_sequence(name, 'SAP1', '5', '', 'lot_number', values,
+                                 journal=journal, batch_id='s', pages_per_document=4)
+        assert summary == {'printed': 6, 'skipped': 0, 'failed': 4, 'unconfirmed': []}
+
+        summary = print_sequence(name, 'SAP1', '5', '', 'lot_number', values,
+                                 journal=journal, batch_id='s', pages_per_document=4)
+        assert summary == {'printed': 4, 'skipped': 6, 'failed': 0, 'unconfirmed': []}
+        assert [journal.state(job) for job in ('s:0-3', 's:4-7', 's:8-9')] == [CONFIRMED] * 3
+    assert printer.calls == 4
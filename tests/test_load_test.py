@@ -0,0 +1,104 @@
+"""Tests for the printer simulator and the load test harness."""
+
+import time
+
+import pytest
+
+import load_test
+from print_label import print_to_printer
+from printer_simulator import (
+    SimulatedPrinter, add_simulated_printers, remove_simulated_printers, IDLE, PAPER_OUT,
+)
+
+
+@pytest.fixture
+def label_file(tmp_path):
+    path = tmp_path / 'label.pdf'
+    path.write_bytes(b'%PDF-1.4 test')
+    return str(path)
+
+
+def test_simulated_printer_counts_jobs_and_bytes(label_file):
+    printer = SimulatedPrinter('SIM', latency=0)
+    assert all(printer.print_file(label_file) for _ in range(3))
+    stats = printer.stats()
+    assert (stats['jobs'], stats['failed'], stats['queued']) == (3, 0, 0)
+    assert stats['bytes_received'] == 3 * len(b'%PDF-1.4 test')
+    assert stats['state'] == IDLE
+
+
+def test_simulated_printer_failures_are_reproducible(label_file):
+    def outcomes():
+        printer = SimulatedPrinter('SIM', latency=0, failure_rate=0.5, seed=7)
+        return [printer.print_file(label_file) for _ in range(40)], printer
+
+    first, printer = outcomes()
+    assert first == outcomes()[0]
+    assert 0 < first.count(False) < 40
+    assert printer.failed == first.count(False)
+
+
+def test_simulated_printer_paper_out(label_file):
+    printer = SimulatedPrinter('SIM', latency=0, paper_out_every=2, paper_out_duration=60)
+    assert printer.print_file(label_file)
+    assert printer.print_file(label_file)
+    assert printer.state == PAPER_OUT
+    assert not printer.print_file(label_file)
+    assert printer.stats()['paper_out_events'] == 1
+
+    printer.reload_paper()
+    assert printer.print_file(label_file)
+    assert printer.jobs == 3
+
+
+def test_simulated_printer_throughput_cap(label_file):
+    printer = SimulatedPrinter('SIM', latency=0, max_jobs_per_second=50)
+    started = time.monotonic()
+    for _ in range(6):
+        printer.print_file(label_file)
+    assert time.monotonic() - started >= 5 / 50 * 0.9
+
+
+def test_simulated_printers_are_printer_backends(label_file):
+    printers = add_simulated_printers(2, prefix='TSIM', latency=0)
+    try:
+        assert [printer.name for printer in printers] == ['TSIM-1', 'TSIM-2']
+        assert print_to_printer('TSIM-2', label_file)
+        assert (printers[0].jobs, printers[1].jobs) == (0, 1)
+    finally:
+        remove_simulated_printers(printers)
+    assert not print_to_printer('TSIM-2', label_file)
+
+
+def test_percentile():
+    values = [10, 20, 30, 40, 50, 60, 70, 80, 90, 100]
+    assert load_test.percentile(values, 0.50) == 50
+    assert load_test.percentile(values, 0.95) == 100
+    assert load_test.percentile([5], 0.99) == 5
+    assert load_test.percentile([], 0.5) == 0.0
+
+
+def test_run_load_test_reports_every_label():
+    calls = []
+
+    def print_func(text, printer):
+        calls.append((text, printer))
+        return not text.endswith('000002')
+
+    result = load_test.run_load_test(stations=3, labels_per_station=4,
+                                     printer_names=['A', 'B'], print_func=print_func)
+    assert result['labels'] == 12
+    assert result['failed'] == 3
+    assert result['p50_ms'] <= result['p95_ms'] <= result['max_ms']
+    assert {printer for text, printer in calls if text.startswith('SAP0001')} == {'B'}
+    assert {printer for text, printer in calls if text.startswith('SAP0002')} == {'A'}
+
+
+@pytest.mark.parametrize('pool', [False, True])
+def test_load_test_main_against_simulated_printers(workdir, capsys, pool):
+    argv = ['--stations', '2', '--labels', '3', '--printers', '2', '--latency', '0',
+            '--no-verify']
+    assert load_test.main(argv + (['--pool'] if pool else [])) == 0
+    report = capsys.readouterr().out
+    assert 'Labels:              6 (0 failed)' in report
+    assert 'SIM-1' in report and 'SIM-2' in report
@@ -0,0 +1,92 @@
+"""Tests for duplicate print suppression."""
+
+import uuid
+
+import pytest
+
+import print_metrics
+from print_dedup import DuplicateFilter, derive_key
+from print_label import (
+    print_label_standalone, register_printer_backend, unregister_printer_backend,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FlakyPrinter:
+    """Printer backend that fails its first job."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def print_file(self, file_path, **options):
+        self.calls += 1
+        return self.calls > 1
+
+
+@pytest.fixture
+def flaky_printer():
+    printer = FlakyPrinter()
+    register_printer_backend('FLAKY', printer)
+    yield printer
+    unregister_printer_backend('FLAKY')
+
+
+def test_duplicate_within_window_is_dropped_until_expiry():
+    clock = FakeClock()
+    dedup = DuplicateFilter(window=10.0, clock=clock)
+    assert dedup.check('a')
+    clock.now += 9.9
+    assert not dedup.check('a')
+    assert dedup.check('b')
+    clock.now += 0.2
+    assert dedup.check('a')
+    assert len(dedup) == 2
+
+
+def test_max_keys_drops_oldest():
+    dedup = DuplicateFilter(window=60.0, max_keys=3, clock=FakeClock())
+    for key in 'abcd':
+        assert dedup.check(key)
+    assert len(dedup) == 3
+    assert dedup.check('a')
+    assert not dedup.check('d')
+
+
+def test_release_accepts_resubmission():
+    dedup = DuplicateFilter(clock=FakeClock())
+    assert dedup.check('a')
+    dedup.release('a')
+    assert dedup.check('a')
+
+
+def test_derive_key_ignores_field_padding():
+    assert derive_key('A|1|B', 'P1') == derive_key(' A | 1 | B ', 'P1')
+    assert derive_key('A|1|B', 'P1') != derive_key('A|1|B', 'P2')
+
+
+def test_duplicate_submission_is_not_counted(workdir):
+    print_metrics.reset()
+    key = uuid.uuid4().hex
+    assert print_label_standalone('SAP1|5|L-0001', 'PDF', idempotency_key=key)
+    assert print_label_standalone('SAP1|5|L-0001', 'PDF', idempotency_key=key)
+    assert print_metrics.snapshot() == {
+        print_metrics.LABELS_SUBMITTED: 1,
+        print_metrics.LABELS_PRINTED: 1,
+        print_metrics.DUPLICATES_SUPPRESSED: 1,
+    }
+
+
+def test_failed_job_releases_its_key(workdir, flaky_printer):
+    key = uuid.uuid4().hex
+    assert not print_label_standalone('SAP1|5|L-0001', 'FLAKY', idempotency_key=key)
+    assert print_label_standalone('SAP1|5|L-0001', 'FLAKY', idempotency_key=key)
+    assert flaky_printer.calls == 2
+    assert print_label_standalone('SAP1|5|L-0001', 'FLAKY', idempotency_key=key)
+    assert flaky_printer.calls == 2
@@ -0,0 +1,47 @@
+"""Tests for print history prefix search."""
+
+import pytest
+
+from print_history import PrintHistory
+
+
+@pytest.fixture
+def history():
+    with PrintHistory(':memory:') as history:
+        yield history
+
+
+def texts(entries):
+    return [entry.record.text for entry in entries]
+
+
+def test_wildcard_characters_match_literally(history):
+    for text in ('A_1|1|L', 'AB1|1|L', 'A%2|1|L', 'AXX2|1|L'):
+        history.record(text, 'PDF')
+    assert texts(history.search('A_', 'sap_nr')) == ['A_1|1|L']
+    assert texts(history.search('A%', 'sap_nr')) == ['A%2|1|L']
+
+
+def test_prefix_search_ignores_case(history):
+    history.record('sap123|1|reel-a', 'PDF')
+    history.record('SAP124|1|REEL-B', 'PDF')
+    history.record('SAQ1|1|x', 'PDF')
+    assert texts(history.search('SaP12')) == ['sap123|1|reel-a', 'SAP124|1|REEL-B']
+    assert texts(history.search('reel', 'lot_number')) == ['sap123|1|reel-a', 'SAP124|1|REEL-B']
+
+
+def test_label_matching_both_fields_is_returned_once(history):
+    both = history.record('X100|1|X100-A', 'PDF')
+    lot_only = history.record('Y1|1|X100-B', 'PDF')
+    sap_only = history.record('X100|2|Z', 'PDF')
+    entries = history.search('X100')
+    assert [entry.entry_id for entry in entries] == [sap_only, both, lot_only]
+    assert [entry.entry_id for entry in history.search('X100', limit=2)] == [sap_only, both]
+
+
+def test_results_newest_first_per_value_and_limited(history):
+    ids = [history.record(f"S1|{n}|L", 'PDF') for n in range(5)]
+    assert [entry.entry_id for entry in history.search('S1', limit=3)] == ids[:1:-1]
+    assert [entry.entry_id for entry in history.search('')] == ids[::-1]
+    with pytest.raises(ValueError):
+        history.search('S1', 'printer')
@@ -0,0 +1,149 @@
+"""Tests for the print job journal: replay, compaction and resuming batches."""
+
+import threading
+
+import pytest
+
+from print_journal import (
+    PrintJournal, print_batch, SUBMITTED, RENDERED, SPOOLED, CONFIRMED, FAILED,
+)
+
+
+TEXTS = ['SAP1|1|L1', 'SAP1|2|L2', 'SAP1|3|L3']
+
+
+def write_states(journal, batch_id, states):
+    """Journal one job per state, as a crashed run would have left them."""
+    for index, state in enumerate(states):
+        job_id = f"{batch_id}:{index}"
+        journal.submitted(job_id, TEXTS[index], batch_id)
+        if state in (RENDERED, SPOOLED, CONFIRMED):
+            journal.rendered(job_id, f"label{index}.pdf")
+        if state in (SPOOLED, CONFIRMED):
+            journal.spooled(job_id)
+        if state == CONFIRMED:
+            journal.confirmed(job_id)
+        if state == FAILED:
+            journal.failed(job_id, 'paper out')
+
+
+def test_replay_restores_states(tmp_path):
+    path = str(tmp_path / 'journal.log')
+    with PrintJournal(path) as journal:
+        write_states(journal, 'b', [CONFIRMED, SPOOLED, FAILED])
+        journal.submitted('single', 'X|1|Y')
+
+    jobs = PrintJournal.replay(path)
+    assert [job.state for job in jobs.values()] == [CONFIRMED, SPOOLED, FAILED, SUBMITTED]
+    assert jobs['b:1'].file_path == 'label1.pdf'
+    assert jobs['b:2'].error == 'paper out'
+    assert jobs['b:0'].text == TEXTS[0]
+
+
+def test_replay_ignores_torn_last_line(tmp_path):
+    path = tmp_path / 'journal.log'
+    with PrintJournal(str(path)) as journal:
+        journal.submitted('a', 'A|1|B')
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('C\ta')         # crash in the middle of a write
+    assert PrintJournal.replay(str(path))['a'].state == SUBMITTED
+
+
+def test_compact_keeps_unconfirmed_and_batch_confirmations(tmp_path):
+    path = str(tmp_path / 'journal.log')
+    with PrintJournal(path) as journal:
+        write_states(journal, 'b', [CONFIRMED, RENDERED, FAILED])
+        journal.submitted('single', 'X|1|Y')
+        journal.confirmed('single')
+        journal.compact()
+        assert journal.state('b:0') == CONFIRMED
+        assert journal.state('single') is None
+
+    jobs = PrintJournal.replay(path)
+    assert set(jobs) == {'b:0', 'b:1', 'b:2'}
+    assert jobs['b:0'].state == CONFIRMED
+    assert jobs['b:1'].state == RENDERED and jobs['b:1'].file_path == 'label1.pdf'
+    assert jobs['b:2'].state == FAILED and jobs['b:2'].error == 'paper out'
+    with open(path, encoding='utf-8') as f:
+        assert 'SAP1|1|L1' not in f.read()
+
+
+def test_print_batch_resumes_after_crash(workdir):
+    path = str(workdir / 'journal.log')
+    with PrintJournal(path) as journal:
+        write_states(journal, 'b', [CONFIRMED, RENDERED])
+
+    with PrintJournal(path) as journal:
+        summary = print_batch(TEXTS, 'PDF', journal, 'b')
+        assert summary == {'printed': 2, 'skipped': 1, 'failed': 0, 'unconfirmed': []}
+        assert [journal.state(f"b:{index}") for index in range(3)] == [CONFIRMED] * 3
+
+
+def test_print_batch_skips_confirmed_jobs_after_compaction(workdir):
+    path = str(workdir / 'journal.log')
+    with PrintJournal(path) as journal:
+        print_batch(TEXTS, 'PDF', journal, 'b')
+        journal.compact()
+
+    with PrintJournal(path) as journal:
+        summary = print_batch(TEXTS, 'PDF', journal, 'b')
+    assert summary['printed'] == 0
+    assert summary['skipped'] == 3
+
+
+def test_print_batch_does_not_reprint_spooled_jobs(workdir):
+    path = str(workdir / 'journal.log')
+    with PrintJournal(path) as journal:
+        write_states(journal, 'b', [CONFIRMED, SPOOLED, CONFIRMED])
+
+    with PrintJournal(path) as journal:
+        summary = print_batch(TEXTS, 'PDF', journal, 'b')
+        assert summary == {'printed': 0, 'skipped': 2, 'failed': 0, 'unconfirmed': ['b:1']}
+        assert journal.state('b:1') == SPOOLED
+
+        summary = print_batch(TEXTS, 'PDF', journal, 'b', reprint_spooled=True)
+        assert summary['printed'] == 1
+        assert journal.state('b:1') == CONFIRMED
+
+
+def test_fields_that_would_split_a_record_are_refused(tmp_path):
+    path = str(tmp_path / 'journal.log')
+    with PrintJournal(path) as journal:
+        with pytest.raises(ValueError):
+            journal.submitted('a', 'A|1|B', 'bad\tbatch')
+        with pytest.raises(ValueError):
+            journal.submitted('a\nC\tb', 'A|1|B')
+        journal.submitted('a', 'A\t|1|\nB', 'b')
+        with pytest.raises(ValueError):
+            journal.rendered('a', 'labels/new\nline.pdf')
+        journal.failed('a', 'error\twith\ntabs')
+
+    jobs = PrintJournal.replay(path)
+    assert list(jobs) == ['a']
+    assert jobs['a'].text == 'A\t|1|\nB'
+    assert jobs['a'].error == 'error\twith\ntabs'
+
+
+def test_concurrent_transitions_and_compaction_replay_consistently(tmp_path):
+    path = str(tmp_path / 'journal.log')
+    with PrintJournal(path) as journal:
+        def worker(start):
+            for index in range(start, start + 200):
+                job_id = f"b:{index}"
+                journal.submitted(job_id, f"S|{index}|L", 'b')
+                journal.rendered(job_id, f"label{index}.pdf")
+                journal.spooled(job_id)
+                journal.confirmed(job_id)
+
+        threads = [threading.Thread(target=worker, args=(start,)) for start in (0, 200, 400)]
+        for thread in threads:
+            thread.start()
+        for _ in range(20):
+            journal.compact()
+        for thread in threads:
+            thread.join()
+        assert journal.unconfirmed() == []
+
+    jobs = PrintJournal.replay(path)
+    assert len(jobs) == 600
+    assert all(job.state == CONFIRMED for job in jobs.values())
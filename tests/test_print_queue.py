@@ -0,0 +1,52 @@
+"""Tests for bulk import files and the print queue."""
+
+import os
+import sys
+import subprocess
+
+from label_record import record_text
+from print_queue import PrintQueue, read_import_batch
+
+
+def test_record_text_accepts_both_field_spellings():
+    assert record_text({'sap': 'A', 'qty': '1', 'lot': 'B'}) == 'A|1|B'
+    assert record_text({'sap_nr': 'A', 'cantitate': '1', 'lot_number': 'B'}) == 'A|1|B'
+    assert record_text({'text': 'X|2|Y', 'sap': 'ignored'}) == 'X|2|Y'
+
+
+def test_read_import_batch_formats(tmp_path):
+    jsonl = tmp_path / 'jobs.jsonl'
+    jsonl.write_text('{"sap": "A", "qty": "1", "lot": "B"}\n\n{"text": "C|2|D"}\n')
+    csv_file = tmp_path / 'jobs.csv'
+    csv_file.write_text('sap,qty,lot\nA,1,B\n')
+    txt = tmp_path / 'jobs.txt'
+    txt.write_text('A|1|B\nC|2|D\n')
+
+    assert list(read_import_batch(str(jsonl)).texts()) == ['A|1|B', 'C|2|D']
+    assert list(read_import_batch(str(csv_file)).texts()) == ['A|1|B']
+    assert list(read_import_batch(str(txt)).texts()) == ['A|1|B', 'C|2|D']
+
+
+def test_print_queue_imports_without_label_cli():
+    # print_queue used to import label_cli (which imports print_queue)
+    code = "import sys, print_queue; sys.exit('label_cli' in sys.modules)"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, '-c', code], cwd=root)
+    assert result.returncode == 0
+
+
+def test_queue_prints_every_job():
+    printed = []
+
+    def print_func(text, printer, **kwargs):
+        printed.append((text, printer))
+        return text != 'BAD|0|X'
+
+    queue = PrintQueue(workers=2, print_func=print_func)
+    queue.start()
+    try:
+        queue.submit_many(['A|1|B', 'BAD|0|X', 'C|2|D'], 'P1')
+        assert queue.wait(timeout=5)
+    finally:
+        queue.stop()
+    assert sorted(printed) == [('A|1|B', 'P1'), ('BAD|0|X', 'P1'), ('C|2|D', 'P1')]
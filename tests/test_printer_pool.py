@@ -0,0 +1,142 @@
+"""Tests for printer pool routing, using simulated printers."""
+
+import time
+import threading
+
+import pytest
+
+from printer_pool import PrinterPool, register_pool
+from printer_simulator import add_simulated_printers, remove_simulated_printers
+from print_label import print_to_printer, unregister_printer_backend
+
+
+@pytest.fixture
+def label_file(tmp_path):
+    path = tmp_path / 'label.pdf'
+    path.write_bytes(b'%PDF-1.4 test label')
+    return str(path)
+
+
+@pytest.fixture
+def simulated():
+    """Factory for registered simulated printers, removed after the test."""
+    created = []
+
+    def make(prefix, count=1, **options):
+        printers = add_simulated_printers(count, prefix, **options)
+        created.extend(printers)
+        return printers
+
+    yield make
+    remove_simulated_printers(created)
+
+
+def test_concurrent_jobs_spread_over_members(simulated, label_file):
+    printers = simulated('SPREAD', 2, latency=0.02)
+    pool = PrinterPool('SPREAD-POOL', [p.name for p in printers])
+    results = []
+
+    def submit():
+        results.append(pool.print_file(label_file))
+
+    threads = [threading.Thread(target=submit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [True] * 8
+    assert all(printer.jobs >= 2 for printer in printers)
+    assert sum(printer.jobs for printer in printers) == 8
+
+
+def test_faster_member_gets_more_jobs(simulated, label_file):
+    fast, = simulated('FAST', latency=0.002)
+    slow, = simulated('SLOW', latency=0.03)
+    pool = PrinterPool('SPEED-POOL', [slow.name, fast.name])
+
+    def submit():
+        for _ in range(10):
+            assert pool.print_file(label_file)
+
+    threads = [threading.Thread(target=submit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fast.jobs + slow.jobs == 40
+    assert fast.jobs > slow.jobs
+    stats = {member['name']: member for member in pool.stats()}
+    # Job time is measured up to completion, so it reflects the print time
+    assert stats[slow.name]['job_seconds'] > stats[fast.name]['job_seconds']
+
+
+def test_failed_job_is_retried_and_member_taken_out(simulated, label_file):
+    broken, = simulated('BROKEN', latency=0.0, failure_rate=1.0)
+    working, = simulated('WORKING', latency=0.0)
+    pool = PrinterPool('RETRY-POOL', [broken.name, working.name], max_failures=1)
+    for _ in range(6):
+        assert pool.print_file(label_file)
+
+    assert working.jobs == 6
+    assert broken.jobs == 1         # skipped once marked unhealthy
+    assert not {m['name']: m for m in pool.stats()}[broken.name]['healthy']
+
+
+def test_pool_fails_when_every_member_fails(simulated, label_file):
+    printers = simulated('DEAD', 2, latency=0.0, failure_rate=1.0)
+    pool = PrinterPool('DEAD-POOL', [p.name for p in printers])
+    assert not pool.print_file(label_file)
+    assert all(printer.jobs == 1 for printer in printers)
+
+
+def test_registered_pool_is_a_printer_name(simulated, label_file):
+    printers = simulated('REG', 2, latency=0.0)
+    register_pool(PrinterPool('REG-POOL', [p.name for p in printers]))
+    try:
+        assert print_to_printer('REG-POOL', label_file)
+    finally:
+        unregister_printer_backend('REG-POOL')
+    assert sum(printer.jobs for printer in printers) == 1
+
+
+def test_member_finishing_after_timeout_is_canceled_not_duplicated(simulated, label_file):
+    slow, = simulated('LATE', latency=0.5)
+    fast, = simulated('ONTIME', latency=0)
+    pool = PrinterPool('LATE-POOL', [slow.name, fast.name], job_timeout=0.05)
+
+    assert pool.print_file(label_file)
+    time.sleep(0.5)
+    assert (slow.jobs, slow.canceled) == (0, 1)
+    assert fast.jobs == 1
+
+
+def test_cups_job_is_canceled_on_timeout(monkeypatch, label_file):
+    import print_label
+    from printer_status import JobResult
+
+    class Connection:
+        canceled = []
+
+        def printFile(self, printer, file_path, title, options):
+            return 42
+
+        def cancelJob(self, job_id):
+            self.canceled.append(job_id)
+
+    class Monitor:
+        def get_status(self, printer):
+            return None
+
+        def track(self, printer, job_id):
+            return JobResult(printer, job_id)
+
+    monkeypatch.setattr(print_label, 'SYSTEM', 'Linux')
+    monkeypatch.setattr(print_label, 'CUPS_AVAILABLE', True)
+    monkeypatch.setattr(print_label, 'CANCEL_SETTLE_SECONDS', 0.01)
+    monkeypatch.setattr(print_label, 'get_cups_connection', Connection)
+    monkeypatch.setattr(print_label, 'get_status_monitor', Monitor)
+
+    assert not print_label.print_to_printer('Zebra', label_file, wait=True, timeout=0.01)
+    assert Connection.canceled == [42]
@@ -0,0 +1,118 @@
+"""Tests for the printer status monitor, using a fake CUPS connection."""
+
+import pytest
+
+import print_label
+from printer_status import (
+    PrinterStatusMonitor, PrinterState, JOB_PROCESSING, JOB_CANCELED, JOB_ABORTED, JOB_COMPLETED,
+)
+
+
+class FakeConnection:
+    """Minimal pycups connection: job states, printers and (optional) events."""
+
+    def __init__(self, subscriptions=True):
+        self.subscriptions = subscriptions
+        self.jobs = {}         # job_id -> job-state
+        self.printers = {'Zebra': {'printer-state': 3, 'printer-state-reasons': ['none']}}
+        self.events = []
+        self.subscribe_calls = 0
+        self.printed = []
+
+    def createSubscription(self, uri, events, lease_duration):
+        self.subscribe_calls += 1
+        if not self.subscriptions:
+            raise RuntimeError('client-error-not-possible')
+        return 1
+
+    def getNotifications(self, subscription_ids, sequence_numbers):
+        events = [e for e in self.events
+                  if e['notify-sequence-number'] >= sequence_numbers[0]]
+        return {'events': events}
+
+    def getJobs(self, which_jobs):
+        return {job_id: {} for job_id, state in self.jobs.items() if state < JOB_CANCELED}
+
+    def getJobAttributes(self, job_id, requested_attributes):
+        return {'job-state': self.jobs[job_id], 'job-state-reasons': ['job-completed-successfully']}
+
+    def getPrinters(self):
+        return self.printers
+
+    def printFile(self, printer, file_path, title, options):
+        self.printed.append(printer)
+        return len(self.printed)
+
+    def cancelSubscription(self, subscription_id):
+        pass
+
+
+def event(sequence, job_id, state):
+    return {'notify-sequence-number': sequence, 'notify-job-id': job_id,
+            'job-state': state, 'notify-subscribed-event': 'job-completed'}
+
+
+def test_job_finished_before_track_is_reported(monkeypatch):
+    conn = FakeConnection()
+    monitor = PrinterStatusMonitor(connection_factory=lambda: conn)
+    monkeypatch.setattr(monitor, 'start', lambda: None)
+    assert monitor._poll_events(conn)          # subscribe and seed the caches
+
+    conn.events.append(event(1, 7, JOB_COMPLETED))
+    assert monitor._poll_events(conn)
+    result = monitor.track('Zebra', 7)
+    assert result.done and result.ok
+
+    conn.events.append(event(2, 8, JOB_ABORTED))
+    monitor._poll_events(conn)
+    assert monitor.track('Zebra', 8).state == 'aborted'
+    assert monitor.get_status('Zebra').state == 'idle'
+
+
+def test_falls_back_to_polling_without_subscriptions():
+    conn = FakeConnection(subscriptions=False)
+    conn.jobs[5] = JOB_PROCESSING
+    monitor = PrinterStatusMonitor(connection_factory=lambda: conn, poll_interval=0.01)
+    try:
+        result = monitor.track('Zebra', 5)
+        assert not result.wait(0.1)
+        conn.jobs[5] = JOB_COMPLETED
+        assert result.wait(2)
+        assert conn.subscribe_calls == 1
+        assert monitor.get_status('Zebra').ready
+    finally:
+        monitor.stop()
+
+
+def test_jobs_settle_as_unknown_without_cups():
+    monitor = PrinterStatusMonitor(connection_factory=lambda: None, poll_interval=0.01)
+    try:
+        result = monitor.track('Zebra', 3)
+        assert not result.wait(2)
+        assert result.done
+        assert result.state == 'unknown'
+    finally:
+        monitor.stop()
+
+
+@pytest.mark.parametrize('state', [
+    PrinterState('Zebra', 'stopped'),
+    PrinterState('Zebra', 'idle', ['media-empty-error']),
+])
+def test_print_to_printer_refuses_unready_printer(monkeypatch, tmp_path, state):
+    conn = FakeConnection()
+    monitor = PrinterStatusMonitor(connection_factory=lambda: conn)
+    monitor._update_printer(state)
+    monkeypatch.setattr(print_label, 'SYSTEM', 'Linux')
+    monkeypatch.setattr(print_label, 'CUPS_AVAILABLE', True)
+    monkeypatch.setattr(print_label, 'get_status_monitor', lambda: monitor)
+    monkeypatch.setattr(print_label, 'get_cups_connection', lambda: conn)
+    label_file = tmp_path / 'label.pdf'
+    label_file.write_bytes(b'%PDF-1.4 test')
+
+    assert not print_label.print_to_printer('Zebra', str(label_file))
+    assert conn.printed == []
+
+    monitor._update_printer(PrinterState('Zebra', 'idle', ['none']))
+    assert print_label.print_to_printer('Zebra', str(label_file))
+    assert conn.printed == ['Zebra']
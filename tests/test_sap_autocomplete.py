@@ -0,0 +1,100 @@
+"""Tests for the SAP catalog prefix index and autocomplete ranking."""
+
+import os
+import time
+
+import pytest
+
+from sap_autocomplete import (
+    CatalogIndex, SapAutocomplete, build_index, load_catalog_index, read_catalog,
+)
+
+
+@pytest.fixture
+def index(tmp_path):
+    entries = [('SAP200', 'Bolt'), ('sap100', 'Nut'), ('SAP1000', 'Washer'),
+               ('SAP100', 'Repeated'), ('ÄRT1', 'Umlaut\tpart'), ('XYZ', '')]
+    path = str(tmp_path / 'catalog.idx')
+    assert build_index(entries, path) == 5
+    index = CatalogIndex(path)
+    yield index
+    index.close()
+
+
+def test_read_catalog_skips_header_and_sniffs_delimiter(tmp_path):
+    csv_path = tmp_path / 'catalog.csv'
+    csv_path.write_text('SAP;Description\nSAP1; Bolt \n\n SAP2 ;\n', encoding='utf-8-sig')
+    assert read_catalog(str(csv_path)) == [('SAP1', 'Bolt'), ('SAP2', '')]
+
+    txt_path = tmp_path / 'catalog.txt'
+    txt_path.write_text('SAP1\n\nSAP2\n', encoding='utf-8')
+    assert read_catalog(str(txt_path)) == [('SAP1', ''), ('SAP2', '')]
+
+
+def test_search_is_case_insensitive_and_sorted(index):
+    assert len(index) == 5
+    assert index.search('sap1') == [('sap100', 'Nut'), ('SAP1000', 'Washer')]
+    assert index.search(' SAP ', limit=2) == [('sap100', 'Nut'), ('SAP1000', 'Washer')]
+    assert index.search('är') == [('ÄRT1', 'Umlaut part')]
+    assert index.search('SAP3') == []
+    assert index.search('ZZZ') == []
+    assert len(index.search('')) == 5
+
+
+def test_contains_matches_whole_values_only(index):
+    assert 'SAP100' in index
+    assert ' xyz ' in index
+    assert 'SAP10' not in index
+    assert 'ZZZ' not in index
+
+
+def test_rejects_files_that_are_not_an_index(tmp_path):
+    path = tmp_path / 'catalog.idx'
+    path.write_bytes(b'not an index')
+    with pytest.raises(ValueError):
+        CatalogIndex(str(path))
+
+
+def test_load_rebuilds_index_when_catalog_is_newer(workdir):
+    assert load_catalog_index('catalog.csv', 'catalog.idx') is None
+
+    with open('catalog.csv', 'w', encoding='utf-8') as f:
+        f.write('SAP1,Bolt\n')
+    index = load_catalog_index('catalog.csv', 'catalog.idx')
+    assert index.search('SAP') == [('SAP1', 'Bolt')]
+    index.close()
+
+    with open('catalog.csv', 'w', encoding='utf-8') as f:
+        f.write('SAP1,Bolt\nSAP2,Nut\n')
+    future = time.time() + 10
+    os.utime('catalog.csv', (future, future))
+    index = load_catalog_index('catalog.csv', 'catalog.idx')
+    assert len(index) == 2
+    index.close()
+
+    # Without the catalog the existing index is still used
+    os.remove('catalog.csv')
+    index = load_catalog_index('catalog.csv', 'catalog.idx')
+    assert len(index) == 2
+    index.close()
+
+
+def test_used_values_rank_before_catalog_matches(index):
+    now = time.time()
+    autocomplete = SapAutocomplete(index)
+    autocomplete.load_usage([('SAP200', 1, now), ('SAP999', 5, now)])
+    autocomplete.record_use('sap200')
+
+    assert autocomplete.suggest('sap', limit=4) == [
+        ('SAP999', ''), ('SAP200', 'Bolt'), ('sap100', 'Nut'), ('SAP1000', 'Washer'),
+    ]
+    assert autocomplete.suggest('SAP2') == [('SAP200', 'Bolt')]
+    # An empty prefix lists used values only
+    assert autocomplete.suggest('') == [('SAP999', ''), ('SAP200', 'Bolt')]
+
+
+def test_recent_use_outranks_old_frequent_use():
+    now = time.time()
+    autocomplete = SapAutocomplete(half_life_days=1)
+    autocomplete.load_usage([('OLD', 10, now - 7 * 86400), ('NEW', 1, now)])
+    assert [value for value, _ in autocomplete.suggest('')] == ['NEW', 'OLD']
@@ -0,0 +1,76 @@
+"""Tests for keyboard-wedge scan detection and field routing."""
+
+from scanner_input import ScanDetector, ScanRecordBuilder
+
+
+def feed(detector, text, start, gap):
+    """Type text with a fixed gap between keys; returns the scans completed."""
+    scans = []
+    for index, char in enumerate(text):
+        scan = detector.feed(char, now=start + index * gap)
+        if scan is not None:
+            scans.append(scan)
+    return scans
+
+
+def test_fast_burst_with_terminator_is_a_scan():
+    detector = ScanDetector()
+    assert feed(detector, 'SAP123\r', 0.0, 0.005) == ['SAP123']
+    assert not detector.pending
+
+
+def test_slow_typing_is_ignored():
+    detector = ScanDetector()
+    assert feed(detector, 'SAP123\r', 0.0, 0.2) == []
+    assert not detector.pending
+
+
+def test_burst_without_terminator_ends_after_max_gap():
+    detector = ScanDetector(max_gap=0.04)
+    assert feed(detector, 'LOT42', 0.0, 0.005) == []
+    assert detector.pending
+    # Too early: the burst may still continue
+    assert detector.flush(now=0.03) is None
+    assert detector.flush(now=0.1) == 'LOT42'
+    assert not detector.pending
+
+
+def test_next_key_after_pause_ends_previous_burst():
+    detector = ScanDetector(max_gap=0.04)
+    feed(detector, 'LOT42', 0.0, 0.005)
+    assert detector.feed('x', now=1.0) == 'LOT42'
+    assert detector.pending
+
+
+def test_short_terminated_scan_and_short_burst():
+    detector = ScanDetector(min_length=3)
+    # A quantity ends with Enter: accepted although shorter than min_length
+    assert feed(detector, '5\r', 0.0, 0.005) == ['5']
+    feed(detector, '12', 1.0, 0.005)
+    assert detector.flush(now=2.0) is None
+
+
+def test_builder_fills_fields_in_order():
+    builder = ScanRecordBuilder()
+    assert builder.add('SAP1') is None
+    assert builder.next_field == 'cantitate'
+    assert builder.add('5') is None
+    record = builder.add(' LOT1 ')
+    assert tuple(record) == ('SAP1', '5', 'LOT1')
+    assert builder.next_field == 'sap_nr'
+
+
+def test_builder_combined_scan_sets_every_field():
+    builder = ScanRecordBuilder()
+    assert tuple(builder.add('SAP1|5|LOT1')) == ('SAP1', '5', 'LOT1')
+    # A partial combined scan keeps the fields it does not carry
+    builder.set('lot_number', 'LOT9')
+    assert tuple(builder.add('SAP2|7|')) == ('SAP2', '7', 'LOT9')
+
+
+def test_builder_manual_edit_skips_field():
+    builder = ScanRecordBuilder()
+    builder.set('sap_nr', 'SAP1')
+    builder.add('2')
+    assert builder.next_field == 'lot_number'
+    assert builder.add('') is None